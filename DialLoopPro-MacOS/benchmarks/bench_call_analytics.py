@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# bench_call_analytics.py
+"""
+Vectorized call analytics vs. a pure-Python loop baseline
+
+Generates columns for a large call history (10M attempts by default),
+times each NumPy analytic over all of it, then runs the same analytics
+as plain Python loops over a sample and checks both agree on it. Also
+exports a small SQLite history to .npz and reads it back.
+
+Usage: python3 bench_call_analytics.py [rows] [python_sample] [export_rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from call_analytics import (OUTCOMES, SESSION_GAP, connect_rate_by_hour,
+                            export_history, load_export, session_rates,
+                            talk_time_distribution, wasted_wait_per_connect)
+from call_history import CONNECTED, FORCED_NEXT, NO_ANSWER, CallHistory
+
+
+def synthetic_columns(rows, seed=1):
+    """Dialing sessions of ~80 dials/hour with breaks between them"""
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(45.0, rows)
+    breaks = rng.random(rows) < 1 / 300
+    gaps[breaks] += rng.uniform(SESSION_GAP, 16 * 3600, breaks.sum())
+    dialed_at = 1_650_000_000.0 + np.cumsum(gaps)
+    outcome = rng.choice(np.arange(3, dtype=np.uint8), rows, p=[0.8, 0.15, 0.05])
+    connected = outcome == OUTCOMES.index(CONNECTED)
+    talk_ms = np.where(connected, rng.integers(5000, 600000, rows), 0).astype(np.int32)
+    wait_ms = rng.integers(2000, 35000, rows).astype(np.int32)
+    return {'dialed_at': dialed_at, 'outcome': outcome,
+            'talk_ms': talk_ms, 'wait_ms': wait_ms}
+
+
+def python_analytics(dialed_at, outcome, talk_ms, wait_ms):
+    """The same analytics written as straightforward loops"""
+    code = OUTCOMES.index(CONNECTED)
+    attempts = [[0] * 24 for _ in range(7)]
+    connects = [[0] * 24 for _ in range(7)]
+    talk = []
+    wasted = 0
+    for t, o, talk_time, wait in zip(dialed_at, outcome, talk_ms, wait_ms):
+        when = datetime.fromtimestamp(t)
+        attempts[when.weekday()][when.hour] += 1
+        if o == code:
+            connects[when.weekday()][when.hour] += 1
+            talk.append(talk_time / 1000.0)
+        else:
+            wasted += wait
+
+    talk.sort()
+    pos = (len(talk) - 1) * 0.5
+    low = int(pos)
+    p50 = talk[low] + (talk[min(low + 1, len(talk) - 1)] - talk[low]) * (pos - low)
+
+    sessions = 0
+    previous = None
+    for t in sorted(dialed_at):
+        if previous is None or t - previous > SESSION_GAP:
+            sessions += 1
+        previous = t
+
+    return attempts, connects, p50, wasted / 1000.0 / max(1, len(talk)), sessions
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_export(rows):
+    """Round-trip a small SQLite history through the .npz export"""
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'history.db')
+        history = CallHistory(db, batch_size=20000)
+        for i in range(rows):
+            outcome = rng.choice((NO_ANSWER, NO_ANSWER, CONNECTED, FORCED_NEXT))
+            history.record(1_650_000_000 + i * 40, f"+1555{i % 10**7:07d}", i,
+                           rng.randint(2000, 35000), outcome,
+                           60000 if outcome == CONNECTED else 0,
+                           {'copy': 0.3, 'dial': 0.4, 'wait': 20.0})
+        history.close()
+
+        output = os.path.join(tmp, 'history.npz')
+        exported, seconds = timed(export_history, db, output, True)
+        columns = load_export(output)
+        size = os.path.getsize(output)
+    assert exported == rows == len(columns['dialed_at'])
+    return seconds, size, sorted(columns)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    export_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+
+    columns = synthetic_columns(rows)
+    print(f"Rows: {rows}")
+
+    total = 0.0
+    for name, fn in (('connect_rate_by_hour', connect_rate_by_hour),
+                     ('talk_time_distribution', talk_time_distribution),
+                     ('wasted_wait_per_connect', wasted_wait_per_connect),
+                     ('session_rates', session_rates)):
+        _, seconds = timed(fn, columns)
+        total += seconds
+        print(f"  {name:<26}{seconds:>8.2f} s")
+    print(f"  {'NumPy total':<26}{total:>8.2f} s")
+
+    # Same analytics on a sample, both ways
+    subset = {name: column[:sample] for name, column in columns.items()}
+    lists = [subset[name].tolist() for name in ('dialed_at', 'outcome', 'talk_ms', 'wait_ms')]
+    (py_attempts, py_connects, py_p50, py_wasted, py_sessions), py_seconds = timed(
+        python_analytics, *lists)
+    start = time.perf_counter()
+    attempts, connects, _ = connect_rate_by_hour(subset)
+    talk = talk_time_distribution(subset)
+    wasted = wasted_wait_per_connect(subset)
+    _, calls, _ = session_rates(subset)
+    np_seconds = time.perf_counter() - start
+
+    agree = (attempts.tolist() == py_attempts and connects.tolist() == py_connects
+             and abs(talk['p50'] - py_p50) < 1e-6 and abs(wasted - py_wasted) < 1e-6
+             and len(calls) == py_sessions)
+    print(f"Sample of {sample}: pure Python {py_seconds:.2f} s, "
+          f"NumPy {np_seconds:.3f} s ({py_seconds / np_seconds:.0f}x), agree: {agree}")
+    print(f"  pure Python extrapolated to {rows}: {py_seconds * rows / sample:.0f} s")
+
+    seconds, size, names = bench_export(export_rows)
+    print(f"Export of {export_rows} attempts with phases: {seconds:.2f} s, "
+          f"{size / 1e6:.1f} MB, columns {', '.join(names)}")
+    return 0 if agree else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
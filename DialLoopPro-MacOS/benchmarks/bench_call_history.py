@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# bench_call_history.py
+"""
+Call history insert throughput and dial-thread cost for a 100k-call day
+
+Records a simulated day of attempts through CallHistory (batched
+background writer) and measures the time record() takes on the calling
+thread, total time until everything is committed, and batches written.
+For comparison, a sample of the same attempts is inserted the naive way:
+one INSERT and commit per attempt on the dial thread.
+
+Usage: python3 bench_call_history.py [calls] [naive_sample]
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from call_history import (CONNECTED, FORCED_NEXT, INSERT, NO_ANSWER, SCHEMA,
+                          CallHistory)
+
+
+def simulated_day(calls, seed=1):
+    """Attempt tuples spread over a 10-hour calling day"""
+    rng = random.Random(seed)
+    start = time.time()
+    for i in range(calls):
+        roll = rng.random()
+        outcome = CONNECTED if roll < 0.15 else FORCED_NEXT if roll < 0.2 else NO_ANSWER
+        wait_ms = rng.randint(2000, 35000)
+        yield (start + i * 36000 / calls, f"+1555{rng.randrange(10**7):07d}", i,
+               wait_ms, outcome,
+               rng.randint(10000, 300000) if outcome == CONNECTED else 0,
+               {'activate': 0.05, 'copy': 0.3, 'dial': 0.4,
+                'wait': wait_ms / 1000, 'hangup': 0.1})
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def bench_batched(path, attempts):
+    history = CallHistory(path)
+    latencies = []
+    start = time.perf_counter()
+    for attempt in attempts:
+        t = time.perf_counter()
+        history.record(*attempt)
+        latencies.append(time.perf_counter() - t)
+    queued = time.perf_counter() - start
+    history.close()
+    total = time.perf_counter() - start
+
+    db = sqlite3.connect(path)
+    stored = db.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+    db.close()
+    return latencies, queued, total, history.writes, stored
+
+
+def bench_naive(path, attempts):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    latencies = []
+    for attempt in attempts:
+        t = time.perf_counter()
+        db.execute(INSERT, attempt[:6] + (json.dumps(attempt[6]),))
+        db.commit()
+        latencies.append(time.perf_counter() - t)
+    db.close()
+    return latencies
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    attempts = list(simulated_day(calls))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        latencies, queued, total, batches, stored = bench_batched(
+            os.path.join(tmp, 'history.db'), attempts)
+        naive = bench_naive(os.path.join(tmp, 'naive.db'), attempts[:sample])
+
+    print(f"Attempts:              {calls} ({stored} stored, {batches} batches)")
+    print(f"Batched insert rate:   {calls / total:,.0f} attempts/s "
+          f"({total:.2f} s to commit all)")
+    print(f"Dial-thread record():  p50 {percentile(latencies, 50) * 1e6:.1f} us, "
+          f"p99 {percentile(latencies, 99) * 1e6:.1f} us, "
+          f"max {max(latencies) * 1e3:.2f} ms")
+    print(f"Naive insert+commit:   p50 {percentile(naive, 50) * 1e6:.1f} us, "
+          f"p99 {percentile(naive, 99) * 1e6:.1f} us "
+          f"({sample} attempt sample)")
+
+    assert stored == calls, "attempts lost"
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
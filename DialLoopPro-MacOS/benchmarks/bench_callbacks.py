@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# bench_callbacks.py
+"""
+Callback queue scheduling, firing and recovery with 100k pending callbacks
+
+Schedules callbacks spread over the next 30 days on a fake clock, then
+steps the clock forward in dial-loop sized increments, draining
+pop_due() at each step, and checks every callback fires at its first
+step at or after its due time, in due order. Also times restart
+recovery from the log, cancels, and the compaction a mostly-dead log
+gets on reopen, and checks CallbackLeadSource puts due callbacks ahead
+of the lead file.
+
+Usage: python3 bench_callbacks.py [callbacks]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from callbacks import CallbackQueue
+from lead_source import CallbackLeadSource, ScheduledLeadSource
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def check_firing(path, count, rng):
+    """Schedule and fire count callbacks; returns the number of failures"""
+    start = 1_800_000_000.0
+    clock = FakeClock(start)
+    queue = CallbackQueue(path, clock)
+    dues = [start + rng.random() * 30 * 86400 for _ in range(count)]
+
+    t0 = time.perf_counter()
+    ids = [queue.schedule(due, f"555{i % 10000:07d}", i + 1) for i, due in enumerate(dues)]
+    seconds = time.perf_counter() - t0
+    print(f"schedule: {count} callbacks in {seconds:.2f} s, "
+          f"{seconds / count * 1e6:.1f} us each")
+
+    samples = []
+    for _ in range(1000):
+        due = start + rng.random() * 30 * 86400
+        t0 = time.perf_counter()
+        callback_id = queue.schedule(due, '5550000000')
+        samples.append(time.perf_counter() - t0)
+        queue.cancel(callback_id)
+    print(f"schedule with {count} pending: p50 {percentile(samples, 0.5) * 1e6:.1f} us, "
+          f"p99 {percentile(samples, 0.99) * 1e6:.1f} us")
+
+    # Step the clock 7-90 s at a time, like dials going by
+    fired = []
+    steps = 0
+    t0 = time.perf_counter()
+    while clock.now < start + 30 * 86400 + 60:
+        clock.now += rng.uniform(7, 90)
+        steps += 1
+        while True:
+            callback = queue.pop_due()
+            if callback is None:
+                break
+            fired.append((callback.id, callback.due, clock.now))
+            queue.complete(callback.id)
+    seconds = time.perf_counter() - t0
+    print(f"fire: {len(fired)} callbacks over {steps} clock steps in {seconds:.2f} s, "
+          f"{seconds / max(1, len(fired)) * 1e6:.1f} us per callback")
+
+    failures = 0
+    if len(fired) != count:
+        failures += 1
+        print(f"  FAIL fired {len(fired)} of {count}")
+    # Due times are kept to the millisecond
+    if [f[0] for f in fired] != [i for _, i in sorted(zip((round(d, 3) for d in dues), ids))]:
+        failures += 1
+        print("  FAIL callbacks fired out of due order")
+    early = sum(1 for _, due, at in fired if at < due)
+    if early:
+        failures += 1
+        print(f"  FAIL {early} callbacks fired early")
+    late = sum(1 for _, due, at in fired if at - due > 91)
+    if late:
+        failures += 1
+        print(f"  FAIL {late} callbacks fired more than one step late")
+    if len(queue):
+        failures += 1
+        print(f"  FAIL {len(queue)} callbacks still pending")
+    queue.close()
+    return failures
+
+
+def check_recovery(path, count, rng):
+    """Reopen a log of count pending callbacks; returns the number of failures"""
+    start = 1_800_000_000.0
+    clock = FakeClock(start)
+    queue = CallbackQueue(path, clock)
+    for i in range(count):
+        queue.schedule(start + 1 + rng.random() * 30 * 86400, f"555{i:07d}", i + 1,
+                       'call back after lunch')
+    expected = queue.upcoming()
+    queue.close()
+
+    t0 = time.perf_counter()
+    queue = CallbackQueue(path, clock)
+    seconds = time.perf_counter() - t0
+    print(f"recover: {count} pending from a {os.path.getsize(path) / 1e6:.1f} MB log "
+          f"in {seconds:.2f} s")
+    failures = 0
+    if queue.upcoming() != expected:
+        failures += 1
+        print("  FAIL recovered callbacks differ")
+
+    # Cancel 90%: reopening should compact the log down to the rest
+    t0 = time.perf_counter()
+    cancelled = 0
+    for callback in expected:
+        if callback.id % 10:
+            queue.cancel(callback.id)
+            cancelled += 1
+    seconds = time.perf_counter() - t0
+    print(f"cancel: {cancelled} in {seconds:.2f} s, {seconds / cancelled * 1e6:.1f} us each")
+    queue.close()
+
+    size = os.path.getsize(path)
+    t0 = time.perf_counter()
+    queue = CallbackQueue(path, clock)
+    seconds = time.perf_counter() - t0
+    print(f"compact: {size / 1e6:.1f} MB log down to {os.path.getsize(path) / 1e6:.1f} MB "
+          f"on reopen in {seconds:.2f} s")
+    kept = [callback for callback in expected if not callback.id % 10]
+    if queue.upcoming() != kept:
+        failures += 1
+        print("  FAIL callbacks lost or revived by compaction")
+    queue.close()
+    return failures
+
+
+def check_lead_source(tmp):
+    """Due callbacks come ahead of the lead file; returns the number of failures"""
+    lead_file = os.path.join(tmp, 'leads.csv')
+    with open(lead_file, 'w') as f:
+        f.write("name,phone\n")
+        for i in range(5):
+            f.write(f"Lead {i},212555{i:04d}\n")
+
+    clock = FakeClock(1_800_000_000.0)
+    queue = CallbackQueue(os.path.join(tmp, 'lead_source.log'), clock)
+    source = CallbackLeadSource(ScheduledLeadSource(lead_file, clock=clock), queue)
+    queue.schedule(clock.now + 30, '3105550001', note='first')
+    queue.schedule(clock.now + 10, '3105550002', 3)
+
+    numbers = []
+    for step in (0, 15, 0, 15):
+        clock.now += step
+        lead = source.next_lead()
+        source.mark_dialed(lead)
+        numbers.append(lead.number)
+    source.close()
+    queue.close()
+
+    expected = ['2125550000', '3105550002', '2125550001', '3105550001']
+    ok = numbers == expected and not len(queue)
+    print(f"  {'ok ' if ok else 'FAIL'} due callbacks dialed ahead of leads"
+          + ('' if ok else f": {numbers}"))
+    return 0 if ok else 1
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        failures = check_firing(os.path.join(tmp, 'fire.log'), count, rng)
+        failures += check_recovery(os.path.join(tmp, 'recover.log'), count, rng)
+        print("Lead source:")
+        failures += check_lead_source(tmp)
+    print(f"Failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
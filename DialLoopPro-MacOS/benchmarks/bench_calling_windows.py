@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# bench_calling_windows.py
+"""
+Per-lead calling-window lookup cost
+
+Times CallingWindows.next_open() over a million random numbers across
+every area code, with the clock moving forward as it would over a
+session. The DST and deferral checks are in tests/test_calling_windows.py.
+
+Usage: python3 bench_calling_windows.py [lookups]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from calling_windows import ZONE_AREA_CODES, CallingWindows
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    rng = random.Random(1)
+    npas = [npa for npas in ZONE_AREA_CODES.values() for npa in npas]
+    numbers = [f"{rng.choice(npas)}555{rng.randrange(10000):04d}" for _ in range(10000)]
+    windows = CallingWindows()
+    now = time.time()
+    start = time.perf_counter()
+    for i in range(lookups):
+        windows.next_open(numbers[i % len(numbers)], now + i * 0.05)
+    seconds = time.perf_counter() - start
+    print(f"{lookups} lookups over {lookups * 0.05 / 3600:.1f} simulated hours: "
+          f"{seconds / lookups * 1e9:.0f} ns per lead, "
+          f"{len(windows.zone_sets)} zone sets, {len(set(npas))} area codes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# bench_config_writes.py
+"""
+Coalescing check for ConfigManager.save_setting
+
+A burst of save_setting calls (as update_display makes while the hourly
+rate climbs) must end up as a bounded number of settings.ini writes.
+
+Usage: python3 bench_config_writes.py [calls]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config_manager import ConfigManager
+
+MAX_WRITES = 3
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'settings.ini')
+        manager = ConfigManager(path, flush_delay=0.2)
+        baseline = manager.writes
+
+        start = time.perf_counter()
+        for i in range(calls):
+            manager.save_setting('BestHourlyRate', 100 + i * 0.1, 'Goals')
+        elapsed = time.perf_counter() - start
+
+        time.sleep(0.5)  # let the debounced writer run
+        manager.flush()
+        writes = manager.writes - baseline
+
+        reread = ConfigManager(path).load_config()
+        expected = round(100 + (calls - 1) * 0.1, 6)
+        assert abs(reread['best_hourly_rate'] - expected) < 1e-6, reread
+
+        print(f"save_setting calls: {calls}")
+        print(f"Caller time:        {elapsed / calls * 1e6:.1f} us/call")
+        print(f"File writes:        {writes}")
+        if writes > MAX_WRITES:
+            print(f"FAIL: more than {MAX_WRITES} writes")
+            return 1
+        print("OK")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
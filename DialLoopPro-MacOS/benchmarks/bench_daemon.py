@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# bench_daemon.py
+"""
+Console daemon start time, memory and graceful shutdown
+
+Starts `dialloop start --simulate` in a fresh folder a few times and
+reports how long start took to return (the daemon has written its first
+status), its own startup time and peak memory, and how long `dialloop
+stop` took. Checks that every stop flushed the stats (stats.ini matches
+the daemon's last status) and removed the pidfile, and that SIGINT to a
+foreground `dialloop run` shuts down the same way. Where PyQt5 is
+installed, the window build's start time and memory are measured for
+comparison.
+
+Usage: python3 bench_daemon.py [runs] [seconds_dialing]
+"""
+
+import configparser
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+CLI = os.path.join(SRC, 'dialloop_cli.py')
+SIMULATE_DIR = 'simulate'  # dialloop_cli.SIMULATE_DIR
+
+# The window build, built offscreen: seconds to a constructed window and peak RSS
+GUI_PROBE = """
+import resource, sys, time
+start = time.time()
+sys.path.insert(0, {src!r})
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import dialloop_mac
+window = dialloop_mac.DialLoopMac()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(time.time() - start, rss / 1e6 if sys.platform == 'darwin' else rss / 1e3)
+window.engine.shutdown()
+"""
+
+
+def dialloop(workdir, *args):
+    """Run a dialloop command; returns (exit code, output, seconds)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, CLI, *args, '--dir', workdir],
+                            capture_output=True, text=True)
+    return result.returncode, result.stdout.strip(), time.perf_counter() - start
+
+
+def stats_calls(workdir):
+    """Lifetime calls in the stats of --simulate runs in workdir"""
+    stats = configparser.ConfigParser()
+    stats.read(os.path.join(workdir, SIMULATE_DIR, 'stats.ini'))
+    return stats.getint('Lifetime', 'totalcalls', fallback=0)
+
+
+def read_status(workdir):
+    with open(os.path.join(workdir, 'dialloop.status.json')) as f:
+        return json.load(f)
+
+
+def check(name, ok, detail=''):
+    print(f"  {'ok ' if ok else 'FAIL'} {name}" + ('' if ok else f": {detail}"))
+    return 0 if ok else 1
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def bench_start_stop(tmp, runs, seconds):
+    """start / status / stop cycles; returns the number of failures"""
+    starts, startups, stops, memory = [], [], [], []
+    failures = 0
+    for run in range(runs):
+        workdir = os.path.join(tmp, f"run_{run}")
+        os.makedirs(workdir)
+        code, output, elapsed = dialloop(workdir, 'start', '--simulate', '0.01')
+        if code != 0:
+            return failures + check("daemon starts", False, output), 0.0, 0.0
+        starts.append(elapsed)
+        time.sleep(seconds)
+        status = read_status(workdir)
+        memory.append(status['max_rss_mb'])
+        with open(os.path.join(workdir, 'dialloop.log')) as f:
+            startups.append(json.loads(f.readline())['startup_seconds'])
+
+        code, output, elapsed = dialloop(workdir, 'stop')
+        stops.append(elapsed)
+        status = read_status(workdir)
+        ok = (code == 0 and status['total_calls'] == stats_calls(workdir) > 0 and
+              not os.path.exists(os.path.join(workdir, 'dialloop.pid')))
+        failures += not ok
+        if not ok:
+            check("stop flushes stats and removes the pidfile", False,
+                  f"{output}; status {status['total_calls']}, stats.ini "
+                  f"{stats_calls(workdir)}")
+
+    print(f"dialloop start: median {median(starts):.2f} s to running "
+          f"(engine up in {median(startups):.2f} s), over {runs} runs")
+    print(f"daemon memory: peak RSS median {median(memory):.1f} MB")
+    print(f"dialloop stop: median {median(stops):.2f} s to flushed and exited")
+    failures += check(f"{runs} stops flushed stats and removed the pidfile", not failures)
+    failures += check("start well under a second", median(starts) < 0.5,
+                      f"{median(starts):.2f} s")
+    return failures, median(starts), median(memory)
+
+
+def bench_sigint(tmp, seconds):
+    """Ctrl+C on a foreground run; returns the number of failures"""
+    workdir = os.path.join(tmp, 'foreground')
+    os.makedirs(workdir)
+    process = subprocess.Popen([sys.executable, CLI, 'run', '--simulate', '0.01',
+                                '--dir', workdir],
+                               stdout=subprocess.PIPE, text=True)
+    time.sleep(seconds)
+    process.send_signal(signal.SIGINT)
+    output, _ = process.communicate(timeout=30)
+    events = [json.loads(line) for line in output.splitlines()]
+    last = events[-1]
+    ok = (process.returncode == 0 and last['event'] == 'stopped' and
+          last['total_calls'] == stats_calls(workdir) > 0 and
+          any(e['event'] == 'stopping' and e['reason'] == 'SIGINT' for e in events))
+    return check("SIGINT on a foreground run logs, flushes stats and exits 0", ok,
+                 f"exit {process.returncode}, last {last}")
+
+
+def bench_gui(tmp):
+    """The window build for comparison, if PyQt5 is installed"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, '-c', GUI_PROBE.format(src=SRC)],
+                            cwd=tmp, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        reason = (result.stderr.strip().splitlines() or ['failed'])[-1]
+        print(f"window build: not measured here ({reason})")
+        return None
+    seconds, rss = map(float, result.stdout.split()[:2])
+    print(f"window build: {seconds:.2f} s to a constructed window, peak RSS {rss:.1f} MB")
+    return seconds, rss
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        failures, start, memory = bench_start_stop(tmp, runs, seconds)
+        failures += bench_sigint(tmp, seconds)
+        gui = bench_gui(tmp)
+        if gui is not None and start:
+            print(f"daemon vs window: {start / gui[0]:.0%} of the start time, "
+                  f"{memory / gui[1]:.0%} of the memory")
+
+    print(f"Failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# bench_dial_loop.py
+"""
+Dial-loop throughput benchmark against the simulator backend
+
+Runs DialEngine headless against SimulatorBackend for a simulated period
+and reports calls/hour, p50/p95/p99 per phase (activate, copy, dial,
+wait, hangup, post_hangup), CPU time per call and stats file writes per call. Results
+are written as JSON; given a baseline file, the run fails if calls/hour
+drops, or CPU or file writes per call grow, by more than the threshold.
+
+Usage:
+    python3 bench_dial_loop.py [--minutes 60] [--scale 0.01] [--seed 1]
+                               [--output results.json]
+                               [--baseline old.json] [--threshold 0.10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from simulator_backend import create_simulated_engine
+
+PHASES = ['activate', 'copy', 'dial', 'wait', 'hangup', 'post_hangup']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run(minutes, scale, seed):
+    """Run the simulated dial loop and collect metrics"""
+    phase_times = defaultdict(list)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, backend = create_simulated_engine(tmp, scale, seed=seed)
+        engine.on_warning = lambda title, text: None
+        engine.phase_listeners.append(
+            lambda name, seconds: phase_times[name].append(seconds))
+
+        writes_before = engine.stats_manager.file_writes
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+
+        engine.start()
+        time.sleep(minutes * 60 * scale)
+        while not engine.stop():
+            backend.end_call()
+        engine.dial_thread.join()
+
+        wall = time.perf_counter() - wall_before
+        cpu = time.process_time() - cpu_before
+        engine.stats_manager.journal.flush()
+        writes = engine.stats_manager.file_writes - writes_before
+        calls = engine.session_calls
+        engine.shutdown()
+
+    simulated_hours = wall / scale / 3600
+    return {
+        'minutes': minutes,
+        'scale': scale,
+        'seed': seed,
+        'python': platform.python_version(),
+        'calls': calls,
+        'answered': backend.answered,
+        'skipped': backend.skipped,
+        'calls_per_hour': round(calls / simulated_hours, 2) if simulated_hours else 0,
+        'cpu_ms_per_call': round(cpu / calls * 1000, 3) if calls else 0,
+        'stats_writes_per_call': round(writes / calls, 4) if calls else 0,
+        'phases': {
+            name: {
+                'count': len(phase_times[name]),
+                'p50': round(percentile(phase_times[name], 50), 4),
+                'p95': round(percentile(phase_times[name], 95), 4),
+                'p99': round(percentile(phase_times[name], 99), 4),
+            }
+            for name in PHASES
+        },
+    }
+
+
+def compare(result, baseline, threshold):
+    """Return a list of regressions against a baseline result"""
+    regressions = []
+    old, new = baseline['calls_per_hour'], result['calls_per_hour']
+    if old and new < old * (1 - threshold):
+        regressions.append(f"calls/hour {new} < {old} - {threshold:.0%}")
+    for key in ('cpu_ms_per_call', 'stats_writes_per_call'):
+        old, new = baseline[key], result[key]
+        if old and new > old * (1 + threshold):
+            regressions.append(f"{key} {new} > {old} + {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dial-loop throughput benchmark")
+    parser.add_argument('--minutes', type=float, default=60,
+                        help="simulated minutes to dial")
+    parser.add_argument('--scale', type=float, default=0.01,
+                        help="real seconds per simulated second")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', help="results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed relative regression")
+    args = parser.parse_args()
+
+    result = run(args.minutes, args.scale, args.seed)
+
+    print(f"Calls/hour:        {result['calls_per_hour']}")
+    print(f"CPU per call:      {result['cpu_ms_per_call']} ms")
+    print(f"Stats writes/call: {result['stats_writes_per_call']}")
+    print(f"{'Phase':<12}{'n':>6}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}")
+    for name in PHASES:
+        p = result['phases'][name]
+        print(f"{name:<12}{p['count']:>6}{p['p50']:>9.3f}{p['p95']:>9.3f}{p['p99']:>9.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
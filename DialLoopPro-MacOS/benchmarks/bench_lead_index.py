@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# bench_lead_index.py
+"""
+Startup time and resident memory: row-offset index vs. full lead-file parse
+
+Each mode runs in its own process so peak RSS is measured separately.
+
+Usage: python3 bench_lead_index.py [rows]
+"""
+
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def write_leads(path, rows):
+    """Write a synthetic lead file"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'phone', 'city'])
+        for i in range(rows):
+            writer.writerow([f'Lead {i}', f'555{i:07d}', 'Springfield'])
+
+
+def run_mode(mode, path):
+    """Measure one startup strategy (runs in a child process)"""
+    rows = None
+    start = time.perf_counter()
+    if mode == 'parse':
+        with open(path, newline='') as f:
+            leads = list(csv.reader(f))
+        target = leads[-1]
+        rows = len(leads)
+    else:
+        from lead_source import FileLeadSource
+        source = FileLeadSource(path, cursor_file=path + '.bench-cursor')
+        source.jump_to(len(source.index) - 1)
+        target = source.next_lead()
+        rows = len(source.index)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'mode': mode, 'seconds': elapsed, 'rows': rows,
+                      'rss_mb': peak_rss_mb(), 'last': str(target)}))
+
+
+def measure(mode, path):
+    out = subprocess.check_output([sys.executable, __file__, '--mode', mode, path])
+    return json.loads(out)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[2], sys.argv[3])
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'leads.csv')
+        print(f"Writing {rows:,} rows...")
+        write_leads(path, rows)
+
+        results = [
+            ('Full parse', measure('parse', path)),
+            ('Index build (cold)', measure('index', path)),
+            ('Index open (warm)', measure('index', path)),
+        ]
+
+        print(f"{'Strategy':<22}{'Startup s':>11}{'Peak RSS MB':>13}")
+        for name, r in results:
+            print(f"{name:<22}{r['seconds']:>11.3f}{r['rss_mb']:>13.1f}")
+
+        # Incremental append: only new rows are scanned
+        from lead_index import LeadIndex
+        index = LeadIndex(path)
+        with open(path, 'a') as f:
+            for i in range(1000):
+                f.write(f'New {i},556{i:07d},Shelbyville\n')
+        start = time.perf_counter()
+        added = index.refresh()
+        print(f"Append refresh: {added} rows in "
+              f"{(time.perf_counter() - start) * 1000:.2f} ms")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# bench_lead_ordering.py
+"""
+Connects per hour with and without answer-model lead ordering
+
+Builds a lead file whose area codes have very different (hidden) answer
+rates and a call history of earlier dials to those area codes, then runs
+the simulated dial loop over the same lead file twice: once in file
+order and once with OrderLeads on. Reports dials, connects per hour and
+the mean true answer rate of the leads each run dialed (the same
+comparison without the simulator's dice).
+
+Usage: python3 bench_lead_ordering.py [minutes] [scale] [history_dials]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from answer_model import area_code
+from call_history import CONNECTED, NO_ANSWER, CallHistory
+from simulator_backend import SimulatorBackend, create_simulated_engine
+
+
+class AreaCodeBackend(SimulatorBackend):
+    """Simulator whose answer rate depends on the area code dialed"""
+
+    def __init__(self, rates, **kwargs):
+        super().__init__(**kwargs)
+        self.rates = rates
+        self.dialed_rates = []
+
+    def answer_probability(self, digits):
+        rate = self.rates.get(area_code(digits), self.answer_rate)
+        self.dialed_rates.append(rate)
+        return rate
+
+
+def make_rates(count, rng):
+    """Hidden answer rate per area code: most poor, a few good"""
+    codes = rng.sample(range(201, 990), count)
+    return {code: min(0.6, rng.lognormvariate(-2.2, 0.7)) for code in codes}
+
+
+def write_leads(path, rates, leads, rng):
+    """Lead file of numbers spread evenly over the area codes"""
+    codes = list(rates)
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        for i in range(leads):
+            f.write(f"Lead {i},({rng.choice(codes)}) 555-{i % 10000:04d}\n")
+
+
+def write_history(path, rates, dials, rng):
+    """Earlier dials to the same area codes over the last eight weeks"""
+    history = CallHistory(path, batch_size=20000)
+    codes = list(rates)
+    now = time.time()
+    for i in range(dials):
+        code = rng.choice(codes)
+        outcome = CONNECTED if rng.random() < rates[code] else NO_ANSWER
+        history.record(now - rng.random() * 56 * 86400, f"+1{code}555{i % 10000:04d}",
+                       None, 20000, outcome, 60000 if outcome == CONNECTED else 0)
+    history.close()
+
+
+def run(workdir, leads, history, rates, minutes, scale, order):
+    """Dial the lead file for a simulated period; returns metrics"""
+    os.makedirs(workdir)
+    lead_file = os.path.join(workdir, 'leads.csv')
+    db = os.path.join(workdir, 'call_history.db')
+    shutil.copy(leads, lead_file)
+    shutil.copy(history, db)
+
+    engine, _ = create_simulated_engine(workdir, scale, wait_time=20000)
+    backend = AreaCodeBackend(rates, time_scale=scale, seed=7,
+                              talk_time=(45.0, 20.0))
+    backend.attach(engine)
+    engine.backend = backend
+    engine.config_manager.update_config({
+        'Configuration': {'LeadFile': lead_file, 'OrderLeads': '1' if order else '0',
+                          'CallingHours': '0'}
+    })
+    engine.enable_call_history(db)
+    engine.load_configuration()
+    engine.on_warning = lambda title, text: None
+
+    start = time.perf_counter()
+    engine.start()
+    time.sleep(minutes * 60 * scale)
+    while not engine.stop():
+        backend.end_call()
+    engine.dial_thread.join()
+    hours = (time.perf_counter() - start) / scale / 3600
+    engine.shutdown()
+
+    dialed = backend.dialed_rates
+    return {
+        'dials': backend.dials,
+        'connects': backend.answered,
+        'connects_per_hour': backend.answered / hours,
+        'mean_rate': sum(dialed) / len(dialed) if dialed else 0.0,
+    }
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    history_dials = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+
+    rng = random.Random(1)
+    rates = make_rates(300, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        leads = os.path.join(tmp, 'leads.csv')
+        history = os.path.join(tmp, 'history.db')
+        write_leads(leads, rates, 5000, rng)
+        write_history(history, rates, history_dials, rng)
+
+        results = {}
+        for name, order in (('file order', False), ('ordered', True)):
+            results[name] = run(os.path.join(tmp, name.replace(' ', '_')), leads,
+                                history, rates, minutes, scale, order)
+
+    print(f"Simulated {minutes:g} min per run, {history_dials} dials of history, "
+          f"mean area code answer rate {sum(rates.values()) / len(rates):.3f}")
+    print(f"{'Run':<12}{'dials':>7}{'connects':>10}{'conn/hr':>9}{'true rate':>11}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['dials']:>7}{r['connects']:>10}"
+              f"{r['connects_per_hour']:>9.1f}{r['mean_rate']:>11.3f}")
+
+    base, ordered = results['file order'], results['ordered']
+    better = (ordered['connects_per_hour'] > base['connects_per_hour'] and
+              ordered['mean_rate'] > base['mean_rate'])
+    print(f"Ordered dials more answerable leads first: {better}")
+    return 0 if better else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
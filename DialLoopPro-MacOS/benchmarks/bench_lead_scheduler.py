@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# bench_lead_scheduler.py
+"""
+LeadScheduler pop/update latency and memory with millions of queued leads
+
+Queues a few million lead rows (5M by default), re-prioritizes a random
+sample and pops from the full queue, reporting p50/p99/max latency per
+operation and bytes per queued lead (the key and heap arrays). Pop
+order is checked by tests/test_lead_scheduler.py.
+
+Usage: python3 bench_lead_scheduler.py [leads] [operations]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lead_scheduler import LeadScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def percentiles(samples):
+    """p50, p99 and max in microseconds"""
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+    return pick(50) * 1e6, pick(99) * 1e6, ordered[-1] * 1e6
+
+
+def main():
+    leads = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rng = random.Random(2)
+
+    clock = FakeClock()
+    start = time.perf_counter()
+    scheduler = LeadScheduler(clock)
+    scheduler.extend(0, leads)
+    build = time.perf_counter() - start
+    memory = sum(len(a) * a.itemsize for a in (
+        scheduler.score, scheduler.due, scheduler.attempts, scheduler.pos,
+        scheduler.ready, scheduler.waiting))
+    print(f"Queued {leads} leads in {build:.2f} s, "
+          f"{memory / leads:.1f} bytes per lead ({memory / 2**20:.0f} MiB)")
+
+    samples = []
+    for _ in range(operations):
+        row = rng.randrange(leads)
+        score = rng.random()
+        start = time.perf_counter()
+        scheduler.update(row, score=score)
+        samples.append(time.perf_counter() - start)
+    p50, p99, worst = percentiles(samples)
+    print(f"update (score): p50 {p50:.1f} us, p99 {p99:.1f} us, max {worst:.0f} us")
+
+    samples = []
+    for _ in range(operations // 10):
+        row = rng.randrange(leads)
+        due = clock.now + rng.randrange(60, 86400)
+        start = time.perf_counter()
+        scheduler.update(row, due=due)
+        samples.append(time.perf_counter() - start)
+    p50, p99, worst = percentiles(samples)
+    print(f"update (due):   p50 {p50:.1f} us, p99 {p99:.1f} us, max {worst:.0f} us")
+
+    samples = []
+    for _ in range(operations):
+        start = time.perf_counter()
+        scheduler.pop()
+        samples.append(time.perf_counter() - start)
+    pop_p50, pop_p99, worst = percentiles(samples)
+    print(f"pop:            p50 {pop_p50:.1f} us, p99 {pop_p99:.1f} us, max {worst:.0f} us "
+          f"({len(scheduler)} still queued)")
+
+    responsive = pop_p99 < 1000
+    print(f"p99 pop under 1 ms: {responsive}")
+    return 0 if responsive else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# bench_lead_server.py
+"""
+Lead server lease checks, and lease throughput with 200 concurrent clients
+
+Checks the lease rules against the in-process stand-in on a fake clock:
+leads leased to a client that goes away come back to other clients once
+the lease expires, a late claim on them is refused, claims and outcomes
+are only taken from the client that holds the lease or dialed the row, a
+claim keeps the client's prefetched lease alive, and leads buffered or
+handed out but not dialed are leased again at once after a close. Then
+serves a lead file (100k leads by default) from a LeadServer in a
+separate process and drains it with 200 RemoteLeadSource clients on
+their own connections, a tenth of which crash after their first lead
+without releasing their leases. Reports claims per second
+while every client is busy, next_lead() latency, and how long the
+crashed clients' leads took to be dialed once their leases expired, and
+checks every lead was dialed exactly once. Server and clients share the
+machine, so throughput is for both ends together.
+
+Usage: python3 bench_lead_server.py [leads] [clients] [lease_seconds]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from call_history import CONNECTED
+from lead_server import (LeadClient, LeadServer, LeaseQueue, LocalLeadClient,
+                         RemoteLeadSource)
+from lead_source import ScheduledLeadSource
+from redial import RedialPolicy
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def percentiles(samples):
+    """p50, p99 and max in milliseconds"""
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+    return pick(50) * 1e3, pick(99) * 1e3, ordered[-1] * 1e3
+
+
+def write_leads(path, leads):
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        for start in range(0, leads, 100000):
+            f.write(''.join(f"Lead {i},212{i % 10000000:07d}\n"
+                            for i in range(start, min(leads, start + 100000))))
+
+
+def check(name, ok, detail=''):
+    print(f"  {'ok ' if ok else 'FAIL'} {name}" + ('' if ok else f": {detail}"))
+    return 0 if ok else 1
+
+
+def drain(source):
+    """Dial every lead a source hands out now"""
+    rows = []
+    while True:
+        lead = source.next_lead()
+        if lead is None:
+            return rows
+        source.mark_dialed(lead)
+        rows.append(lead.row)
+
+
+def fresh_queue(lead_file, clock):
+    """LeaseQueue with nothing dialed yet and 60 s leases"""
+    with open(lead_file + '.cursor', 'w') as f:
+        f.write("0\n")
+    return LeaseQueue(ScheduledLeadSource(lead_file, clock=clock), 60, clock)
+
+
+def check_leases(tmp):
+    """Lease rules on the in-process stand-in; returns the number of failures"""
+    lead_file = os.path.join(tmp, 'small.csv')
+    write_leads(lead_file, 30)
+    clock = FakeClock(1_800_000_000.0)
+    queue = fresh_queue(lead_file, clock)
+    failures = 0
+
+    # A leases a batch, dials two leads and vanishes
+    crashed = LocalLeadClient(queue)
+    response = crashed.request('lease', client='a', count=10)
+    leased = [row for row, number in response['leads']]
+    for row in leased[:2]:
+        crashed.request('claim', client='a', lease=response['lease'], row=row)
+
+    b = RemoteLeadSource(LocalLeadClient(queue), 'b', batch=10)
+    rows = drain(b)
+    failures += check("other clients get the rest, not the abandoned lease",
+                      rows == list(range(11, 31)), rows)
+    failures += check("next_due is the lease expiry while leads are out",
+                      b.next_due() == clock.now + 60, b.next_due())
+
+    clock.now += 61
+    rows = drain(b)
+    failures += check("abandoned leads come back after the lease expires",
+                      rows == leased[2:], rows)
+    late = crashed.request('claim', client='a', lease=response['lease'], row=leased[2])
+    failures += check("a late claim on an expired lease is refused", not late['ok'])
+    other = crashed.request('outcome', client='a', row=leased[2], outcome=CONNECTED)
+    failures += check("an outcome for a row another client dialed is refused",
+                      not other['ok'])
+    own = crashed.request('outcome', client='a', row=leased[0], outcome=CONNECTED)
+    again = crashed.request('outcome', client='a', row=leased[0], outcome=CONNECTED)
+    failures += check("an outcome is taken once from the client that dialed the row",
+                      own['ok'] and not again['ok'], (own, again))
+
+    # Claims keep a client's prefetched lease alive
+    queue.close()
+    queue = fresh_queue(lead_file, clock)
+    e = LocalLeadClient(queue)
+    first = e.request('lease', client='e', count=1)
+    second = e.request('lease', client='e', count=1)
+    clock.now += 50
+    stolen = e.request('claim', client='x', lease=first['lease'], row=first['leads'][0][0])
+    failures += check("a claim on another client's lease is refused", not stolen['ok'])
+    e.request('claim', client='e', lease=first['lease'], row=first['leads'][0][0])
+    clock.now += 50
+    kept = e.request('claim', client='e', lease=second['lease'], row=second['leads'][0][0])
+    failures += check("a claim renews the client's other leases", kept['ok'])
+
+    # Leads buffered or handed out but not dialed by a client that closes go
+    # straight back
+    queue.close()
+    queue = fresh_queue(lead_file, clock)
+    c = RemoteLeadSource(LocalLeadClient(queue), 'c', batch=10)
+    c.mark_dialed(c.next_lead())
+    c.next_lead()  # never dialed
+    c.close()
+    d = RemoteLeadSource(LocalLeadClient(queue), 'd', batch=100)
+    rows = drain(d)
+    failures += check("leads buffered or not dialed on close are released",
+                      rows == list(range(2, 31)), rows)
+    stats = queue.stats()
+    failures += check("nothing left out on lease", stats['outstanding'] == 0, stats)
+    queue.close()
+    return failures
+
+
+def serve(lead_file, lease_seconds, ports):
+    """Server process: serve the lead file until terminated"""
+    source = ScheduledLeadSource(lead_file, redial=RedialPolicy())
+    server = LeadServer(LeaseQueue(source, lease_seconds), port=0)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def client_run(address, name, crash, results, lock):
+    """Dial leads from the server until there are none left"""
+    client = LeadClient(address)
+    source = RemoteLeadSource(client, name)
+    rows, claimed_at, samples, idle_at = [], [], [], None
+    while True:
+        t0 = time.perf_counter()
+        lead = source.next_lead()
+        samples.append(time.perf_counter() - t0)
+        if lead is None:
+            due = source.next_due()
+            if due is None:
+                break
+            if idle_at is None:
+                idle_at = time.time()
+            time.sleep(min(0.25, max(0.01, due - time.time())))
+            continue
+        source.mark_dialed(lead)
+        rows.append(lead.row)
+        claimed_at.append(time.time())
+        source.record_outcome(lead, CONNECTED)  # never redialed
+        if crash:
+            client.close()  # gone without releasing anything
+            break
+    if not crash:
+        source.close()
+    with lock:
+        results.append((rows, claimed_at, samples[:-1], idle_at))
+
+
+def bench_clients(tmp, leads, clients, lease_seconds):
+    """Drain a served lead file with many clients; returns the number of failures"""
+    lead_file = os.path.join(tmp, 'leads.csv')
+    write_leads(lead_file, leads)
+    ScheduledLeadSource(lead_file).close()  # index the file up front
+
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(lead_file, lease_seconds, ports),
+                                     daemon=True)
+    server.start()
+    address = f"127.0.0.1:{ports.get(timeout=60)}"
+
+    results, lock = [], threading.Lock()
+    crashes = max(1, clients // 10)
+    threads = [threading.Thread(target=client_run,
+                                args=(address, f"agent-{i}", i < crashes, results, lock))
+               for i in range(clients)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    stats = LeadClient(address).request('stats')
+    server.terminate()
+    server.join()
+
+    rows = [row for result in results for row in result[0]]
+    samples = [s for result in results for s in result[2]]
+    first_idle = min((result[3] for result in results if result[3] is not None),
+                     default=start + elapsed)
+    busy = first_idle - start
+    busy_claims = sum(1 for result in results for t in result[1] if t < first_idle)
+    p50, p99, worst = percentiles(samples)
+    print(f"{clients} clients, {leads} leads, {crashes} crash holding leases, "
+          f"lease {lease_seconds:g} s")
+    print(f"  drained in {elapsed:.1f} s; {stats['claimed']} claims, {stats['leased']} leased, "
+          f"{stats['expired']} expired and leased again")
+    print(f"  throughput: {busy_claims / busy:.0f} claims/s over {busy:.1f} s with every "
+          f"client busy, {len(rows) / elapsed:.0f} claims/s overall")
+    print(f"  abandoned leases: expired after {lease_seconds:g} s, their leads dialed "
+          f"{elapsed - busy:.1f} s after the first client ran dry")
+    print(f"  next_lead: p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {worst:.0f} ms")
+
+    counts = Counter(rows)
+    failures = check("no lead dialed twice", max(counts.values()) == 1,
+                     [row for row, n in counts.items() if n > 1][:10])
+    failures += check("every lead dialed, abandoned leases included",
+                      sorted(counts) == list(range(1, leads + 1)),
+                      f"{len(counts)} of {leads}")
+    failures += check("abandoned leads expired and came back", stats['expired'] > 0, stats)
+    return failures
+
+
+def main():
+    leads = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    lease_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Leases (in-process stand-in):")
+        failures = check_leases(tmp)
+        failures += bench_clients(tmp, leads, clients, lease_seconds)
+
+    print(f"Failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# bench_parallel_dialing.py
+"""
+Connects per agent-hour and abandon rate against the number of lines
+
+Runs the simulated dial loop for the same simulated period with 1, 2,
+3, 4 and 6 lines and reports dials, connects per agent-hour, the share
+of the agent's time spent talking, the abandon rate (answers hung up
+because the agent was busy, over all answers) and how long it took to
+route a connect and clear the other lines.
+
+Runs twice: a typical list (15% answer, 90 s talks), where answers on
+two lines at once are rare, and a busy one (50% answer, 20 s talks),
+where they are common enough to exercise holding and abandoning.
+
+Usage: python3 bench_parallel_dialing.py [minutes] [scale] [hold_seconds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from simulator_backend import create_simulated_engine
+
+LINES = (1, 2, 3, 4, 6)
+
+# (name, answer rate, talk time (mean, sd) in seconds)
+LISTS = (
+    ('typical', 0.15, (90.0, 60.0)),
+    ('busy', 0.50, (20.0, 10.0)),
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def run(workdir, lines, minutes, scale, hold_seconds, answer_rate, talk_time):
+    """Dial for a simulated period; returns metrics"""
+    os.makedirs(workdir)
+    engine, backend = create_simulated_engine(workdir, scale, lines=lines, seed=lines,
+                                              answer_rate=answer_rate, talk_time=talk_time, skip_rate=0.0)
+    engine.config_manager.update_config({
+        'Configuration': {'HoldSeconds': str(hold_seconds)}
+    })
+    engine.load_configuration()
+    engine.on_warning = lambda title, text: None
+
+    start = time.perf_counter()
+    engine.start()
+    time.sleep(minutes * 60 * scale)
+    while not engine.stop():
+        backend.end_call()
+    engine.dial_thread.join()
+    hours = (time.perf_counter() - start) / scale / 3600
+    engine.shutdown()
+
+    # Single-line answers all reach the agent
+    answers = backend.picked_up if lines > 1 else backend.answered
+    latencies = list(engine.dialer.latencies) if engine.dialer is not None else []
+    return {
+        'dials': backend.dials,
+        'connects': backend.answered,
+        'per_hour': backend.answered / hours,
+        'talk_share': engine.total_talk_time / 1000 / 3600 / hours,
+        'abandoned': engine.abandoned_calls,
+        'abandon_rate': engine.abandoned_calls / answers if answers else 0.0,
+        'clear_p50': percentile(latencies, 50),
+        'clear_max': max(latencies, default=0.0),
+    }
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 120
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+    hold_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, answer_rate, talk_time in LISTS:
+            results[name] = {
+                lines: run(os.path.join(tmp, f"{name}_{lines}"), lines, minutes, scale,
+                           hold_seconds, answer_rate, talk_time)
+                for lines in LINES
+            }
+            print(f"{name.capitalize()} list: simulated {minutes:g} min per run, answer rate "
+                  f"{answer_rate:.0%}, talk {talk_time[0]:g} s, hold {hold_seconds:g} s")
+            print(f"{'lines':>5}{'dials':>7}{'connects':>10}{'conn/hr':>9}{'talking':>9}"
+                  f"{'abandon':>9}{'clear p50':>11}{'clear max':>11}")
+            for lines, r in results[name].items():
+                print(f"{lines:>5}{r['dials']:>7}{r['connects']:>10}{r['per_hour']:>9.1f}"
+                      f"{r['talk_share']:>8.0%}{r['abandon_rate']:>9.1%}"
+                      f"{r['clear_p50']:>10.2f}s{r['clear_max']:>10.2f}s")
+
+    rates = [results['typical'][lines]['per_hour'] for lines in LINES]
+    scales = all(b > a for a, b in zip(rates, rates[1:4]))
+    print(f"Connects per agent-hour rise with lines (1-4): {scales}")
+    abandoned = sum(results['busy'][lines]['abandoned'] for lines in LINES if lines > 1)
+    print(f"Busy list abandons answers with more than one line: {abandoned > 0} ({abandoned})")
+    return 0 if scales and abandoned else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
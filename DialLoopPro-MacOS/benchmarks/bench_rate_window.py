@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# bench_rate_window.py
+"""
+RateWindow against a full event-list reference
+
+Feeds a simulated multi-hour session of calls (steady dialing with
+bursts and pauses) into RateWindow, querying the 5, 15 and 60 minute
+counts as it goes, and checks every answer against a reference computed
+by bisecting the complete list of call times. Also reports the cost per
+add/count and shows how the old session-average rate drifts from the
+true last-hour rate.
+
+Usage: python3 bench_rate_window.py [hours] [seed]
+"""
+
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rate_window import RateWindow
+
+
+def session_events(hours, rng, start=1_700_000_000.0):
+    """Call times: ~90/hr steady, with 5-minute bursts and idle breaks"""
+    t = start
+    end = start + hours * 3600
+    while t < end:
+        mode = rng.random()
+        if mode < 0.1:
+            t += rng.uniform(300, 5400)  # break (sometimes over an hour)
+            continue
+        gap = 8 if mode < 0.25 else 40  # burst or steady
+        for _ in range(rng.randint(5, 40)):
+            t += rng.expovariate(1 / gap)
+            yield t
+
+
+def reference_count(events, window, now):
+    """Calls whose second lies in the window ending at floor(now)"""
+    second = int(now)
+    return (bisect_right(events, second + 1 - 1e-9)
+            - bisect_right(events, second - window + 1 - 1e-9))
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rng = random.Random(seed)
+    events = list(session_events(hours, rng))
+
+    rates = RateWindow()
+    mismatches = 0
+    checks = 0
+    worst_drift = 0.0
+    add_time = count_time = 0.0
+    for i, t in enumerate(events):
+        start = time.perf_counter()
+        rates.add(t)
+        add_time += time.perf_counter() - start
+
+        # Query at a few points before the next call
+        following = events[i + 1] if i + 1 < len(events) else t + 60
+        for now in sorted(rng.uniform(t, following) for _ in range(3)):
+            for window in rates.windows:
+                start = time.perf_counter()
+                got = rates.count(window, now)
+                count_time += time.perf_counter() - start
+                checks += 1
+                if got != reference_count(events[:i + 1], window, now):
+                    mismatches += 1
+
+            elapsed = now - events[0]
+            if elapsed >= 3600:
+                session_average = (i + 1) * 3600 / elapsed
+                true_rate = rates.count(3600, now)
+                worst_drift = max(worst_drift, abs(session_average - true_rate))
+
+    print(f"Calls:           {len(events)} over {hours:g} h")
+    print(f"Checks:          {checks} window counts, {mismatches} mismatches")
+    print(f"add():           {add_time / len(events) * 1e6:.2f} us")
+    print(f"count():         {count_time / checks * 1e6:.2f} us")
+    print(f"Session average vs true last hour: up to {worst_drift:.1f} calls/hr apart")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
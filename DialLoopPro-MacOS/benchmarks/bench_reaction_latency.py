@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# bench_reaction_latency.py
+"""
+Dial-loop reaction latency to Hangup & Next, On/Off Call and stop
+
+Drives DialEngine against a SimulatorBackend with no simulated agent and
+a long wait time, so the loop is always parked in WAITING or ON_CALL
+when a button is pressed. Reports how many milliseconds pass between
+the press and the loop leaving that state, and fails if the p95 is over
+the budget.
+
+Usage: python3 bench_reaction_latency.py [rounds] [budget_ms]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dial_engine import ON_CALL, WAITING
+from simulator_backend import create_simulated_engine
+
+
+class StateWatcher:
+    """Record when the engine enters each state"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.changed = threading.Condition()
+        self.left = {}
+        engine.state_listeners.append(self.on_state)
+
+    def on_state(self, state):
+        with self.changed:
+            self.entered = state
+            self.left[self.previous] = time.perf_counter()
+            self.previous = state
+            self.changed.notify_all()
+
+    def reset(self):
+        self.previous = self.engine.state
+        self.entered = self.engine.state
+
+    def wait_for(self, state, timeout=10):
+        with self.changed:
+            if not self.changed.wait_for(lambda: self.entered == state, timeout):
+                raise RuntimeError(f"engine never reached {state}")
+
+    def wait_left(self, state, timeout=10):
+        with self.changed:
+            if not self.changed.wait_for(lambda: state in self.left, timeout):
+                raise RuntimeError(f"engine never left {state}")
+            return self.left.pop(state)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(1)
+    latencies = {'hangup_next': [], 'call_on': [], 'call_off': [], 'stop': []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, backend = create_simulated_engine(
+            tmp, time_scale=0.01, wait_time=600000,
+            answer_rate=0.0, skip_rate=0.0, seed=1)
+        engine.on_warning = lambda title, text: None
+        watcher = StateWatcher(engine)
+
+        for _ in range(rounds):
+            watcher.reset()
+            watcher.left.clear()
+            engine.start()
+
+            # Hangup & Next while waiting
+            watcher.wait_for(WAITING)
+            time.sleep(rng.uniform(0.01, 0.2))
+            watcher.left.clear()
+            pressed = time.perf_counter()
+            engine.hangup_next()
+            latencies['hangup_next'].append(watcher.wait_left(WAITING) - pressed)
+
+            # Call answered while waiting, then ended
+            watcher.wait_for(WAITING)
+            time.sleep(rng.uniform(0.01, 0.2))
+            watcher.left.clear()
+            pressed = time.perf_counter()
+            engine.toggle_call()
+            latencies['call_on'].append(watcher.wait_left(WAITING) - pressed)
+
+            watcher.wait_for(ON_CALL)
+            time.sleep(rng.uniform(0.01, 0.2))
+            watcher.left.clear()
+            engine.toggle_call()
+            released = time.perf_counter()
+            latencies['call_off'].append(
+                max(0.0, watcher.wait_left(ON_CALL) - released))
+
+            # Stop while waiting
+            watcher.wait_for(WAITING)
+            time.sleep(rng.uniform(0.01, 0.2))
+            watcher.left.clear()
+            pressed = time.perf_counter()
+            engine.stop()
+            latencies['stop'].append(watcher.wait_left(WAITING) - pressed)
+            engine.dial_thread.join()
+
+        engine.shutdown()
+
+    print(f"{'Signal':<12}{'n':>5}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    worst = 0.0
+    for name, values in latencies.items():
+        ms = [v * 1000 for v in values]
+        p95 = percentile(ms, 95)
+        worst = max(worst, p95)
+        print(f"{name:<12}{len(ms):>5}{percentile(ms, 50):>9.2f}"
+              f"{p95:>9.2f}{max(ms):>9.2f}")
+
+    if worst > budget_ms:
+        print(f"FAIL: p95 reaction {worst:.2f} ms over {budget_ms:g} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
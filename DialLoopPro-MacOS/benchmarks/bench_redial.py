@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# bench_redial.py
+"""
+Redial policy checks, and redial store cost with millions of leads
+
+Runs a small lead file through ScheduledLeadSource with a redial policy
+on a fake clock: every lead that does not connect must come back after
+4 h, then a day, then 3 days (with a restart in between) and stop after
+four attempts, and connected leads must never come back. Then records a
+no-answer outcome for every row of a large lead file (2M by default),
+reopens it the way a restart does, and reports per-record cost, store
+size, restart time and pop latency with every lead waiting on a redial.
+
+Usage: python3 bench_redial.py [leads]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from call_history import CONNECTED, NO_ANSWER, STOPPED
+from lead_source import ScheduledLeadSource
+from redial import RedialPolicy, RedialStore
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def percentiles(samples):
+    """p50, p99 and max in microseconds"""
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+    return pick(50) * 1e6, pick(99) * 1e6, ordered[-1] * 1e6
+
+
+def write_leads(path, leads):
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        for start in range(0, leads, 100000):
+            f.write(''.join(f"Lead {i},212{i % 10000000:07d}\n"
+                            for i in range(start, min(leads, start + 100000))))
+
+
+def dial_due(source, outcome_for):
+    """Dial every lead that is due; returns the rows dialed"""
+    rows = []
+    while True:
+        lead = source.next_lead()
+        if lead is None:
+            return rows
+        source.mark_dialed(lead)
+        source.record_outcome(lead, outcome_for(lead.row))
+        rows.append(lead.row)
+
+
+def check_policy(tmp):
+    """Redials come back on the policy's spacing; returns the number of failures"""
+    lead_file = os.path.join(tmp, 'small.csv')
+    write_leads(lead_file, 8)
+    policy = RedialPolicy.from_settings('4h, 1d, 3d', 4, 'stopped: 0')
+    clock = FakeClock(1_800_000_000.0)
+    outcome_for = lambda row: (CONNECTED if row % 4 == 1 else
+                               STOPPED if row == 2 else NO_ANSWER)
+
+    source = ScheduledLeadSource(lead_file, clock=clock, redial=policy)
+    steps = [dial_due(source, outcome_for)]
+    for seconds in (4 * 3600 - 1, 1, 86400):
+        clock.now += seconds
+        steps.append(dial_due(source, outcome_for))
+        if seconds == 1:
+            source.close()  # restart: redials must come back from the store
+            source = ScheduledLeadSource(lead_file, clock=clock, redial=policy)
+    for seconds in (3 * 86400, 30 * 86400):
+        clock.now += seconds
+        steps.append(dial_due(source, outcome_for))
+    source.close()
+
+    # Row 2 is stopped every time, so it is redialed at once (ahead of the
+    # fresh leads, as a due redial) until it has used up four
+    retried = [3, 4, 6, 7, 8]
+    expected = [[1, 2, 2, 2, 2, 3, 4, 5, 6, 7, 8], [], retried, retried, retried, []]
+    ok = steps == expected
+    print(f"  {'ok ' if ok else 'FAIL'} redials follow 4h, 1d, 3d spacing across a restart"
+          + ('' if ok else f": {steps}"))
+    return 0 if ok else 1
+
+
+def main():
+    leads = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+
+    print("Policy:")
+    with tempfile.TemporaryDirectory() as tmp:
+        failures = check_policy(tmp)
+
+        lead_file = os.path.join(tmp, 'leads.csv')
+        write_leads(lead_file, leads)
+        policy = RedialPolicy()
+        start = 1_800_000_000.0
+        clock = FakeClock(start)
+        store = RedialStore(lead_file + '.redial', policy)
+        t0 = time.perf_counter()
+        for row in range(1, leads + 1):
+            clock.now = start + row * 0.01
+            store.record(row, NO_ANSWER, clock.now)
+        store.close()
+        seconds = time.perf_counter() - t0
+        size = os.path.getsize(lead_file + '.redial')
+        print(f"record: {leads} outcomes in {seconds:.2f} s, "
+              f"{seconds / leads * 1e6:.2f} us each, store {size / 1e6:.1f} MB "
+              f"({size / leads:.0f} B per lead)")
+
+        t0 = time.perf_counter()
+        store = RedialStore(lead_file + '.redial', policy)
+        load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pending = len(store.pending_rows())
+        scan = time.perf_counter() - t0
+        print(f"reopen: load {load:.2f} s, {pending} pending redials found in {scan:.2f} s")
+
+        # Restart just before the first redial is due, with every lead dialed
+        # once (the lead file index is built first - it is not redial cost)
+        ScheduledLeadSource(lead_file).close()
+        with open(lead_file + '.cursor', 'w') as f:
+            f.write(f"{leads + 1}\n")
+        clock.now = start + 4 * 3600 - 60
+        t0 = time.perf_counter()
+        source = ScheduledLeadSource(lead_file, clock=clock, redial=policy)
+        restart = time.perf_counter() - t0
+        print(f"restart: {len(source.scheduler)} redials queued in {restart:.2f} s, "
+              f"next due at +{source.next_due() - start:.0f} s")
+
+        samples = []
+        dialed = []
+        # About one redial comes due per dial
+        for i in range(100000):
+            clock.now = start + 4 * 3600 + i * 0.01
+            t0 = time.perf_counter()
+            lead = source.next_lead()
+            samples.append(time.perf_counter() - t0)
+            if lead is None:
+                continue
+            dialed.append((clock.now, source.redials.due_time(lead.row)))
+            source.mark_dialed(lead)
+            source.record_outcome(lead, CONNECTED)
+        p50, p99, worst = percentiles(samples)
+        print(f"next_lead with {leads} waiting: p50 {p50:.1f} us, p99 {p99:.1f} us, "
+              f"max {worst:.0f} us")
+        early = sum(1 for now, due in dialed if now < due)
+        source.close()
+        ok = bool(dialed) and not early
+        failures += not ok
+        print(f"  {'ok ' if ok else 'FAIL'} {len(dialed)} redials dialed, none early")
+
+    print(f"Failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
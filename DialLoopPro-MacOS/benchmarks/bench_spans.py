@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# bench_spans.py
+"""
+Span instrumentation overhead and export check
+
+Times the engine's phase() wrapper with and without span recording,
+checks that concurrent writers and the JSONL exporter account for every
+span (exported + dropped == recorded), and runs the simulator with
+export enabled to compare instrumentation cost to CPU per call.
+
+Usage: python3 bench_spans.py [iterations] [simulated_minutes]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from simulator_backend import create_simulated_engine
+from spans import SpanExporter, SpanRing
+
+
+class NullRing:
+    """Stand-in ring that records nothing"""
+
+    def record(self, name, start, seconds, call=None):
+        pass
+
+
+def bench_phase(engine, iterations):
+    """Seconds per phase() enter/exit"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with engine.phase('dial'):
+            pass
+    return (time.perf_counter() - start) / iterations
+
+
+def check_export(workdir, writers=4, per_writer=50000):
+    """Concurrent writers against a small ring with a fast exporter"""
+    ring = SpanRing(capacity=1024)
+    path = os.path.join(workdir, 'spans.jsonl')
+    exporter = SpanExporter(ring, path, interval=0.01)
+
+    def write():
+        for i in range(per_writer):
+            ring.record('dial', time.time(), 0.001, i)
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    exporter.close()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    seqs = [line['seq'] for line in lines]
+    assert seqs == sorted(set(seqs)), "spans exported out of order or twice"
+    assert exporter.exported == len(lines)
+    return writers * per_writer, exporter.exported, exporter.dropped
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    minutes = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, backend = create_simulated_engine(tmp, time_scale=0.01, seed=1)
+        engine.on_warning = lambda title, text: None
+
+        with_spans = bench_phase(engine, iterations)
+        ring, engine.spans = engine.spans, NullRing()
+        without_spans = bench_phase(engine, iterations)
+        engine.spans = ring
+        span_cost = with_spans - without_spans
+
+        recorded, exported, dropped = check_export(tmp)
+
+        engine.enable_span_export(os.path.join(tmp, 'engine_spans.jsonl'), 0.5)
+        cpu_start = time.process_time()
+        engine.start()
+        time.sleep(minutes * 60 * engine.time_scale)
+        while not engine.stop():
+            backend.end_call()
+        engine.dial_thread.join()
+        cpu = time.process_time() - cpu_start
+        engine.shutdown()
+
+        spans_per_call = engine.span_exporter.exported / max(1, backend.dials)
+        cpu_per_call = cpu / max(1, backend.dials)
+        overhead = spans_per_call * with_spans / cpu_per_call
+
+    print(f"phase() with spans:    {with_spans * 1e6:.2f} us")
+    print(f"phase() without spans: {without_spans * 1e6:.2f} us")
+    print(f"Span record cost:      {span_cost * 1e6:.2f} us")
+    print(f"Export check:          {recorded} recorded, {exported} exported, "
+          f"{dropped} dropped")
+    print(f"Simulated dials:       {backend.dials}, "
+          f"{spans_per_call:.1f} spans/call, {cpu_per_call * 1000:.1f} ms CPU/call")
+    print(f"Instrumentation share: {overhead:.3%} of CPU per call")
+
+    assert recorded == exported + dropped, "spans unaccounted for"
+    return 0 if overhead < 0.01 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# bench_startup.py
+"""
+Import time and first-window time against a startup budget
+
+Imports each entry module in fresh interpreters and reports the median
+import time, the slowest modules it pulls in (from -X importtime), and
+whether any heavy or platform module (numpy, pyautogui, pyobjc, pynput,
+PyQt5 where not needed) was loaded at import rather than on first use. Where PyQt5 is installed, also times a cold start to the
+window shown and painted (offscreen). Fails if a module goes over its
+budget or loads a heavy module eagerly, so a new top-level import shows
+up here before it shows up as a slow start.
+
+Usage: python3 bench_startup.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Median cumulative import time allowed per entry module (ms)
+BUDGET_MS = {
+    'dial_engine': 60,
+    'dialloop_cli': 30,
+    'mac_automation': 30,
+    'dialloop_mac': 400,
+}
+FIRST_WINDOW_BUDGET_MS = 1500
+
+# Loaded on first use only (the window needs Qt itself)
+HEAVY = ('numpy', 'pyautogui', 'AppKit', 'Quartz', 'Foundation', 'objc', 'pynput',
+         'applescript', 'PyQt5')
+NEEDS = {'dialloop_mac': ('PyQt5',)}
+
+# Modules that are now deferred, for what they would add to a start
+DEFERRED = ('numpy', 'suppression', 'pyautogui', 'AppKit', 'pynput')
+
+FIRST_WINDOW = """
+import sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import dialloop_mac
+window = dialloop_mac.DialLoopMac()
+window.show()
+app.processEvents()
+print((time.perf_counter() - start) * 1000)
+window.engine.shutdown()
+"""
+
+
+def python(code, *flags, env=None):
+    """Run code in a fresh interpreter in src; returns the CompletedProcess"""
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=SRC,
+                          capture_output=True, text=True, env=env)
+
+
+def import_ms(module):
+    """Wall time of importing module in a fresh interpreter (ms), or None"""
+    result = python(f"import time; t0 = time.perf_counter(); import {module}; "
+                    f"print((time.perf_counter() - t0) * 1000)")
+    return float(result.stdout) if result.returncode == 0 else None
+
+
+def slowest_imports(module, count=3):
+    """The modules that take longest to import themselves, from -X importtime"""
+    result = python(f"import {module}", '-X', 'importtime')
+    self_ms = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'self [us]' not in line:
+            own, cumulative, name = line[len('import time:'):].split('|')
+            self_ms.append((int(own) / 1000, name.strip()))
+    return sorted(self_ms, reverse=True)[:count]
+
+
+def loaded_heavy(module):
+    """Heavy modules in sys.modules after importing module"""
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & "
+            f"set({list(HEAVY)!r}))))")
+    result = python(code)
+    if result.returncode != 0:
+        return None, (result.stderr.strip().splitlines() or ['failed'])[-1]
+    allowed = NEEDS.get(module, ())
+    return [m for m in json.loads(result.stdout) if m not in allowed], None
+
+
+def check(name, ok, detail=''):
+    print(f"  {'ok ' if ok else 'FAIL'} {name}" + ('' if ok else f": {detail}"))
+    return 0 if ok else 1
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    failures = 0
+
+    print(f"Import time, median of {runs} fresh interpreters (budget):")
+    for module, budget in BUDGET_MS.items():
+        heavy, error = loaded_heavy(module)
+        if heavy is None:
+            print(f"  skip {module}: not importable here ({error})")
+            continue
+        total = statistics.median(import_ms(module) for _ in range(runs))
+        print(f"  {module:<15}{total:>7.1f} ms ({budget} ms)  slowest: " +
+              ', '.join(f"{name} {ms:.1f}" for ms, name in slowest_imports(module)))
+        failures += check(f"{module} within budget", total <= budget,
+                          f"{total:.1f} ms > {budget} ms")
+        failures += check(f"{module} loads no heavy module at import", not heavy, heavy)
+
+    print("Deferred to first use (import time where installed):")
+    for module in DEFERRED:
+        times = [import_ms(module) for _ in range(3)]
+        if None in times:
+            print(f"  {module:<15}    not installed")
+            continue
+        print(f"  {module:<15}{statistics.median(times):>7.1f} ms")
+
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = python(FIRST_WINDOW, env=env)
+    if result.returncode != 0:
+        reason = (result.stderr.strip().splitlines() or ['failed'])[-1]
+        print(f"First window: not measured here ({reason})")
+    else:
+        times = [float(result.stdout.split()[0])]
+        times += [float(python(FIRST_WINDOW, env=env).stdout.split()[0])
+                  for _ in range(2)]
+        first = statistics.median(times)
+        print(f"First window: {first:.0f} ms to shown and painted "
+              f"({FIRST_WINDOW_BUDGET_MS} ms)")
+        failures += check("first window within budget", first <= FIRST_WINDOW_BUDGET_MS,
+                          f"{first:.0f} ms")
+
+    print(f"Failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
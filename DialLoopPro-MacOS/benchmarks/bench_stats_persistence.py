@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# bench_stats_persistence.py
+"""
+Persistence cost per dial: full stats.ini rewrites vs. the stats journal
+
+Usage: python3 bench_stats_persistence.py [dials]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stats_manager import StatsManager
+
+
+def bench_full_rewrite(stats, dials):
+    """Old behaviour: two full INI rewrites per dial"""
+    start = time.perf_counter()
+    for i in range(1, dials + 1):
+        stats.stats['Daily']['Calls'] = str(i)
+        stats.write_snapshot()
+        stats.stats['Lifetime']['TotalCalls'] = str(i)
+        stats.stats['Weekly']['TotalCalls'] = str(i)
+        stats.write_snapshot()
+    return time.perf_counter() - start
+
+
+def bench_journal(stats, dials):
+    """New behaviour: journaled updates with group commit"""
+    start = time.perf_counter()
+    for i in range(1, dials + 1):
+        stats.save_daily_count(i)
+        stats.save_stats({'total_calls': i, 'weekly_calls': i})
+    elapsed = time.perf_counter() - start
+    stats.close()
+    return elapsed
+
+
+def main():
+    dials = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = StatsManager(os.path.join(tmp, 'before.ini'))
+        full = bench_full_rewrite(before, dials)
+        before.close()
+
+        path = os.path.join(tmp, 'after.ini')
+        after = StatsManager(path)
+        journal = bench_journal(after, dials)
+
+        # The rebuilt counters must match what was written
+        check = StatsManager(path).load_stats()
+        assert check['total_calls'] == dials, check
+        assert check['session_calls'] == dials, check
+
+        print(f"Dials:             {dials}")
+        print(f"Full rewrite:      {full / dials * 1e6:9.1f} us/dial")
+        print(f"Journal (dial thr):{journal / dials * 1e6:9.1f} us/dial")
+        print(f"Journal batches:   {after.journal.writes} fsyncs "
+              f"({after.journal.writes / dials:.3f} per dial)")
+        print(f"Speedup:           {full / journal:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
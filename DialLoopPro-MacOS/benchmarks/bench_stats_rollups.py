@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_stats_rollups.py
+"""
+Statistics dialog load time over two years of call history
+
+Fills a CallHistory with a simulated two years of attempts, then times
+what opening the statistics dialog costs: opening the database and
+reading CallHistory.summary() from the rollup tables. For comparison it
+runs the equivalent GROUP BY over the raw attempts, and checks the
+daily and weekly rollups against that scan.
+
+Usage: python3 bench_stats_rollups.py [attempts] [days]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from call_history import CONNECTED, FORCED_NEXT, NO_ANSWER, CallHistory, period_keys
+
+
+def fill(history, attempts, days, seed=1):
+    """Attempts spread over working hours of the last `days` days"""
+    rng = random.Random(seed)
+    now = time.time()
+    start = now - days * 86400
+    for _ in range(attempts):
+        dialed_at = start + rng.random() * days * 86400
+        roll = rng.random()
+        outcome = CONNECTED if roll < 0.15 else FORCED_NEXT if roll < 0.2 else NO_ANSWER
+        talk_ms = rng.randint(10000, 300000) if outcome == CONNECTED else 0
+        history.record(dialed_at, None, None, rng.randint(2000, 35000),
+                       outcome, talk_ms)
+
+
+def raw_scan(path):
+    """Daily and weekly totals the slow way: every attempt, every time"""
+    db = sqlite3.connect(path)
+    daily, weekly = {}, {}
+    for dialed_at, outcome in db.execute("SELECT dialed_at, outcome FROM attempts"):
+        _, day, week = period_keys(datetime.fromtimestamp(dialed_at))
+        connected = outcome == CONNECTED
+        for totals, key in ((daily, day), (weekly, week)):
+            counts = totals.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] += connected
+    db.close()
+    return daily, weekly
+
+
+def main():
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 730
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.db')
+
+        start = time.perf_counter()
+        history = CallHistory(path, batch_size=20000)
+        fill(history, attempts, days)
+        history.close()
+        fill_seconds = time.perf_counter() - start
+
+        # What the dialog does on open
+        start = time.perf_counter()
+        history = CallHistory(path)
+        summary = history.summary()
+        open_seconds = time.perf_counter() - start
+        daily = {row[0]: list(row[1:3]) for row in history.rollups('daily')}
+        weekly = {row[0]: list(row[1:3]) for row in history.rollups('weekly')}
+        history.close()
+
+        start = time.perf_counter()
+        raw_daily, raw_weekly = raw_scan(path)
+        scan_seconds = time.perf_counter() - start
+
+    print(f"History:        {attempts} attempts over {days} days "
+          f"(filled in {fill_seconds:.1f} s)")
+    print(f"Dialog open:    {open_seconds * 1000:.1f} ms "
+          f"({sum(len(summary[k]) for k in ('hourly', 'daily', 'weekly'))} rollup rows, "
+          f"lifetime {summary['lifetime'][0]} attempts)")
+    print(f"Raw scan:       {scan_seconds * 1000:.0f} ms")
+    matches = daily == raw_daily and weekly == raw_weekly
+    print(f"Rollups match raw scan: {matches}")
+    return 0 if matches and open_seconds < 0.1 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# bench_suppression.py
+"""
+Lookup latency and memory of the do-not-call suppression index
+
+Usage: python3 bench_suppression.py [entries] [--bloom]
+"""
+
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+
+from suppression import SuppressionIndex, write_bloom, write_index
+
+LOOKUPS = 200_000
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), else peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == 'darwin' else rss / 1024
+
+
+def time_lookups(index, values):
+    start = time.perf_counter()
+    contains = index.contains
+    for v in values:
+        contains(v)
+    return (time.perf_counter() - start) / len(values) * 1e9
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000_000
+    use_bloom = '--bloom' in sys.argv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dnc.txt.sup')
+        bloom = os.path.join(tmp, 'dnc.txt.bloom')
+
+        rng = np.random.default_rng(7)
+        numbers = np.unique(rng.integers(12002000000, 19899999999,
+                                         size=entries, dtype=np.int64))
+        numbers = numbers.astype(np.uint64)
+        write_index(path, numbers)
+        if use_bloom:
+            write_bloom(bloom, numbers)
+
+        hits = [int(v) for v in numbers[rng.integers(0, len(numbers), LOOKUPS)]]
+        misses = [random.randrange(12002000000, 19899999999) for _ in range(LOOKUPS)]
+        del numbers
+
+        before = rss_mb()
+        start = time.perf_counter()
+        index = SuppressionIndex(path, bloom if use_bloom else None)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        assert all(index.contains(v) for v in hits[:10000])
+
+        cold_ns = time_lookups(index, hits)
+        after = rss_mb()
+        hit_ns = time_lookups(index, hits)
+        miss_ns = time_lookups(index, misses)
+
+        print(f"Entries:        {len(index):,} ({os.path.getsize(path) / 2**20:.0f} MB on disk)")
+        print(f"Bloom filter:   {'yes' if use_bloom else 'no'}")
+        print(f"Open:           {open_ms:.2f} ms")
+        print(f"Lookup (cold):  {cold_ns:.0f} ns (first touch of mapped pages)")
+        print(f"Lookup (hit):   {hit_ns:.0f} ns")
+        print(f"Lookup (miss):  {miss_ns:.0f} ns")
+        print(f"RSS growth:     {after - before:.1f} MB after {LOOKUPS:,} random "
+              f"lookups (file-backed, reclaimable)")
+        print(f"Python set est: {len(index) * 90 / 2**20:,.0f} MB (~90 B/entry)")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
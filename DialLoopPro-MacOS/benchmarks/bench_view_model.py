@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# bench_view_model.py
+"""
+Front-end signal volume and GUI-thread cost over a simulated hour
+
+Runs DialEngine against the simulator with the window's slots replaced
+by a headless stand-in: a DisplayModel fed by the engine callbacks, a
+200 ms countdown timer and a 1 s stats timer (both in simulated time).
+Counts engine-to-GUI signals, widget updates and stylesheet changes,
+and the CPU spent in the slots, and compares them with the previous
+design (full stats push every second, countdown status ten times a
+second, setStyleSheet on every status) estimated from the same run.
+
+Usage: python3 bench_view_model.py [simulated_minutes] [time_scale]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from simulator_backend import create_simulated_engine
+from view_model import DisplayModel
+
+# Fields the old update_display pushed every second (stats dict + progress)
+LEGACY_FIELDS_PER_SECOND = 7
+
+
+class HeadlessWindow:
+    """GUI-thread stand-in: one lock plays the Qt event loop"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.signals = Counter()
+        self.widget_updates = 0
+        self.style_changes = 0
+        self.cpu = 0.0
+        self.display = DisplayModel(self.render_fields, engine.time_scale)
+        engine.on_status = self.slot('status', self.display.set_status)
+        engine.on_stats = self.slot('stats', lambda stats: self.display.refresh(engine))
+        engine.on_countdown = self.slot('countdown', self.display.start_countdown)
+
+    def slot(self, name, handler):
+        def emit(*args):
+            self.signals[name] += 1
+            self.run(handler, *args)
+        return emit
+
+    def run(self, handler, *args):
+        with self.lock:
+            start = time.thread_time()
+            handler(*args)
+            self.cpu += time.thread_time() - start
+
+    def render_fields(self, changed):
+        self.widget_updates += len(changed)
+        if 'status_kind' in changed:
+            self.style_changes += 1
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    time_scale = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, backend = create_simulated_engine(tmp, time_scale, seed=1)
+        engine.on_warning = lambda title, text: None
+        window = HeadlessWindow(engine)
+
+        phase_seconds = Counter()
+        engine.phase_listeners.append(
+            lambda name, seconds: phase_seconds.update({name: seconds}))
+
+        engine.start()
+        ticks = 0
+        end = time.monotonic() + minutes * 60 * time_scale
+        while time.monotonic() < end:
+            time.sleep(0.2 * time_scale)
+            window.run(window.display.tick)
+            ticks += 1
+            if ticks % 5 == 0:
+                window.run(window.display.refresh, engine)
+        while not engine.stop():
+            backend.end_call()
+        engine.dial_thread.join()
+        engine.shutdown()
+
+    seconds = minutes * 60
+    signals = sum(window.signals.values())
+    call_seconds = backend.answered * backend.talk_time[0]
+    legacy_signals = (window.signals['status'] + window.signals['stats']
+                      + phase_seconds['wait'] * 10 + call_seconds
+                      + seconds * 2)
+    legacy_updates = (legacy_signals - seconds * 2) * 2 \
+        + seconds * LEGACY_FIELDS_PER_SECOND
+    legacy_styles = legacy_signals - seconds * 2
+
+    print(f"Simulated {minutes:g} min, {backend.dials} dials")
+    print(f"{'':<22}{'now':>10}{'previous':>12}")
+    print(f"{'Engine->GUI signals':<22}{signals:>10}{legacy_signals:>12.0f}")
+    print(f"{'Widget updates':<22}{window.widget_updates:>10}{legacy_updates:>12.0f}")
+    print(f"{'Stylesheet changes':<22}{window.style_changes:>10}{legacy_styles:>12.0f}")
+    print(f"Signals by kind:       {dict(window.signals)}")
+    print(f"GUI-thread CPU:        {window.cpu * 1000:.1f} ms "
+          f"({window.cpu * 1e6 / seconds:.1f} us per simulated second)")
+
+
+if __name__ == '__main__':
+    main()
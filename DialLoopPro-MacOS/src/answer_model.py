@@ -0,0 +1,135 @@
+# answer_model.py
+"""
+Best-time-to-call model for DialLoop Pro: answer probability per area
+code and hour of the week, learned from the call history
+"""
+
+from array import array
+from datetime import datetime
+
+AREA_CODES = 1000
+HOURS_PER_WEEK = 168
+
+# Pseudo-dials of prior behind every estimate: a cell, area code or hour
+# needs about this many dials before its own rate outweighs the prior
+PRIOR_WEIGHT = 20.0
+
+
+def area_code(number):
+    """NANP area code of a number as an int, or None"""
+    digits = ''.join(c for c in number if c.isdigit())
+    if len(digits) == 11 and digits[0] == '1':
+        digits = digits[1:]
+    if len(digits) != 10:
+        return None
+    return int(digits[:3])
+
+
+def hour_of_week(timestamp):
+    """Local hour of the week for an epoch time, Monday 00:00 first"""
+    when = datetime.fromtimestamp(timestamp)
+    return when.weekday() * 24 + when.hour
+
+
+class AnswerModel:
+    """Dense area code x hour-of-week table of answer probabilities
+
+    Each cell is its own connect rate shrunk toward (area code rate x
+    hour rate / overall rate), so area codes and hours with few dials
+    still rank sensibly:
+
+        p = (connected + k * prior) / (attempts + k)
+
+    observe() updates the counts and marks the area code's row and the
+    hour's column stale; probability() recomputes stale cells before
+    reading, so a new outcome costs at most one row and one column.
+    """
+
+    def __init__(self, prior_weight=PRIOR_WEIGHT):
+        self.k = prior_weight
+        cells = AREA_CODES * HOURS_PER_WEEK
+        self.attempts = array('I', bytes(4 * cells))
+        self.connected = array('I', bytes(4 * cells))
+        self.table = array('f', bytes(4 * cells))
+
+        # [attempts, connected] per area code, per hour and overall
+        self.area_totals = [[0, 0] for _ in range(AREA_CODES)]
+        self.hour_totals = [[0, 0] for _ in range(HOURS_PER_WEEK)]
+        self.totals = [0, 0]
+        self.area_rate = [0.0] * AREA_CODES
+        self.hour_rate = [0.0] * HOURS_PER_WEEK
+
+        self._stale_areas = set(range(AREA_CODES))
+        self._stale_hours = set(range(HOURS_PER_WEEK))
+        self._quarter = None
+        self._hour = 0
+
+    def load(self, rows):
+        """Add (area_code, hour_of_week, attempts, connected) counts and rebuild"""
+        for npa, how, attempts, connected in rows:
+            self._add(npa, how, attempts, connected)
+        self._stale_areas = set(range(AREA_CODES))
+        self._stale_hours = set(range(HOURS_PER_WEEK))
+        self.refresh()
+
+    def observe(self, number, timestamp, connected):
+        """Count one dial outcome"""
+        npa = area_code(number or '')
+        if npa is None:
+            return
+        how = hour_of_week(timestamp)
+        self._add(npa, how, 1, int(connected))
+        self._stale_areas.add(npa)
+        self._stale_hours.add(how)
+
+    def _add(self, npa, how, attempts, connected):
+        """Add counts to a cell and its totals"""
+        i = npa * HOURS_PER_WEEK + how
+        self.attempts[i] += attempts
+        self.connected[i] += connected
+        for totals in (self.area_totals[npa], self.hour_totals[how], self.totals):
+            totals[0] += attempts
+            totals[1] += connected
+
+    def refresh(self):
+        """Recompute the stale rows and columns of the table"""
+        if not self._stale_areas and not self._stale_hours:
+            return
+        k = self.k
+        overall = (self.totals[1] + 1) / (self.totals[0] + 2)
+        for npa in self._stale_areas:
+            attempts, connected = self.area_totals[npa]
+            self.area_rate[npa] = (connected + k * overall) / (attempts + k)
+        for how in self._stale_hours:
+            attempts, connected = self.hour_totals[how]
+            self.hour_rate[how] = (connected + k * overall) / (attempts + k)
+
+        def cell(npa, how):
+            i = npa * HOURS_PER_WEEK + how
+            prior = min(1.0, self.area_rate[npa] * self.hour_rate[how] / overall)
+            self.table[i] = (self.connected[i] + k * prior) / (self.attempts[i] + k)
+
+        for how in self._stale_hours:
+            for npa in range(AREA_CODES):
+                cell(npa, how)
+        for npa in self._stale_areas:
+            for how in range(HOURS_PER_WEEK):
+                if how not in self._stale_hours:
+                    cell(npa, how)
+        self._stale_areas.clear()
+        self._stale_hours.clear()
+
+    def probability(self, npa, how):
+        """Estimated answer probability for an area code at an hour of the week"""
+        self.refresh()
+        if npa is None:
+            return self.hour_rate[how]
+        return self.table[npa * HOURS_PER_WEEK + how]
+
+    def score(self, number, now):
+        """Answer probability for a number dialed at epoch time now"""
+        quarter = int(now // 900)
+        if quarter != self._quarter:
+            self._quarter = quarter
+            self._hour = hour_of_week(now)
+        return self.probability(area_code(number), self._hour)
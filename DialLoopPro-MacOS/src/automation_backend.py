@@ -0,0 +1,77 @@
+# automation_backend.py
+"""
+Automation backend interface used by the DialLoop Pro dial engine
+"""
+
+
+class AutomationBackend:
+    """Everything the dial engine needs from the outside world
+
+    MacAutomation drives the real dialer and spreadsheet apps;
+    SimulatorBackend stands in for them so the loop can run headless.
+
+    A backend with max_lines > 1 can keep several calls (lines 0 to
+    max_lines - 1) in flight for parallel dialing, and reports a line
+    that picks up by calling on_line_answered(line) from any thread.
+    """
+
+    max_lines = 1
+
+    def __init__(self):
+        # Seconds actually spent waiting in each step of the last dial
+        self.waits = {}
+        self.on_line_answered = None
+
+    def record_wait(self, step, waited):
+        """Record how long a step waited"""
+        self.waits[step] = round(waited, 4)
+
+    def activate_window(self, window_title):
+        """Bring an app to the front; True on success"""
+        raise NotImplementedError
+
+    def is_window_focused(self, window_title):
+        """True if the app is frontmost"""
+        raise NotImplementedError
+
+    def copy_next_number(self, spreadsheet_title):
+        """Move to the next spreadsheet row and copy it to the clipboard"""
+        raise NotImplementedError
+
+    def read_clipboard(self):
+        """Current clipboard text"""
+        raise NotImplementedError
+
+    def paste_and_dial(self, dialer_title, x, y, prefix):
+        """Dial the number on the clipboard"""
+        raise NotImplementedError
+
+    def dial_number(self, dialer_title, x, y, digits):
+        """Dial a number given directly"""
+        raise NotImplementedError
+
+    def hangup(self, x, y):
+        """Click the dialer's hangup button"""
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        """Park the mouse (over the hangup button)"""
+        pass
+
+    # --- Multi-line sessions ----------------------------------------------
+
+    def dial_line(self, line, digits):
+        """Dial a number on one line; True on success"""
+        raise NotImplementedError
+
+    def hangup_line(self, line):
+        """Hang up one line"""
+        raise NotImplementedError
+
+    def hold_line(self, line):
+        """Put an answered line on hold until an agent is free"""
+        pass
+
+    def connect_line(self, line):
+        """Bridge an answered line to the agent"""
+        raise NotImplementedError
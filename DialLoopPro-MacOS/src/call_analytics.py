@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# call_analytics.py
+"""
+Columnar export and vectorized analytics for DialLoop Pro call history
+
+Exports the attempts from call_history.db into a NumPy .npz file (one
+array per column, no extra dependencies) and computes connect rates by
+hour of week, the talk-time distribution, wasted wait per connect and
+calls/hour per session over it with NumPy, fast enough for tens of
+millions of attempts.
+
+Usage:
+    python3 call_analytics.py export call_history.db -o history.npz [--phases]
+    python3 call_analytics.py report history.npz
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from call_history import ABANDONED, CONNECTED, DROPPED, FORCED_NEXT, NO_ANSWER, STOPPED
+from lead_import import FIELD_WIDTH, normalize_numbers
+
+# Outcome codes in the export (index into OUTCOMES)
+OUTCOMES = (NO_ANSWER, CONNECTED, FORCED_NEXT, STOPPED, ABANDONED, DROPPED)
+PHASES = ('activate', 'copy', 'dial', 'wait', 'hangup', 'post_hangup')
+EXPORT_CHUNK = 500_000
+
+# A gap this long (seconds) between dials starts a new session
+SESSION_GAP = 1800
+
+
+def export_history(db_path, output, phases=False, since=0.0, compress=False):
+    """Write attempts to a .npz file; returns the number of rows
+
+    Columns: dialed_at (float64 epoch s), number (int64 E.164, 0 if
+    unknown), lead_row (int64, -1 if none), wait_ms and talk_ms (int32),
+    outcome (uint8 code into OUTCOMES) and, with phases, one float32
+    seconds column per phase ('phase_<name>', NaN when absent).
+    """
+    codes = {name: i for i, name in enumerate(OUTCOMES)}
+    columns = {name: [] for name in ('dialed_at', 'number', 'lead_row',
+                                     'wait_ms', 'talk_ms', 'outcome')}
+    if phases:
+        for name in PHASES:
+            columns[f'phase_{name}'] = []
+
+    db = sqlite3.connect(db_path)
+    try:
+        cursor = db.execute(
+            "SELECT dialed_at, number, lead_row, wait_ms, outcome, talk_ms, phases"
+            " FROM attempts WHERE dialed_at >= ? ORDER BY id", (since,))
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK)
+            if not rows:
+                break
+            dialed_at, number, lead_row, wait_ms, outcome, talk_ms, phase_json = zip(*rows)
+            columns['dialed_at'].append(np.array(dialed_at, dtype=np.float64))
+            raw = np.array([(n or '').encode('utf-8', 'replace')[:FIELD_WIDTH]
+                            for n in number], dtype=f'S{FIELD_WIDTH}')
+            columns['number'].append(normalize_numbers(raw))
+            columns['lead_row'].append(np.array(
+                [-1 if r is None else r for r in lead_row], dtype=np.int64))
+            columns['wait_ms'].append(np.array(
+                [w or 0 for w in wait_ms], dtype=np.int32))
+            columns['talk_ms'].append(np.array(
+                [t or 0 for t in talk_ms], dtype=np.int32))
+            columns['outcome'].append(np.array(
+                [codes.get(o, 0) for o in outcome], dtype=np.uint8))
+            if phases:
+                decoded = [json.loads(p) if p else {} for p in phase_json]
+                for name in PHASES:
+                    columns[f'phase_{name}'].append(np.array(
+                        [d.get(name, np.nan) for d in decoded], dtype=np.float32))
+    finally:
+        db.close()
+
+    arrays = {name: np.concatenate(parts) if parts else np.empty(0)
+              for name, parts in columns.items()}
+    save = np.savez_compressed if compress else np.savez
+    save(output, **arrays)
+    return len(arrays['dialed_at'])
+
+
+def load_export(path):
+    """Columns of an exported .npz as a dict of arrays"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def utc_offset(timestamp):
+    """Local UTC offset in seconds at an epoch time"""
+    return datetime.fromtimestamp(timestamp).astimezone().utcoffset().total_seconds()
+
+
+def local_seconds(dialed_at):
+    """Epoch seconds shifted into local time (DST-aware)"""
+    if len(dialed_at) == 0:
+        return dialed_at
+    # Look the offset up once per day that has dials (a dense table, no
+    # sorting); only days where it changes (DST) are resolved per quarter
+    # hour, since every UTC offset is a whole number of quarter hours
+    days = (dialed_at // 86400).astype(np.int64)
+    first = int(days.min())
+    days -= first
+    present = np.zeros(int(days.max()) + 1, dtype=bool)
+    present[days] = True
+    day_offsets = np.zeros(len(present) + 1)
+    for day in np.flatnonzero(present):
+        day_offsets[day] = utc_offset((first + int(day)) * 86400)
+        day_offsets[day + 1] = utc_offset((first + int(day) + 1) * 86400)
+    local = dialed_at + day_offsets[days]
+
+    changing = present & (day_offsets[:-1] != day_offsets[1:])
+    rows = np.flatnonzero(changing[days])
+    if len(rows):
+        quarters = (dialed_at[rows] // 900).astype(np.int64)
+        offsets = {q: utc_offset(int(q) * 900) for q in np.unique(quarters)}
+        local[rows] = dialed_at[rows] + np.array([offsets[q] for q in quarters])
+    return local
+
+
+def connect_rate_by_hour(columns):
+    """(attempts, connected, rate) as 7x24 arrays, Monday first"""
+    hours = (local_seconds(columns['dialed_at']) // 3600).astype(np.int64)
+    # Hour of the week, Monday 00:00 first (1970-01-01 was a Thursday)
+    slot = (hours + 3 * 24) % 168
+
+    connected = columns['outcome'] == OUTCOMES.index(CONNECTED)
+    attempts = np.bincount(slot, minlength=168).reshape(7, 24)
+    connects = np.bincount(slot, weights=connected, minlength=168).reshape(7, 24)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = np.where(attempts > 0, connects / attempts, 0.0)
+    return attempts, connects.astype(np.int64), rate
+
+
+def talk_time_distribution(columns, bins=(0, 30, 60, 120, 300, 600, 1800)):
+    """Talk-time histogram (seconds) and percentiles over connected calls"""
+    connected = columns['outcome'] == OUTCOMES.index(CONNECTED)
+    talk = columns['talk_ms'][connected] / 1000.0
+    edges = np.append(np.asarray(bins, dtype=np.float64), np.inf)
+    counts, _ = np.histogram(talk, bins=edges)
+    if len(talk):
+        p50, p90, p99 = np.percentile(talk, [50, 90, 99])
+    else:
+        p50 = p90 = p99 = 0.0
+    return {
+        'bins': list(bins),
+        'counts': counts.tolist(),
+        'p50': float(p50), 'p90': float(p90), 'p99': float(p99),
+        'mean': float(talk.mean()) if len(talk) else 0.0,
+    }
+
+
+def wasted_wait_per_connect(columns):
+    """Seconds spent waiting on calls that never connected, per connect"""
+    connected = columns['outcome'] == OUTCOMES.index(CONNECTED)
+    wasted = columns['wait_ms'][~connected].sum(dtype=np.int64) / 1000.0
+    connects = int(connected.sum())
+    return wasted / connects if connects else float(wasted)
+
+
+def session_rates(columns, gap=SESSION_GAP):
+    """(start, calls, calls/hour) arrays, one entry per dialing session
+
+    Sessions are runs of dials with no gap longer than `gap` seconds.
+    Single-dial sessions report 0 calls/hour.
+    """
+    dialed_at = np.sort(columns['dialed_at'])
+    if len(dialed_at) == 0:
+        return dialed_at, np.empty(0, dtype=np.int64), np.empty(0)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(dialed_at) > gap) + 1))
+    ends = np.append(starts[1:], len(dialed_at)) - 1
+    calls = ends - starts + 1
+    hours = (dialed_at[ends] - dialed_at[starts]) / 3600.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = np.where(hours > 0, calls / hours, 0.0)
+    return dialed_at[starts], calls, rates
+
+
+def print_report(columns):
+    """Print all analytics for an export"""
+    attempts, connects, rate = connect_rate_by_hour(columns)
+    talk = talk_time_distribution(columns)
+    starts, calls, rates = session_rates(columns)
+    total = int(attempts.sum())
+
+    print(f"Attempts:          {total}")
+    print(f"Connected:         {int(connects.sum())}")
+    print(f"Wasted wait:       {wasted_wait_per_connect(columns):.0f} s per connect")
+    print(f"Talk time:         p50 {talk['p50']:.0f}s, p90 {talk['p90']:.0f}s, "
+          f"p99 {talk['p99']:.0f}s")
+    print(f"Sessions:          {len(calls)}, median {np.median(rates) if len(rates) else 0:.1f} "
+          f"calls/hr")
+    print("Connect % by hour (rows Mon-Sun, columns 00-23):")
+    for day, row in zip(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'), rate):
+        print(f"  {day} " + ' '.join(f"{value * 100:3.0f}" for value in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Call history export and analytics")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="write attempts to .npz")
+    export.add_argument('database', help="call_history.db")
+    export.add_argument('-o', '--output', required=True, help=".npz file to write")
+    export.add_argument('--phases', action='store_true',
+                        help="include per-phase timing columns (slower)")
+    export.add_argument('--compress', action='store_true')
+
+    report = commands.add_parser('report', help="print analytics for an export")
+    report.add_argument('export', help=".npz written by the export command")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        start = time.perf_counter()
+        rows = export_history(args.database, args.output, args.phases,
+                              compress=args.compress)
+        print(f"Exported {rows} attempts in {time.perf_counter() - start:.1f}s")
+    else:
+        print_report(load_export(args.export))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
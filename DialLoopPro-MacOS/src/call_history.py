@@ -0,0 +1,315 @@
+# call_history.py
+"""
+Per-attempt call history for DialLoop Pro, stored in SQLite
+"""
+
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from answer_model import area_code
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    dialed_at REAL NOT NULL,
+    number TEXT,
+    lead_row INTEGER,
+    wait_ms INTEGER,
+    outcome TEXT NOT NULL,
+    talk_ms INTEGER,
+    phases TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_dialed_at ON attempts (dialed_at);
+"""
+
+# Rollup tables, keyed by local-time period strings that sort in order:
+# hourly '2024-05-06 14', daily '2024-05-06', weekly ISO '2024-W19'
+ROLLUPS = ('hourly', 'daily', 'weekly')
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{level} (
+    period TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    connected INTEGER NOT NULL,
+    forced_next INTEGER NOT NULL,
+    talk_ms INTEGER NOT NULL,
+    wait_ms INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Dials per area code and local hour of the week, for the answer model;
+# connected counts answered dials (see answered())
+AREA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_area_hour (
+    area_code INTEGER NOT NULL,
+    hour_of_week INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    connected INTEGER NOT NULL,
+    PRIMARY KEY (area_code, hour_of_week)
+) WITHOUT ROWID;
+"""
+
+# Bumped whenever a rollup table is added or changes meaning; older
+# databases are rebuilt
+ROLLUP_VERSION = 3
+
+AREA_UPSERT = """
+INSERT INTO rollup_area_hour (area_code, hour_of_week, attempts, connected)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (area_code, hour_of_week) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    connected = connected + excluded.connected
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO rollup_{level} (period, attempts, connected, forced_next, talk_ms, wait_ms)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (period) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    connected = connected + excluded.connected,
+    forced_next = forced_next + excluded.forced_next,
+    talk_ms = talk_ms + excluded.talk_ms,
+    wait_ms = wait_ms + excluded.wait_ms
+"""
+
+INSERT = """
+INSERT INTO attempts (dialed_at, number, lead_row, wait_ms, outcome, talk_ms, phases)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Attempt outcomes
+NO_ANSWER = 'no_answer'
+CONNECTED = 'connected'
+FORCED_NEXT = 'forced_next'
+STOPPED = 'stopped'
+ABANDONED = 'abandoned'  # answered with no agent free (parallel dialing)
+DROPPED = 'dropped'  # still ringing when another line was answered (parallel dialing)
+
+# Outcomes where the callee picked up, agent or not - what the answer model learns
+ANSWERED = (CONNECTED, ABANDONED)
+
+
+def answered(outcome):
+    """True if the callee picked up"""
+    return outcome in ANSWERED
+
+
+def period_keys(when):
+    """Hourly, daily and ISO-weekly rollup keys for a datetime"""
+    year, week, _ = when.isocalendar()
+    return (when.strftime('%Y-%m-%d %H'), when.strftime('%Y-%m-%d'),
+            f"{year}-W{week:02d}")
+
+
+def aggregate(rows):
+    """Rollup totals for (dialed_at, number, outcome, talk_ms, wait_ms) rows
+
+    Returns per-level {period: [attempts, connected, forced_next, talk_ms,
+    wait_ms]} dicts and {(area_code, hour_of_week): [attempts, answered]}.
+    """
+    totals = [defaultdict(lambda: [0, 0, 0, 0, 0]) for _ in ROLLUPS]
+    areas = defaultdict(lambda: [0, 0])
+    # Local periods only change on quarter-hour boundaries (every UTC
+    # offset is a multiple of 15 minutes), so look the keys up once per 900 s
+    keys_for_quarter = {}
+    for dialed_at, number, outcome, talk_ms, wait_ms in rows:
+        quarter = int(dialed_at // 900)
+        keys = keys_for_quarter.get(quarter)
+        if keys is None:
+            when = datetime.fromtimestamp(dialed_at)
+            keys = keys_for_quarter[quarter] = period_keys(when) + (
+                when.weekday() * 24 + when.hour,)
+        connected = outcome == CONNECTED
+        delta = (1, connected, outcome == FORCED_NEXT,
+                 talk_ms or 0, wait_ms or 0)
+        for level, key in zip(totals, keys):
+            counts = level[key]
+            for i, value in enumerate(delta):
+                counts[i] += value
+        npa = area_code(number) if number else None
+        if npa is not None:
+            counts = areas[npa, keys[3]]
+            counts[0] += 1
+            counts[1] += answered(outcome)
+    return totals, areas
+
+
+class CallHistory:
+    """Write-behind store of every dial attempt
+
+    record() only appends to an in-memory buffer; a background thread
+    inserts the buffer in one transaction every flush_interval seconds or
+    as soon as batch_size attempts are waiting. The database runs in WAL
+    mode, so readers (stats dialog, exports) never block the writer.
+
+    Each batch also updates hourly, daily and ISO-weekly rollup tables in
+    the same transaction, so statistics views read a few pre-aggregated
+    rows instead of scanning the attempts. An area code x hour-of-week
+    rollup does the same for the answer model.
+    """
+
+    def __init__(self, path, flush_interval=1.0, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.writes = 0  # committed batches, for benchmarks
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        for level in ROLLUPS:
+            self._db.executescript(ROLLUP_SCHEMA.format(level=level))
+        self._db.executescript(AREA_SCHEMA)
+        self._db.commit()
+        self._rebuild_missing_rollups()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record(self, dialed_at, number, row, wait_ms, outcome, talk_ms=0, phases=None):
+        """Queue one attempt for the next batch insert"""
+        with self._buffer_lock:
+            self._buffer.append((dialed_at, number, row, wait_ms, outcome,
+                                 talk_ms, phases))
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """Insert all queued attempts in one transaction
+
+        If the write fails the batch goes back in front of the buffer and
+        is retried by the next flush.
+        """
+        with self._db_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                self._db.executemany(INSERT, [
+                    row[:6] + (json.dumps(row[6]) if row[6] else None,)
+                    for row in rows
+                ])
+                self._add_to_rollups(
+                    (row[0], row[1], row[4], row[5], row[3]) for row in rows)
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._db.rollback()
+                with self._buffer_lock:
+                    self._buffer[:0] = rows
+                print(f"Call history write failed, {len(rows)} attempts kept for retry: {e}")
+                return
+            self.writes += 1
+
+    def _add_to_rollups(self, rows):
+        """Fold (dialed_at, number, outcome, talk_ms, wait_ms) rows into the rollups"""
+        totals, areas = aggregate(rows)
+        for level, level_totals in zip(ROLLUPS, totals):
+            self._db.executemany(
+                ROLLUP_UPSERT.format(level=level),
+                [(period,) + tuple(counts) for period, counts in level_totals.items()]
+            )
+        self._db.executemany(
+            AREA_UPSERT, [key + tuple(counts) for key, counts in areas.items()])
+
+    def _rebuild_missing_rollups(self):
+        """Rebuild the rollups from the attempts if they predate ROLLUP_VERSION"""
+        with self._db_lock:
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version >= ROLLUP_VERSION:
+                return
+            for level in ROLLUPS:
+                self._db.execute(f"DELETE FROM rollup_{level}")
+            self._db.execute("DELETE FROM rollup_area_hour")
+            cursor = self._db.execute(
+                "SELECT dialed_at, number, outcome, talk_ms, wait_ms FROM attempts")
+            while True:
+                rows = cursor.fetchmany(100000)
+                if not rows:
+                    break
+                self._add_to_rollups(rows)
+            self._db.execute(f"PRAGMA user_version = {ROLLUP_VERSION}")
+            self._db.commit()
+
+    def rollups(self, level, since=''):
+        """(period, attempts, connected, forced_next, talk_ms, wait_ms) rows, oldest first"""
+        if level not in ROLLUPS:
+            raise ValueError(f"Unknown rollup level: {level}")
+        self.flush()
+        with self._db_lock:
+            return self._db.execute(
+                f"SELECT period, attempts, connected, forced_next, talk_ms, wait_ms"
+                f" FROM rollup_{level} WHERE period >= ? ORDER BY period", (since,)
+            ).fetchall()
+
+    def summary(self, now=None, hours=24, days=30, weeks=12):
+        """Recent hourly, daily and weekly rollups plus lifetime totals"""
+        now = now or datetime.now()
+        hour_key = period_keys(now - timedelta(hours=hours - 1))[0]
+        day_key = period_keys(now - timedelta(days=days - 1))[1]
+        week_key = period_keys(now - timedelta(weeks=weeks - 1))[2]
+        result = {
+            'hourly': self.rollups('hourly', hour_key),
+            'daily': self.rollups('daily', day_key),
+            'weekly': self.rollups('weekly', week_key),
+        }
+        with self._db_lock:
+            # Weekly rows are the smallest complete set to total over
+            result['lifetime'] = tuple(value or 0 for value in self._db.execute(
+                "SELECT SUM(attempts), SUM(connected), SUM(forced_next),"
+                " SUM(talk_ms), SUM(wait_ms) FROM rollup_weekly").fetchone())
+        return result
+
+    def area_hours(self):
+        """(area_code, hour_of_week, attempts, connected) rows"""
+        self.flush()
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT area_code, hour_of_week, attempts, connected"
+                " FROM rollup_area_hour").fetchall()
+
+    def count(self):
+        """Number of attempts stored (after flushing the queue)"""
+        self.flush()
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+
+    def attempts(self, since=0.0):
+        """(dialed_at, number, lead_row, wait_ms, outcome, talk_ms, phases) rows"""
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT dialed_at, number, lead_row, wait_ms, outcome, talk_ms, phases"
+                " FROM attempts WHERE dialed_at >= ? ORDER BY id", (since,)
+            ).fetchall()
+        return [row[:6] + (json.loads(row[6]) if row[6] else {},) for row in rows]
+
+    def _run(self):
+        """Background batch writer"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Call history write failed: {e}")
+
+    def close(self):
+        """Stop the writer thread and write whatever is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        self._db.close()
@@ -0,0 +1,119 @@
+# callback_dialog.py
+"""
+Callback scheduling dialog for DialLoop Pro macOS
+"""
+
+import time
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout,
+                             QLineEdit, QPushButton, QGroupBox, QFormLayout,
+                             QDateTimeEdit, QListWidget, QListWidgetItem,
+                             QMessageBox)
+from PyQt5.QtCore import Qt, QDateTime
+
+
+class CallbackDialog(QDialog):
+    """Schedule a callback for the number just dialed, or cancel one"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("DialLoop Pro Callbacks")
+        self.resize(460, 480)
+
+        self.setup_ui()
+        self.load_callbacks()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        engine = self.parent.engine
+
+        # New callback
+        new_group = QGroupBox("Schedule Callback")
+        new_layout = QFormLayout()
+
+        self.number_edit = QLineEdit()
+        if engine.attempt is not None and engine.attempt['number']:
+            self.number_edit.setText(engine.attempt['number'])
+        new_layout.addRow("Number:", self.number_edit)
+
+        self.when_edit = QDateTimeEdit(QDateTime.currentDateTime().addSecs(3600))
+        self.when_edit.setCalendarPopup(True)
+        self.when_edit.setDisplayFormat("ddd MMM d, h:mm AP")
+        new_layout.addRow("Call back at:", self.when_edit)
+
+        self.note_edit = QLineEdit()
+        new_layout.addRow("Note:", self.note_edit)
+
+        self.schedule_btn = QPushButton("⏰ Schedule")
+        self.schedule_btn.clicked.connect(self.schedule)
+        new_layout.addRow(self.schedule_btn)
+
+        new_group.setLayout(new_layout)
+        layout.addWidget(new_group)
+
+        # Pending callbacks
+        pending_group = QGroupBox("Pending Callbacks")
+        pending_layout = QVBoxLayout()
+        self.callback_list = QListWidget()
+        pending_layout.addWidget(self.callback_list)
+        self.cancel_btn = QPushButton("Cancel Selected")
+        self.cancel_btn.clicked.connect(self.cancel_selected)
+        pending_layout.addWidget(self.cancel_btn)
+        pending_group.setLayout(pending_layout)
+        layout.addWidget(pending_group)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.accept)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def load_callbacks(self):
+        """List pending callbacks, soonest first"""
+        self.callback_list.clear()
+        engine = self.parent.engine
+        if engine.callbacks is None:
+            self.callback_list.addItem("Callbacks are not enabled.")
+            return
+        for callback in engine.callbacks.upcoming():
+            when = time.strftime('%a %b %d %I:%M %p',
+                                 time.localtime(callback.due * engine.time_scale))
+            text = f"{when}  {callback.number}"
+            if callback.note:
+                text += f"  - {callback.note}"
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, callback.id)
+            self.callback_list.addItem(item)
+
+    def schedule(self):
+        """Schedule a callback from the form"""
+        engine = self.parent.engine
+        number = self.number_edit.text().strip()
+        if sum(c.isdigit() for c in number) < 7:
+            QMessageBox.warning(self, "Callback", "Enter the number to call back.")
+            return
+        due = self.when_edit.dateTime().toSecsSinceEpoch() / engine.time_scale
+        row = None
+        if engine.attempt is not None and engine.attempt['number'] == number:
+            row = engine.attempt['row']
+        if engine.schedule_callback(due, self.note_edit.text(), number, row) is None:
+            QMessageBox.warning(self, "Callback", "Callbacks are not enabled.")
+            return
+        self.note_edit.clear()
+        self.load_callbacks()
+
+    def cancel_selected(self):
+        """Cancel the selected callback"""
+        item = self.callback_list.currentItem()
+        engine = self.parent.engine
+        if item is None or engine.callbacks is None:
+            return
+        callback_id = item.data(Qt.UserRole)
+        if callback_id is not None:
+            engine.callbacks.cancel(callback_id)
+            self.load_callbacks()
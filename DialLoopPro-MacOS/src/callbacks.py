@@ -0,0 +1,279 @@
+# callbacks.py
+"""
+Scheduled callbacks for DialLoop Pro: a hierarchical timer wheel backed
+by an append-only log
+"""
+
+import heapq
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from file_utils import atomic_write
+
+Callback = namedtuple('Callback', ['id', 'due', 'number', 'row', 'note'])
+
+# 1 s ticks; each level's slot spans 64x the one below:
+# 64 s, 68 min, 3 days, 194 days, 34 years
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+LEVELS = 5
+
+
+class TimerWheel:
+    """Hierarchical timing wheel of keys due at whole-second ticks
+
+    A key lands in the lowest level whose slots span its distance from
+    the current tick, in the slot for its due tick at that level. When
+    time enters a higher-level slot, its keys cascade down a level, so
+    each key is touched at most once per level. add() and remove() are
+    O(1); advance() skips stretches where no level has anything due.
+    """
+
+    def __init__(self, now):
+        self.current = int(now)
+        self.wheels = [[set() for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self.counts = [0] * LEVELS
+        self.ticks = {}  # key -> due tick
+        self.where = {}  # key -> (level, slot), or None once expired
+        self._expired = []
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def add(self, key, due):
+        """Schedule a key for epoch time due (fires at the next whole second)"""
+        tick = int(-(-due // 1))
+        self.ticks[key] = tick
+        self._place(key, tick)
+
+    def _place(self, key, tick):
+        delta = tick - self.current
+        if delta <= 0:
+            self.where[key] = None
+            self._expired.append(key)
+            return
+        level = 0
+        while level < LEVELS - 1 and delta >= 1 << (SLOT_BITS * (level + 1)):
+            level += 1
+        # Beyond the top level: park in its furthest slot and re-place later
+        tick = min(tick, self.current + (1 << (SLOT_BITS * LEVELS)) - 1)
+        slot = (tick >> (SLOT_BITS * level)) & (SLOTS - 1)
+        self.wheels[level][slot].add(key)
+        self.counts[level] += 1
+        self.where[key] = (level, slot)
+
+    def remove(self, key):
+        """Unschedule a key; True if it was scheduled"""
+        if key not in self.ticks:
+            return False
+        del self.ticks[key]
+        location = self.where.pop(key)
+        if location is None:
+            self._expired.remove(key)
+        else:
+            level, slot = location
+            self.wheels[level][slot].discard(key)
+            self.counts[level] -= 1
+        return True
+
+    def _cascade(self, level):
+        """Move the keys of the slot time just entered down a level"""
+        slot = (self.current >> (SLOT_BITS * level)) & (SLOTS - 1)
+        keys = self.wheels[level][slot]
+        self.wheels[level][slot] = set()
+        self.counts[level] -= len(keys)
+        for key in keys:
+            self._place(key, self.ticks[key])
+
+    def advance(self, now):
+        """Move time forward to epoch time now; returns the keys that came due"""
+        target = int(now)
+        while self.current < target:
+            # Nothing can fire before the next slot boundary of the lowest
+            # non-empty level, so jump straight to just before it
+            level = 0
+            while level < LEVELS and not self.counts[level]:
+                level += 1
+            if level == LEVELS:
+                self.current = target
+                break
+            if level:
+                span = 1 << (SLOT_BITS * level)
+                self.current = min(target, (self.current // span + 1) * span - 1)
+                if self.current == target:
+                    break
+
+            self.current += 1
+            for level in range(LEVELS - 1, 0, -1):
+                if not self.current & ((1 << (SLOT_BITS * level)) - 1):
+                    self._cascade(level)
+            slot = self.current & (SLOTS - 1)
+            keys = self.wheels[0][slot]
+            if keys:
+                self.wheels[0][slot] = set()
+                self.counts[0] -= len(keys)
+                for key in keys:
+                    self.where[key] = None
+                self._expired.extend(keys)
+
+        fired, self._expired = self._expired, []
+        for key in fired:
+            del self.ticks[key]
+            del self.where[key]
+        return fired
+
+
+class CallbackQueue:
+    """Callbacks waiting for their time, kept in a TimerWheel
+
+    Every change is appended to a tab-separated log (add/done/cancel
+    lines), so restart recovery is a single pass over the log that puts
+    each live callback straight back in the wheel; the log is rewritten
+    with just the live callbacks when most of it is dead. pop_due()
+    hands out due callbacks, oldest first; complete() retires one once
+    it has been dialed. next_due() reads the earliest due time off a
+    min-heap of (due, id) whose entries for retired callbacks are
+    dropped lazily, so it costs O(log n), not a scan of every callback.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.pending = {}  # id -> Callback, until completed or cancelled
+        self.wheel = TimerWheel(clock())
+        self.due = deque()
+        self.soonest = []  # heap of (due, id), stale entries skipped
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+        self.recover()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __len__(self):
+        return len(self.pending)
+
+    def recover(self):
+        """Rebuild pending callbacks and the wheel from the log"""
+        lines = 0
+        good = 0  # bytes of whole lines
+        torn = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # A torn last line from a crash has no newline - skip it
+                    if not line.endswith('\n'):
+                        torn = True
+                        break
+                    lines += 1
+                    good += len(line.encode('utf-8'))
+                    parts = line[:-1].split('\t')
+                    try:
+                        callback_id = int(parts[1])
+                        if parts[0] == 'add':
+                            row = int(parts[3]) if parts[3] else None
+                            self.pending[callback_id] = Callback(
+                                callback_id, float(parts[2]), parts[4], row, parts[5])
+                        else:
+                            self.pending.pop(callback_id, None)
+                    except (IndexError, ValueError):
+                        continue
+                    self._next_id = max(self._next_id, callback_id + 1)
+
+        if torn:
+            # Cut it off, or the next line appended would be glued to it
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+        if lines > 2 * len(self.pending) + 100:
+            atomic_write(self.path, ''.join(
+                self._add_line(callback) for callback in self.pending.values()))
+        self.soonest = sorted((callback.due, callback.id)
+                              for callback in self.pending.values())
+        for due, callback_id in self.soonest:
+            self.wheel.add(callback_id, due)
+
+    def _add_line(self, callback):
+        row = '' if callback.row is None else callback.row
+        note = ' '.join(callback.note.split())
+        return f"add\t{callback.id}\t{callback.due:.3f}\t{row}\t{callback.number}\t{note}\n"
+
+    def schedule(self, due, number, row=None, note=''):
+        """Add a callback for epoch time due; returns its id"""
+        with self._lock:
+            callback = Callback(self._next_id, round(float(due), 3), number, row,
+                                ' '.join(note.split()))
+            self._next_id += 1
+            self.pending[callback.id] = callback
+            self.wheel.add(callback.id, callback.due)
+            heapq.heappush(self.soonest, (callback.due, callback.id))
+            self._file.write(self._add_line(callback))
+        return callback.id
+
+    def cancel(self, callback_id):
+        """Drop a pending callback; True if there was one"""
+        with self._lock:
+            if self.pending.pop(callback_id, None) is None:
+                return False
+            if not self.wheel.remove(callback_id) and callback_id in self.due:
+                self.due.remove(callback_id)
+            self._file.write(f"cancel\t{callback_id}\n")
+            self._file.flush()
+        return True
+
+    def pop_due(self):
+        """Oldest due callback, or None; stays pending until complete()"""
+        with self._lock:
+            fired = self.wheel.advance(self.clock())
+            if fired:
+                self.due.extend(sorted(fired, key=lambda i: (self.pending[i].due, i)))
+            while self.due:
+                callback = self.pending.get(self.due.popleft())
+                if callback is not None:
+                    return callback
+            return None
+
+    def release(self, callback):
+        """Put a handed-out callback that was not dialed back in front"""
+        with self._lock:
+            if callback.id in self.pending:
+                self.due.appendleft(callback.id)
+
+    def complete(self, callback_id):
+        """Retire a callback once it has been dialed"""
+        with self._lock:
+            if self.pending.pop(callback_id, None) is None:
+                return
+            self.wheel.remove(callback_id)
+            self._file.write(f"done\t{callback_id}\n")
+            self._file.flush()
+
+    def next_due(self):
+        """Due time of the earliest pending callback, or None"""
+        with self._lock:
+            soonest = self.soonest
+            if len(soonest) > 2 * len(self.pending) + 64:
+                # Mostly retired entries - rebuild rather than pop them one by one
+                soonest[:] = [entry for entry in soonest if entry[1] in self.pending]
+                heapq.heapify(soonest)
+            while soonest and soonest[0][1] not in self.pending:
+                heapq.heappop(soonest)
+            return soonest[0][0] if soonest else None
+
+    def upcoming(self):
+        """Pending callbacks, soonest first"""
+        with self._lock:
+            return sorted(self.pending.values(), key=lambda c: (c.due, c.id))
+
+    def flush(self):
+        """Make logged changes durable"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Flush and close the log"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
@@ -0,0 +1,175 @@
+# calling_windows.py
+"""
+Callee-local calling hours for DialLoop Pro, from a NANP area code table
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from answer_model import area_code
+
+# Area codes by time zone. Area codes that span zones are listed under
+# every zone they cover; such a lead is only called when it is inside
+# calling hours in all of them.
+ZONE_AREA_CODES = {
+    'America/New_York': (
+        201, 202, 203, 207, 212, 215, 216, 220, 223, 227, 229, 231, 234, 239,
+        240, 248, 252, 260, 267, 269, 272, 276, 283, 301, 302, 304, 305, 313,
+        315, 317, 321, 324, 326, 330, 332, 336, 339, 347, 351, 352, 363, 380,
+        386, 401, 404, 407, 410, 412, 413, 419, 423, 434, 436, 440, 443, 445,
+        448, 463, 470, 472, 475, 478, 484, 502, 508, 513, 516, 517, 518, 540,
+        551, 561, 567, 570, 571, 574, 582, 585, 586, 603, 606, 607, 609, 610,
+        614, 616, 617, 631, 640, 645, 646, 656, 667, 678, 679, 680, 681, 689,
+        703, 704, 706, 716, 717, 718, 724, 727, 732, 734, 740, 743, 754, 757,
+        762, 765, 770, 772, 774, 781, 786, 802, 803, 804, 810, 812, 813, 814,
+        826, 828, 835, 838, 839, 843, 845, 848, 850, 854, 856, 857, 859, 860,
+        862, 863, 864, 865, 878, 904, 906, 908, 910, 912, 914, 917, 919, 929,
+        930, 934, 937, 941, 943, 947, 948, 954, 959, 973, 978, 980, 984, 989,
+    ),
+    'America/Chicago': (
+        205, 210, 214, 217, 218, 219, 224, 225, 228, 235, 251, 254, 256, 262,
+        270, 274, 281, 308, 309, 312, 314, 316, 318, 319, 320, 325, 327, 331,
+        334, 337, 346, 353, 361, 364, 402, 405, 409, 414, 417, 430, 432, 447,
+        448, 464, 469, 471, 479, 501, 504, 507, 512, 515, 531, 534, 539, 557,
+        563, 572, 573, 580, 601, 605, 608, 612, 615, 618, 620, 629, 630, 636,
+        641, 651, 659, 660, 662, 682, 701, 708, 712, 713, 715, 726, 730, 731,
+        737, 763, 769, 773, 779, 785, 806, 812, 815, 816, 817, 830, 832, 847,
+        850, 861, 870, 872, 901, 903, 906, 913, 918, 920, 930, 931, 936, 938,
+        940, 945, 952, 956, 972, 975, 979, 985,
+    ),
+    'America/Denver': (
+        208, 303, 307, 308, 385, 406, 435, 505, 575, 605, 701, 719, 720, 801,
+        915, 970, 983, 986,
+    ),
+    'America/Phoenix': (480, 520, 602, 623, 928),
+    'America/Los_Angeles': (
+        206, 208, 209, 213, 253, 279, 310, 323, 341, 350, 360, 408, 415, 424,
+        425, 442, 458, 503, 509, 510, 530, 541, 559, 562, 564, 619, 626, 628,
+        650, 657, 661, 669, 702, 707, 714, 725, 747, 760, 775, 805, 818, 820,
+        831, 840, 858, 909, 916, 925, 949, 951, 971, 986,
+    ),
+    'America/Anchorage': (907,),
+    'Pacific/Honolulu': (808,),
+    # Canada
+    'America/St_Johns': (709,),
+    'America/Halifax': (428, 506, 782, 902),
+    'America/Toronto': (
+        226, 249, 263, 289, 343, 354, 365, 367, 382, 416, 418, 437, 438, 450,
+        468, 514, 519, 548, 579, 581, 613, 647, 683, 705, 742, 753, 807, 819,
+        873, 905,
+    ),
+    'America/Winnipeg': (204, 431, 584, 807),
+    'America/Regina': (306, 474, 639),
+    'America/Edmonton': (368, 403, 587, 780, 825),
+    'America/Vancouver': (236, 250, 257, 604, 672, 778),
+    'America/Whitehorse': (867,),
+    'America/Iqaluit': (867,),
+    # Caribbean and Pacific NANP members
+    'America/Puerto_Rico': (787, 939),
+    'America/St_Thomas': (340,),
+    'America/Nassau': (242,),
+    'America/Barbados': (246,),
+    'America/Anguilla': (264,),
+    'America/Antigua': (268,),
+    'America/Tortola': (284,),
+    'America/Cayman': (345,),
+    'Atlantic/Bermuda': (441,),
+    'America/Grenada': (473,),
+    'America/Grand_Turk': (649,),
+    'America/Jamaica': (658, 876),
+    'America/Montserrat': (664,),
+    'America/Lower_Princes': (721,),
+    'America/St_Lucia': (758,),
+    'America/Dominica': (767,),
+    'America/St_Vincent': (784,),
+    'America/Santo_Domingo': (809, 829, 849),
+    'America/Port_of_Spain': (868,),
+    'America/St_Kitts': (869,),
+    'Pacific/Saipan': (670,),
+    'Pacific/Guam': (671,),
+    'Pacific/Pago_Pago': (684,),
+}
+
+
+def build_zone_table():
+    """(zone sets, dense array of zone set index per area code)
+
+    Zone set 0 is the dialer's own local time, used for area codes not
+    in the table.
+    """
+    zones_by_npa = {}
+    for name, npas in ZONE_AREA_CODES.items():
+        for npa in npas:
+            zones_by_npa.setdefault(npa, []).append(name)
+
+    zone_sets = [(None,)]
+    index = {}
+    table = array('B', bytes(1000))
+    for npa, names in sorted(zones_by_npa.items()):
+        key = tuple(sorted(names))
+        if key not in index:
+            index[key] = len(zone_sets)
+            zone_sets.append(tuple(ZoneInfo(name) for name in key))
+        table[npa] = index[key]
+    return zone_sets, table
+
+
+class CallingWindows:
+    """When a lead may be called, by the callee's local time
+
+    Leads may be called from start_hour to end_hour local time every day
+    (defaults: 8:00 to 21:00). next_open() is O(1) per lead: the area
+    code's zone set is a lookup in a dense table, and each zone set
+    caches whether it is open and until when, recomputed with zoneinfo
+    (so DST is exact) only when that time passes.
+    """
+
+    def __init__(self, start_hour=8, end_hour=21):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.zone_sets, self.table = build_zone_table()
+        # Per zone set: (computed_at, valid_until, opens_at or None)
+        self._cache = [None] * len(self.zone_sets)
+
+    def zone_set(self, number):
+        """Zones a number's area code covers (None = the dialer's local time)"""
+        npa = area_code(number or '')
+        return self.zone_sets[self.table[npa] if npa is not None else 0]
+
+    def next_open(self, number, now):
+        """None if the number may be called at epoch time now, else when it may"""
+        npa = area_code(number or '')
+        i = self.table[npa] if npa is not None else 0
+        cached = self._cache[i]
+        if cached is None or not cached[0] <= now < cached[1]:
+            cached = self._cache[i] = self._evaluate(self.zone_sets[i], now)
+        return cached[2]
+
+    def _zone_state(self, zone, now):
+        """(open, next change) for one zone at epoch time now"""
+        local = datetime.fromtimestamp(now, zone)
+        day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        opens = (day + timedelta(hours=self.start_hour)).timestamp()
+        closes = (day + timedelta(hours=self.end_hour)).timestamp()
+        if opens <= now < closes:
+            return True, closes
+        if now < opens:
+            return False, opens
+        tomorrow = day + timedelta(days=1)
+        return False, (tomorrow + timedelta(hours=self.start_hour)).timestamp()
+
+    def _evaluate(self, zones, now):
+        """(now, valid_until, opens_at) for a zone set at epoch time now"""
+        states = [self._zone_state(zone, now) for zone in zones]
+        if all(is_open for is_open, _ in states):
+            return now, min(change for _, change in states), None
+
+        # Jump to the latest opening among closed zones until all are open
+        t = now
+        for _ in range(8):
+            t = max(change for is_open, change in states if not is_open)
+            states = [self._zone_state(zone, t) for zone in zones]
+            if all(is_open for is_open, _ in states):
+                break
+        return now, t, t
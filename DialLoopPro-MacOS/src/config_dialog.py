@@ -5,9 +5,8 @@ Configuration dialog for DialLoop Pro macOS
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QLineEdit, QPushButton, QGroupBox, QFormLayout,
-                            QMessageBox, QSpinBox, QComboBox)
+                            QMessageBox, QSpinBox, QComboBox, QFileDialog)
 from PyQt5.QtCore import Qt
-import pyautogui
 import time
 
 class ConfigDialog(QDialog):
@@ -52,6 +51,35 @@ class ConfigDialog(QDialog):
         spreadsheet_layout.addWidget(self.spreadsheet_test_btn)
         
         window_layout.addRow("Spreadsheet:", spreadsheet_layout)
+        
+        # Lead file (used instead of the spreadsheet when set)
+        self.lead_file_edit = QLineEdit()
+        self.lead_file_edit.setPlaceholderText("Optional CSV/TSV - replaces spreadsheet copy")
+        self.lead_file_browse_btn = QPushButton("Browse")
+        self.lead_file_browse_btn.clicked.connect(self.browse_lead_file)
+        
+        lead_file_layout = QHBoxLayout()
+        lead_file_layout.addWidget(self.lead_file_edit)
+        lead_file_layout.addWidget(self.lead_file_browse_btn)
+        
+        window_layout.addRow("Lead File:", lead_file_layout)
+        
+        # Lead server (shared lead file, used instead of both when set)
+        self.lead_server_edit = QLineEdit()
+        self.lead_server_edit.setPlaceholderText("Optional host:port - shares one lead file between agents")
+        window_layout.addRow("Lead Server:", self.lead_server_edit)
+        
+        # Do-not-call list
+        self.dnc_file_edit = QLineEdit()
+        self.dnc_file_edit.setPlaceholderText("Optional - numbers here are never dialed")
+        self.dnc_file_browse_btn = QPushButton("Browse")
+        self.dnc_file_browse_btn.clicked.connect(self.browse_dnc_file)
+        
+        dnc_file_layout = QHBoxLayout()
+        dnc_file_layout.addWidget(self.dnc_file_edit)
+        dnc_file_layout.addWidget(self.dnc_file_browse_btn)
+        
+        window_layout.addRow("Do-Not-Call:", dnc_file_layout)
         window_group.setLayout(window_layout)
         layout.addWidget(window_group)
         
@@ -153,6 +181,9 @@ class ConfigDialog(QDialog):
         
         self.dialer_edit.setText(config.get('dialer_title', ''))
         self.spreadsheet_edit.setText(config.get('spreadsheet_title', ''))
+        self.lead_file_edit.setText(config.get('lead_file', ''))
+        self.lead_server_edit.setText(config.get('lead_server', ''))
+        self.dnc_file_edit.setText(config.get('dnc_file', ''))
         self.hangup_x_edit.setValue(config.get('hangup_x', 0))
         self.hangup_y_edit.setValue(config.get('hangup_y', 0))
         self.dial_x_edit.setValue(config.get('dial_x', 0))
@@ -197,6 +228,24 @@ class ConfigDialog(QDialog):
         # Similar implementation to pick_dialer_window
         pass
     
+    def browse_lead_file(self):
+        """Pick a CSV/TSV lead file"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Lead File", "",
+            "Lead files (*.csv *.tsv *.txt);;All files (*)"
+        )
+        if path:
+            self.lead_file_edit.setText(path)
+    
+    def browse_dnc_file(self):
+        """Pick a do-not-call list"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Do-Not-Call List", "",
+            "Lists (*.csv *.tsv *.txt);;All files (*)"
+        )
+        if path:
+            self.dnc_file_edit.setText(path)
+    
     def pick_hangup_coord(self):
         """Pick hangup coordinates"""
         QMessageBox.information(self, "Pick Coordinates",
@@ -219,6 +268,7 @@ class ConfigDialog(QDialog):
         '''
         
         # For now, use pyautogui
+        import pyautogui
         input("Move mouse to hangup button and press Enter...")
         x, y = pyautogui.position()
         
@@ -261,6 +311,7 @@ class ConfigDialog(QDialog):
         x = self.hangup_x_edit.value()
         y = self.hangup_y_edit.value()
         
+        import pyautogui
         pyautogui.moveTo(x, y, duration=0.5)
         
         QMessageBox.information(self, "Test Complete",
@@ -279,8 +330,10 @@ class ConfigDialog(QDialog):
             QMessageBox.warning(self, "Error", "Dialer title is required!")
             return
         
-        if not self.spreadsheet_edit.text():
-            QMessageBox.warning(self, "Error", "Spreadsheet title is required!")
+        if (not self.spreadsheet_edit.text() and not self.lead_file_edit.text() and
+                not self.lead_server_edit.text()):
+            QMessageBox.warning(self, "Error", 
+                              "A spreadsheet title, a lead file or a lead server is required!")
             return
         
         if self.hangup_x_edit.value() == 0 or self.hangup_y_edit.value() == 0:
@@ -301,7 +354,10 @@ class ConfigDialog(QDialog):
                 'DialX': str(self.dial_x_edit.value()),
                 'DialY': str(self.dial_y_edit.value()),
                 'WaitTime': str(self.wait_time_edit.value() * 1000),
-                'DialPrefix': self.prefix_edit.text()
+                'DialPrefix': self.prefix_edit.text(),
+                'LeadFile': self.lead_file_edit.text(),
+                'LeadServer': self.lead_server_edit.text(),
+                'DncFile': self.dnc_file_edit.text()
             },
             'Goals': {
                 'DailyGoal': str(self.daily_goal_edit.value()),
@@ -4,17 +4,35 @@ Configuration management for DialLoop Pro
 """
 
 import configparser
+import io
 import os
+import threading
+import time
 from datetime import datetime
 
+from file_utils import atomic_write
+
 class ConfigManager:
-    def __init__(self, config_file='settings.ini'):
+    def __init__(self, config_file='settings.ini', flush_delay=2.0):
         self.config_file = config_file
         self.config = configparser.ConfigParser()
+        self.flush_delay = flush_delay
+        self.writes = 0
+        
+        # Dirty tracking for the debounced writer
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._dirty_event = threading.Event()
+        self._closed = False
         
         # Create default config if doesn't exist
         if not os.path.exists(config_file):
             self.create_default_config()
+        else:
+            self.config.read(config_file)
+        
+        self._writer = threading.Thread(target=self._write_behind, daemon=True)
+        self._writer.start()
     
     def create_default_config(self):
         """Create default configuration"""
@@ -26,7 +44,20 @@ class ConfigManager:
             'DialX': '0',
             'DialY': '0',
             'WaitTime': '35000',
-            'DialPrefix': '1'
+            'Lines': '1',
+            'HoldSeconds': '2',
+            'DialPrefix': '1',
+            'LeadFile': '',
+            'LeadServer': '',
+            'DncFile': '',
+            'OrderLeads': '1',
+            'CallingHours': '1',
+            'CallingHoursStart': '8',
+            'CallingHoursEnd': '21',
+            'Redial': '1',
+            'RedialSpacing': '4h, 1d, 3d',
+            'RedialMaxAttempts': '4',
+            'RedialRules': 'forced_next: spacing, stopped: 0'
         }
         
         self.config['Goals'] = {
@@ -45,7 +76,10 @@ class ConfigManager:
     
     def load_config(self):
         """Load configuration from file"""
-        self.config.read(self.config_file)
+        # Pending in-memory changes win over what is on disk
+        self.flush()
+        with self._lock:
+            self.config.read(self.config_file)
         
         config_dict = {}
         
@@ -59,7 +93,20 @@ class ConfigManager:
                 'dial_x': self.config['Configuration'].getint('DialX', 0),
                 'dial_y': self.config['Configuration'].getint('DialY', 0),
                 'wait_time': self.config['Configuration'].getint('WaitTime', 35000),
-                'dial_prefix': self.config['Configuration'].get('DialPrefix', '1')
+                'lines': self.config['Configuration'].getint('Lines', 1),
+                'hold_seconds': self.config['Configuration'].getfloat('HoldSeconds', 2.0),
+                'dial_prefix': self.config['Configuration'].get('DialPrefix', '1'),
+                'lead_file': self.config['Configuration'].get('LeadFile', ''),
+                'lead_server': self.config['Configuration'].get('LeadServer', ''),
+                'dnc_file': self.config['Configuration'].get('DncFile', ''),
+                'order_leads': self.config['Configuration'].getboolean('OrderLeads', True),
+                'calling_hours': self.config['Configuration'].getboolean('CallingHours', True),
+                'calling_hours_start': self.config['Configuration'].getint('CallingHoursStart', 8),
+                'calling_hours_end': self.config['Configuration'].getint('CallingHoursEnd', 21),
+                'redial': self.config['Configuration'].getboolean('Redial', True),
+                'redial_spacing': self.config['Configuration'].get('RedialSpacing', '4h, 1d, 3d'),
+                'redial_max_attempts': self.config['Configuration'].getint('RedialMaxAttempts', 4),
+                'redial_rules': self.config['Configuration'].get('RedialRules', '')
             })
         
         # Goals section
@@ -73,30 +120,68 @@ class ConfigManager:
         return config_dict
     
     def save_setting(self, key, value, section='Configuration'):
-        """Save a single setting"""
-        if section not in self.config:
-            self.config[section] = {}
-        
+        """Save a single setting (written by the background writer)"""
         if isinstance(value, bool):
             value = '1' if value else '0'
         else:
             value = str(value)
         
-        self.config[section][key] = value
-        self.save_config()
+        with self._lock:
+            if section not in self.config:
+                self.config[section] = {}
+            
+            if self.config[section].get(key) == value:
+                return
+            
+            self.config[section][key] = value
+            self._dirty = True
+        self._dirty_event.set()
+    
+    def flush(self):
+        """Write pending changes now, if there are any"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.save_config()
     
     def save_config(self):
         """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
+        with self._lock:
+            buf = io.StringIO()
+            self.config.write(buf)
+            atomic_write(self.config_file, buf.getvalue())
+            self._dirty = False
+            self.writes += 1
+    
+    def _write_behind(self):
+        """Debounced writer: coalesce bursts of save_setting into one write"""
+        while not self._closed:
+            self._dirty_event.wait()
+            self._dirty_event.clear()
+            if self._closed:
+                break
+            
+            # Let the burst settle before touching the disk
+            time.sleep(self.flush_delay)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Settings write failed: {e}")
+    
+    def close(self):
+        """Stop the background writer and flush pending changes"""
+        self._closed = True
+        self._dirty_event.set()
+        self.flush()
     
     def update_config(self, config_dict):
         """Update multiple configuration values"""
-        for section, settings in config_dict.items():
-            if section not in self.config:
-                self.config[section] = {}
+        with self._lock:
+            for section, settings in config_dict.items():
+                if section not in self.config:
+                    self.config[section] = {}
+                
+                for key, value in settings.items():
+                    self.config[section][key] = str(value)
             
-            for key, value in settings.items():
-                self.config[section][key] = str(value)
-        
-        self.save_config()
\ No newline at end of file
+            self.save_config()
\ No newline at end of file
@@ -0,0 +1,840 @@
+# dial_engine.py
+"""
+GUI-free dialing engine for DialLoop Pro
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from answer_model import AnswerModel
+from calling_windows import CallingWindows
+from callbacks import CallbackQueue
+from call_history import (CONNECTED, FORCED_NEXT, NO_ANSWER, STOPPED, CallHistory,
+                          answered)
+from lead_source import (CallbackLeadSource, FileLeadSource, OrderedLeadSource,
+                         create_lead_source, dial_digits)
+from rate_window import RateWindow
+from redial import RedialPolicy
+from spans import SpanExporter, SpanRing
+
+# Seconds the dialer gets to clear the line after an automatic hangup
+HANGUP_SETTLE = 1.5
+
+# Seconds shutdown() waits for the dial thread to finish its current step
+SHUTDOWN_TIMEOUT = 10.0
+
+# Scheduler score of a lead put ahead of the rest (others score 0)
+HOT_LEAD_SCORE = 1.0
+
+# Dial loop states
+IDLE = 'idle'
+COPYING = 'copying'
+DIALING = 'dialing'
+WAITING = 'waiting'
+ON_CALL = 'on_call'
+HANGING_UP = 'hanging_up'
+
+
+class DialEngine:
+    """Dial loop, call tracking and statistics, independent of any UI
+
+    The engine drives an automation backend (MacAutomation on a Mac, or
+    SimulatorBackend anywhere) and reports through plain callbacks, so a
+    Qt window, a daemon or a benchmark can sit on top of it:
+
+        on_status(text)           status line
+        on_stats(dict)            statistics changed
+        on_warning(title, text)   something the user should be told
+        on_notify(title, text)    passive notification (e.g. live call)
+        on_countdown(kind, at)    'wait' until epoch time at, or 'call'
+                                  since it; the front end ticks it
+
+    The dial loop is a state machine (IDLE, COPYING, DIALING, WAITING,
+    ON_CALL, HANGING_UP). It blocks on a Condition rather than polling, and
+    stop(), hangup_next() and toggle_call() notify it, so they take effect
+    as soon as the current automation step returns. Countdowns are sent
+    once as a deadline rather than ticked from the dial thread.
+
+    With lines > 1 and a backend that has that many sessions, the dial
+    thread runs a ParallelDialer instead: several lines ring at once and
+    the first answer is routed to the agent. Counters and the lead source
+    are shared with the backend's and the agent's threads, so they are
+    updated under a lock.
+
+    time_scale shrinks every sleep and timeout by a factor, for simulator
+    runs. Engine timestamps are kept in scaled milliseconds, so durations
+    and rates always read as real-world values.
+    """
+
+    def __init__(self, backend, config_manager, stats_manager, time_scale=1.0):
+        self.backend = backend
+        self.config_manager = config_manager
+        self.stats_manager = stats_manager
+        self.time_scale = time_scale
+
+        self.running = False
+        self.on_call = False
+        self.dialing_active = False
+        self.force_break = False
+
+        # Dial loop state, and the condition it waits on for signals
+        self.state = IDLE
+        self.state_listeners = []
+        self._signal = threading.Condition()
+
+        # Statistics
+        self.total_calls = 0
+        self.session_calls = 0
+        self.session_display_calls = 0
+        self.weekly_calls = 0
+        self.connected_calls = 0
+        self.suppressed_calls = 0
+        self.abandoned_calls = 0
+        self.total_talk_time = 0
+        self._state_lock = threading.RLock()
+
+        # Parallel dialing: lines to keep ringing, how long an answer that
+        # finds the agent busy is held, and the line bridged to the agent
+        self.lines = 1
+        self.hold_seconds = 2.0
+        self.agent_line = None
+        self.dialer = None
+
+        # Goals
+        self.daily_goal = 300
+        self.weekly_goal = 1500
+        self.best_hourly_rate = 0
+
+        # Hourly tracking: sliding 5/15/60 minute windows
+        self.rate_window = RateWindow()
+        self.current_hour_rate = 0
+        self.rate_15m = 0
+        self.rate_5m = 0
+
+        # Timing
+        self.call_start_time = 0
+        self.session_start_time = 0
+        self.first_start_time = 0
+        self.session_active = False
+
+        # Lead source (lead file, or the spreadsheet as fallback)
+        self.lead_source = None
+        self.suppression = None
+        self.lead = None
+
+        # Threading
+        self.dial_thread = None
+
+        # Phase timing: spans ring buffer, optional JSONL export, and
+        # listeners called with (phase, seconds)
+        self.spans = SpanRing()
+        self.span_exporter = None
+        self.phase_listeners = []
+
+        # Per-attempt history: the attempt awaiting an outcome, and the
+        # phase timings collected for it
+        self.history = None
+        self.attempt = None
+        self.attempt_phases = {}
+
+        # Answer probability per area code and hour, used to dial the most
+        # answerable leads first (built from the history when enabled)
+        self.answer_model = None
+        self.order_leads = True
+
+        # When to try a no-answer lead again (set from the configuration)
+        self.redial_policy = None
+
+        # Scheduled callbacks, dialed ahead of the lead source when due
+        self.callbacks = None
+        self.leads_changed = False
+
+        # Front-end callbacks
+        self.on_status = lambda text: None
+        self.on_stats = lambda stats: None
+        self.on_warning = lambda title, text: print(f"{title}: {text}")
+        self.on_notify = lambda title, text: None
+        self.on_countdown = lambda kind, at: None
+
+    def now_ms(self):
+        """Current time in (scaled) milliseconds"""
+        return int(time.time() * 1000 / self.time_scale)
+
+    def sleep(self, seconds):
+        """Sleep for a (scaled) number of seconds"""
+        time.sleep(seconds * self.time_scale)
+
+    @contextmanager
+    def phase(self, name):
+        """Time one phase of a dial as a span"""
+        start_wall = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = (time.perf_counter() - start) / self.time_scale
+            self.spans.record(name, start_wall, seconds, self.total_calls)
+            self.attempt_phases[name] = self.attempt_phases.get(name, 0.0) + seconds
+            for listener in self.phase_listeners:
+                listener(name, seconds)
+
+    def notify(self):
+        """Wake the dial loop to re-check running, on_call and force_break"""
+        with self._signal:
+            self._signal.notify_all()
+
+    def wait_for_signal(self, predicate, seconds):
+        """Block until predicate() holds or (scaled) seconds pass"""
+        if seconds is not None:
+            seconds *= self.time_scale
+        with self._signal:
+            return self._signal.wait_for(predicate, seconds)
+
+    def set_state(self, state):
+        """Enter a dial loop state and tell the listeners"""
+        if state != self.state:
+            self.state = state
+            for listener in self.state_listeners:
+                listener(state)
+
+    def enable_span_export(self, path, interval=5.0):
+        """Export spans to a JSONL file every interval seconds"""
+        if self.span_exporter is None:
+            self.span_exporter = SpanExporter(self.spans, path, interval)
+
+    def enable_call_history(self, path):
+        """Record every dial attempt to a SQLite database"""
+        if self.history is None:
+            self.history = CallHistory(path)
+            self.answer_model = AnswerModel()
+            self.answer_model.load(self.history.area_hours())
+
+    def enable_callbacks(self, path):
+        """Keep scheduled callbacks in a log file and dial them when due"""
+        if self.callbacks is None:
+            self.callbacks = CallbackQueue(path, lambda: self.now_ms() / 1000)
+
+    def schedule_callback(self, due, note='', number=None, row=None):
+        """Schedule a callback (default: the number just dialed); returns its id"""
+        if self.callbacks is None:
+            return None
+        if number is None and self.attempt is not None:
+            number, row = self.attempt['number'], self.attempt['row']
+        if not number:
+            return None
+        callback_id = self.callbacks.schedule(due, number, row, note)
+        self.callbacks.flush()
+        self.leads_changed = True
+        self.notify()  # a loop waiting for the next lead re-checks
+        return callback_id
+
+    def jump_to_row(self, row):
+        """Continue the lead file from a given row; False if the source can't"""
+        with self._state_lock:
+            if self.lead_source is None or not self.lead_source.jump_to(row):
+                return False
+        self.leads_changed = True
+        self.notify()
+        return True
+
+    def dial_row_next(self, row):
+        """Put one row of the lead file ahead of the rest (a hot lead)"""
+        with self._state_lock:
+            if self.lead_source is None or not self.lead_source.prioritize(
+                    row, HOT_LEAD_SCORE, self.now_ms() / 1000):
+                return False
+        self.leads_changed = True
+        self.notify()
+        return True
+
+    def make_attempt(self, lead, number=None):
+        """A dialed lead's attempt, carrying the phase timings so far"""
+        phases, self.attempt_phases = self.attempt_phases, {}
+        number = number or lead.number
+        if number is None and self.history is not None:
+            number = self.backend.read_clipboard()
+        return {
+            'dialed_at': self.now_ms() / 1000,
+            'number': number,
+            'row': lead.row,
+            'lead': lead,
+            'outcome': NO_ANSWER,
+            'phases': phases,
+        }
+
+    def begin_attempt(self, lead):
+        """Start tracking a dialed lead until its outcome is known"""
+        phases = self.attempt_phases
+        self.finish_attempt()
+        self.attempt_phases = phases  # keep this dial's copy/dial timings
+        self.attempt = self.make_attempt(lead)
+
+    def finish_attempt(self, outcome=None, talk_ms=0):
+        """Record the pending attempt (if any)"""
+        attempt, self.attempt = self.attempt, None
+        self.attempt_phases = {}
+        if attempt is not None:
+            self.record_attempt(attempt, outcome, talk_ms)
+
+    def record_attempt(self, attempt, outcome=None, talk_ms=0):
+        """Record an attempt's outcome for redials and to the call history"""
+        outcome = outcome or attempt['outcome']
+        with self._state_lock:
+            if self.lead_source is not None:
+                self.lead_source.record_outcome(attempt['lead'], outcome)
+            if self.history is None:
+                return
+            phases = attempt['phases']
+            if attempt['number']:
+                self.answer_model.observe(attempt['number'], attempt['dialed_at'],
+                                          answered(outcome))
+            self.history.record(
+                attempt['dialed_at'], attempt['number'], attempt['row'],
+                int(phases.get('wait', 0.0) * 1000),
+                outcome, talk_ms,
+                {name: round(seconds, 3) for name, seconds in phases.items()},
+            )
+
+    def load_configuration(self):
+        """Load configuration and statistics"""
+        config = self.config_manager.load_config()
+
+        # Basic configuration
+        self.dialer_window_title = config.get('dialer_title', '')
+        self.spreadsheet_window_title = config.get('spreadsheet_title', '')
+        self.hangup_x = config.get('hangup_x', 0)
+        self.hangup_y = config.get('hangup_y', 0)
+        self.dial_x = config.get('dial_x', 0)
+        self.dial_y = config.get('dial_y', 0)
+        self.wait_time = config.get('wait_time', 35000)
+        self.lines = max(1, config.get('lines', 1))
+        self.hold_seconds = config.get('hold_seconds', 2.0)
+        self.dial_prefix = config.get('dial_prefix', '1')
+        self.lead_file = config.get('lead_file', '')
+        self.lead_server = config.get('lead_server', '')
+        self.dnc_file = config.get('dnc_file', '')
+        self.order_leads = config.get('order_leads', True)
+        self.calling_windows = None
+        if config.get('calling_hours', True):
+            self.calling_windows = CallingWindows(config.get('calling_hours_start', 8),
+                                                  config.get('calling_hours_end', 21))
+        self.redial_policy = None
+        if config.get('redial', True):
+            try:
+                self.redial_policy = RedialPolicy.from_settings(
+                    config.get('redial_spacing', '4h, 1d, 3d'),
+                    config.get('redial_max_attempts', 4),
+                    config.get('redial_rules', ''))
+            except ValueError as e:
+                print(f"Redial settings invalid, redials off: {e}")
+
+        # Lead source
+        if self.lead_source is not None:
+            self.lead_source.close()
+        self.lead_source = create_lead_source(
+            self.backend, self.lead_file, self.spreadsheet_window_title,
+            clock=lambda: self.now_ms() / 1000, windows=self.calling_windows,
+            redial=self.redial_policy, lead_server=self.lead_server
+        )
+        if (self.order_leads and self.answer_model is not None and
+                isinstance(self.lead_source, FileLeadSource)):
+            self.lead_source = OrderedLeadSource(
+                self.lead_source, self.answer_model.score,
+                lambda: self.now_ms() / 1000)
+        if self.callbacks is not None:
+            self.lead_source = CallbackLeadSource(self.lead_source, self.callbacks)
+
+        # Do-not-call suppression
+        if self.suppression is not None:
+            self.suppression.close()
+        self.suppression = None
+        if self.dnc_file:
+            try:
+                from suppression import open_suppression  # loads numpy
+                self.suppression = open_suppression(self.dnc_file)
+            except Exception as e:
+                print(f"Suppression index unavailable: {e}")
+
+        # Goals
+        self.daily_goal = config.get('daily_goal', 300)
+        self.weekly_goal = config.get('weekly_goal', 1500)
+        self.best_hourly_rate = config.get('best_hourly_rate', 0)
+
+        # Statistics
+        stats = self.stats_manager.load_stats()
+        self.total_calls = stats.get('total_calls', 0)
+        self.weekly_calls = stats.get('weekly_calls', 0)
+        self.suppressed_calls = stats.get('suppressed_calls', 0)
+        self.session_calls = stats.get('session_calls', 0)
+        self.session_display_calls = self.session_calls
+
+    def is_configured(self):
+        """True once the dialer, a lead source and coordinates are set"""
+        return all([self.dialer_window_title,
+                    self.spreadsheet_window_title or self.lead_file or self.lead_server,
+                    self.hangup_x, self.dial_x])
+
+    def start(self):
+        """Start automated dialing in a background thread"""
+        if self.running:
+            return False
+
+        self.running = True
+        self.force_break = False
+        self.dialing_active = False
+
+        if self.first_start_time == 0:
+            self.first_start_time = self.now_ms()
+            self.session_active = True
+
+        self.session_start_time = self.now_ms()
+
+        self.on_status("DIALING NEXT...")
+
+        self.dial_thread = threading.Thread(target=self.dial_loop, daemon=True)
+        self.dial_thread.start()
+        return True
+
+    def count_call(self):
+        """Count a dial and persist the counters"""
+        with self._state_lock:
+            if self.stats_manager.check_weekly_reset():
+                self.weekly_calls = 0
+            self.total_calls += 1
+            self.weekly_calls += 1
+            self.session_calls += 1
+            self.session_display_calls = self.session_calls
+            self.rate_window.add(self.now_ms() / 1000)
+
+            self.save_daily_count()
+            self.stats_manager.save_stats({
+                'total_calls': self.total_calls,
+                'weekly_calls': self.weekly_calls,
+            })
+
+    def count_abandoned(self):
+        """Count an answer hung up for want of a free agent"""
+        with self._state_lock:
+            self.abandoned_calls += 1
+
+    def emit_stats(self):
+        """Send the call counters to the front end"""
+        self.on_stats({
+            'connected': self.connected_calls,
+            'abandoned': self.abandoned_calls,
+            'session_calls': self.session_calls,
+            'weekly_calls': self.weekly_calls,
+            'total_calls': self.total_calls,
+        })
+
+    def dial_loop(self):
+        """Main dialing automation loop"""
+        handlers = {
+            COPYING: self.copy_state,
+            DIALING: self.dial_state,
+            WAITING: self.wait_state,
+            ON_CALL: self.on_call_state,
+            HANGING_UP: self.hangup_state,
+        }
+        if self.lines > 1 and self.backend.max_lines > 1:
+            from parallel_dialer import ParallelDialer
+            self.dialer = ParallelDialer(self, min(self.lines, self.backend.max_lines),
+                                         self.hold_seconds)
+            self.dialer.run()
+            self.set_state(IDLE)
+            return
+
+        state = self.start_cycle()
+        while self.running and state != IDLE:
+            self.set_state(state)
+            state = handlers[state]()
+        self.set_state(IDLE)
+
+    def start_cycle(self):
+        """Count the dial, bring the dialer forward and pick the next state"""
+        self.count_call()
+        self.emit_stats()
+
+        if not self.running:
+            return IDLE
+
+        # Activate dialer (waits until it is in front)
+        with self.phase('activate'):
+            self.backend.activate_window(self.dialer_window_title)
+
+        return ON_CALL if self.on_call else COPYING
+
+    def on_call_state(self):
+        """Show the call timer until the call is ended"""
+        self.on_status("ON CALL - WAITING...")
+        self.on_countdown('call', self.call_start_time / 1000 * self.time_scale)
+        self.wait_for_signal(lambda: not (self.on_call and self.running), None)
+        return COPYING
+
+    def copy_state(self):
+        """Get the next lead (file row, or spreadsheet copy)"""
+        self.on_status("COPYING NEXT NUMBER...")
+        with self.phase('copy'):
+            self.lead = self.next_dialable_lead()
+
+        if self.lead is None:
+            due = self.lead_source.next_due()
+            if due is None:
+                self.running = False
+                self.on_status("NO MORE LEADS")
+                return IDLE
+
+            # Leads left are outside calling hours or callbacks not yet due
+            self.on_status(f"WAITING - NEXT LEAD AT "
+                           f"{time.strftime('%a %H:%M', time.localtime(due * self.time_scale))}")
+            self.leads_changed = False
+            self.wait_for_signal(lambda: not self.running or self.leads_changed,
+                                 max(0.0, due - self.now_ms() / 1000))
+            return COPYING
+        return DIALING
+
+    def dial_state(self):
+        """Activate dialer and dial"""
+        self.on_status("DIALING...")
+        with self.phase('dial'):
+            success = self.dial_lead(self.lead)
+
+        if not success:
+            self.dial_failed()
+            return IDLE
+
+        # Move to hangup position
+        self.backend.move_to(self.hangup_x, self.hangup_y)
+        return WAITING
+
+    def dial_failed(self):
+        """Stop the dial loop and tell the user the dialer could not be driven"""
+        self.attempt_phases = {}
+        self.running = False
+        self.on_status("DIAL FAILED")
+        self.on_warning("Dial Failed",
+                        f"Could not dial through {self.dialer_window_title or 'the dialer'}"
+                        " - dialing stopped.")
+
+    def wait_state(self):
+        """Wait for an answer, Hangup & Next, stop or the timeout"""
+        self.dialing_active = True
+        self.on_status("WAITING FOR CALL...")
+
+        def interrupted():
+            return not self.running or self.force_break or self.on_call
+
+        with self.phase('wait'):
+            timeout = self.wait_time / 1000 * self.time_scale
+            self.on_countdown('wait', time.time() + timeout)
+            self.wait_for_signal(interrupted, self.wait_time / 1000)
+
+        self.dialing_active = False
+        if self.attempt is not None:
+            if self.on_call:
+                self.attempt['outcome'] = CONNECTED
+            elif self.force_break:
+                self.attempt['outcome'] = FORCED_NEXT
+            elif not self.running:
+                self.attempt['outcome'] = STOPPED
+        self.force_break = False
+
+        if self.on_call:
+            return self.start_cycle()
+        if not self.running:
+            self.finish_attempt()
+        return HANGING_UP
+
+    def hangup_state(self):
+        """Click hangup and give the dialer time to clear the line"""
+        with self.phase('hangup'):
+            self.backend.hangup(self.hangup_x, self.hangup_y)
+        # Stop ends the settle early
+        with self.phase('post_hangup'):
+            start = time.monotonic()
+            self.wait_for_signal(lambda: not self.running, HANGUP_SETTLE)
+            self.backend.record_wait('hangup', time.monotonic() - start)
+
+        self.finish_attempt()
+        self.on_status("DIALING NEXT...")
+        return self.start_cycle()
+
+    def stop(self):
+        """Stop automated dialing"""
+        if self.running:
+            if self.on_call:
+                self.on_warning("Cannot Stop",
+                                "You are currently on a call! End the call first.")
+                return False
+
+            self.running = False
+            self.force_break = False
+            self.dialing_active = False
+            self.notify()
+
+            self.on_status("DIALING PAUSED")
+            self.save_session_stats()
+        return True
+
+    def hangup_next(self):
+        """Hangup and dial next number"""
+        if self.on_call:
+            self.on_warning("Cannot Hangup",
+                            "You are currently on a call! End the call first.")
+            return False
+
+        # While dialing, the loop hangs up and moves on as soon as it wakes
+        if self.running:
+            self.force_break = True
+            self.dialing_active = False
+            self.notify()
+            self.on_status("DIALING NEXT...")
+            return True
+
+        # Otherwise click hangup and do a manual dial
+        self.finish_attempt(FORCED_NEXT)
+        self.backend.hangup(self.hangup_x, self.hangup_y)
+        self.sleep(0.3)
+
+        self.on_status("HANGUP + NEXT...")
+
+        success = self.manual_dial_next()
+        if success:
+            self.on_status("MANUAL DIAL COMPLETE")
+        return True
+
+    def next_dialable_lead(self):
+        """Next lead from the source, skipping do-not-call numbers"""
+        with self._state_lock:
+            return self._next_dialable_lead()
+
+    def _next_dialable_lead(self):
+        skipped = None
+        while True:
+            lead = self.lead_source.next_lead()
+            if lead is None or self.suppression is None:
+                return lead
+
+            number = lead.number
+            if number is None:
+                number = self.backend.read_clipboard()
+                if number == skipped:
+                    return None  # Down no longer moves: end of the sheet
+            if not self.suppression.is_suppressed(number):
+                return lead
+
+            # Skip and count it - never dial
+            self.suppressed_calls += 1
+            self.lead_source.mark_dialed(lead)
+            self.stats_manager.save_stats({
+                'suppressed_calls': self.suppressed_calls,
+            })
+            self.on_status(f"SKIPPED DNC ({self.suppressed_calls})")
+            skipped = number
+
+    def dial_lead(self, lead):
+        """Dial a lead - typed directly, or pasted from the clipboard"""
+        if lead.number is None:
+            success = self.backend.paste_and_dial(
+                self.dialer_window_title,
+                self.dial_x, self.dial_y,
+                self.dial_prefix
+            )
+        else:
+            success = self.backend.dial_number(
+                self.dialer_window_title,
+                self.dial_x, self.dial_y,
+                dial_digits(lead.number, self.dial_prefix)
+            )
+
+        if success:
+            with self._state_lock:
+                self.lead_source.mark_dialed(lead)
+            self.begin_attempt(lead)
+        return success
+
+    def manual_dial_next(self):
+        """Manual dialing sequence"""
+        self.on_status("MANUAL DIALING...")
+
+        with self.phase('manual_dial'):
+            # Get the next lead
+            with self.phase('copy'):
+                lead = self.next_dialable_lead()
+            if lead is None:
+                due = self.lead_source.next_due()
+                if due is not None:
+                    self.on_warning("No Lead Ready",
+                                    "No lead can be dialed until " +
+                                    time.strftime('%a %H:%M', time.localtime(due * self.time_scale)))
+                else:
+                    self.on_warning("Error",
+                                    f"No next number from {self.lead_source.description}!")
+                return False
+
+            # Dial it
+            with self.phase('dial'):
+                success = self.dial_lead(lead)
+
+        if success:
+            # Update counts
+            self.count_call()
+            self.on_status("MANUAL CALL DIALED")
+            return True
+
+        return False
+
+    def toggle_call(self):
+        """Toggle on/off call with auto-hangup and auto-dial"""
+        with self.phase('toggle_call'):
+            self._toggle_call()
+
+    def _toggle_call(self):
+        if self.on_call:
+            # End call - first hangup
+            if self.agent_line is not None:
+                self.backend.hangup_line(self.agent_line)
+                self.agent_line = None
+            else:
+                self.backend.hangup(self.hangup_x, self.hangup_y)
+            self.sleep(0.5)
+
+            call_duration = self.now_ms() - self.call_start_time
+            with self._state_lock:
+                self.total_talk_time += call_duration
+
+                # Update connected calls
+                self.connected_calls += 1
+            self.finish_attempt(CONNECTED, call_duration)
+            self.on_call = False
+            self.notify()
+
+            self.on_status("CALL ENDED + HANGUP")
+
+            # Auto-dial next if not running
+            if not self.running:
+                self.sleep(0.5)
+                self.manual_dial_next()
+        else:
+            # Start call
+            self.start_call()
+
+        # Update stats
+        self.on_stats({
+            'connected': self.connected_calls,
+            'on_call': self.on_call,
+        })
+
+    def start_call(self):
+        """The agent is on a live call"""
+        with self._state_lock:
+            self.connected_calls += 1
+        self.call_start_time = self.now_ms()
+        self.on_call = True
+        self.notify()
+
+        self.on_status("LIVE CALL")
+        self.on_notify("Live Call!", "Client answered!")
+
+    def connect_agent(self, line, attempt):
+        """Bridge an answered line to the agent (parallel dialing)"""
+        self.finish_attempt()
+        self.attempt = attempt
+        self.agent_line = line
+        self.start_call()
+        self.backend.connect_line(line)
+        self.on_stats({
+            'connected': self.connected_calls,
+            'on_call': self.on_call,
+        })
+
+    def update_rate(self):
+        """Recalculate the hourly rates and keep the best full hour"""
+        if self.session_active:
+            now_ms = self.now_ms()
+            elapsed = (now_ms - self.first_start_time) / 1000
+            if elapsed > 0:
+                # Until an hour has passed, rates cover the session so far
+                now = now_ms / 1000
+                self.current_hour_rate = self.rate_window.rate(3600, now, elapsed)
+                self.rate_15m = self.rate_window.rate(900, now, elapsed)
+                self.rate_5m = self.rate_window.rate(300, now, elapsed)
+
+                # Only a complete 60-minute window can set the best rate
+                if (elapsed >= 3600 and
+                    self.current_hour_rate > self.best_hourly_rate):
+                    self.best_hourly_rate = self.current_hour_rate
+                    self.config_manager.save_setting(
+                        'BestHourlyRate', self.best_hourly_rate, 'Goals'
+                    )
+
+    def progress(self):
+        """Daily and weekly goal progress in percent"""
+        daily_progress = 0
+        if self.daily_goal > 0:
+            daily_progress = min(100, round(
+                (self.session_display_calls / self.daily_goal) * 100
+            ))
+
+        weekly_progress = 0
+        if self.weekly_goal > 0:
+            weekly_progress = min(100, round(
+                (self.weekly_calls / self.weekly_goal) * 100
+            ))
+
+        return daily_progress, weekly_progress
+
+    def save_daily_count(self):
+        """Save daily call count with auto-reset at midnight"""
+        self.stats_manager.save_daily_count(self.session_calls)
+
+    def save_session_stats(self):
+        """Save session statistics"""
+        if self.session_active:
+            total_session_ms = self.now_ms() - self.first_start_time
+            self.stats_manager.save_session_stats(
+                self.total_calls,
+                total_session_ms,
+                self.current_hour_rate,
+                self.best_hourly_rate
+            )
+
+    def shutdown(self):
+        """Stop dialing and flush everything to disk"""
+        self.running = False
+        self.notify()
+        if self.dial_thread is not None and self.dial_thread is not threading.current_thread():
+            self.dial_thread.join(SHUTDOWN_TIMEOUT)  # let the last step finish
+        self.save_session_stats()
+        self.finish_attempt()
+        if self.history is not None:
+            self.history.close()
+        if self.span_exporter is not None:
+            self.span_exporter.close()
+        self.stats_manager.close()
+        self.config_manager.flush()
+        if self.lead_source is not None:
+            self.lead_source.close()
+        if self.callbacks is not None:
+            self.callbacks.close()
+
+
+def create_engine(backend=None):
+    """DialEngine on the app's settings, stats and data files in the working directory
+
+    The backend defaults to MacAutomation. Front ends (the Qt window, the
+    console daemon) set the on_* callbacks on the engine they get back.
+    """
+    from config_manager import ConfigManager
+    from stats_manager import StatsManager
+    if backend is None:
+        from mac_automation import MacAutomation
+        backend = MacAutomation()
+
+    engine = DialEngine(backend, ConfigManager(), StatsManager())
+    engine.enable_span_export('spans.jsonl')
+    engine.enable_call_history('call_history.db')
+    engine.enable_callbacks('callbacks.log')
+    engine.load_configuration()
+    return engine
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# dialloop_cli.py
+"""
+Console front end for DialLoop Pro - the dial loop without the Qt window
+
+Runs the same DialEngine as the window, headless, with JSON-lines logs,
+a pidfile and a status file in the working directory. Set DialLoop up
+in the window first; the daemon uses the same settings.ini and stats.
+
+Usage: dialloop {run,start,stop,status,oncall,next} [--dir DIR] [--simulate SCALE]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from file_utils import atomic_write
+
+PID_FILE = 'dialloop.pid'
+STATUS_FILE = 'dialloop.status.json'
+LOG_FILE = 'dialloop.log'
+# Settings and stats of --simulate runs, kept apart from the real ones
+SIMULATE_DIR = 'simulate'
+
+# Seconds between status file writes while something changed
+STATUS_INTERVAL = 1.0
+START_TIMEOUT = 10.0
+STOP_TIMEOUT = 30.0
+
+
+def max_rss_mb():
+    """Peak resident memory of this process in MB"""
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3  # bytes vs KB
+
+
+def read_pid(path=PID_FILE):
+    """Pid in a pidfile if that process is alive, else None"""
+    try:
+        with open(path) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def read_status(path=STATUS_FILE):
+    """Last status the daemon wrote, or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Daemon:
+    """Runs a DialEngine headless until SIGTERM or SIGINT
+
+    Engine events are logged as JSON lines (ts, level, event, fields) and
+    a snapshot of the engine is kept in a JSON status file, rewritten at
+    most once a second when something changed, for `dialloop status`.
+    SIGUSR1 presses On/Off Call and SIGUSR2 Hangup & Next, the headless
+    stand-ins for the window's hotkeys. On SIGTERM or SIGINT - or when
+    the dial loop ends by itself - the engine is shut down, which waits
+    for the current dial step and flushes stats, history and the lead
+    source, and the pidfile is removed.
+    """
+
+    def __init__(self, engine, log=sys.stdout, started_at=None):
+        self.engine = engine
+        self.log_file = log
+        self.started_at = started_at or time.time()
+        self.status_text = ''
+        self.stopping = threading.Event()
+        self.reason = None
+        self._dirty = True
+        self._log_lock = threading.Lock()
+
+    def log(self, event, level='info', **fields):
+        """Write one JSON log line"""
+        line = json.dumps(dict({'ts': round(time.time(), 3), 'level': level,
+                                'event': event}, **fields))
+        with self._log_lock:
+            self.log_file.write(line + '\n')
+            self.log_file.flush()
+
+    def attach(self):
+        """Take the engine's callbacks"""
+        engine = self.engine
+        engine.on_status = self.on_status
+        engine.on_stats = self.on_stats
+        engine.on_warning = lambda title, text: self.log('warning', 'warning',
+                                                         title=title, text=text)
+        engine.on_notify = lambda title, text: self.log('notify', title=title, text=text)
+        engine.state_listeners.append(lambda state: self.changed())
+
+    def changed(self):
+        self._dirty = True
+
+    def on_status(self, text):
+        self.status_text = text
+        self.changed()
+        self.log('status', text=text)
+
+    def on_stats(self, stats):
+        self.changed()
+        self.log('stats', **stats)
+
+    def snapshot(self):
+        """Engine state and counters for the status file"""
+        engine = self.engine
+        engine.update_rate()
+        daily, weekly = engine.progress()
+        return {
+            'pid': os.getpid(),
+            'started_at': round(self.started_at, 3),
+            'updated_at': round(time.time(), 3),
+            'running': engine.running,
+            'state': engine.state,
+            'on_call': engine.on_call,
+            'status': self.status_text,
+            'lead_source': getattr(engine.lead_source, 'description', ''),
+            'session_calls': engine.session_calls,
+            'total_calls': engine.total_calls,
+            'weekly_calls': engine.weekly_calls,
+            'connected': engine.connected_calls,
+            'suppressed': engine.suppressed_calls,
+            'abandoned': engine.abandoned_calls,
+            'talk_seconds': engine.total_talk_time // 1000,
+            'rate_hour': round(engine.current_hour_rate, 1),
+            'daily_progress': daily,
+            'weekly_progress': weekly,
+            'max_rss_mb': round(max_rss_mb(), 1),
+        }
+
+    def write_status(self, force=False):
+        """Rewrite the status file if anything changed"""
+        if self._dirty or force:
+            self._dirty = False
+            atomic_write(STATUS_FILE, json.dumps(self.snapshot(), indent=1) + '\n')
+
+    def stop(self, reason):
+        """Ask the main loop to shut down (safe from a signal handler)"""
+        self.reason = self.reason or reason
+        self.stopping.set()
+
+    def press(self, action):
+        """Run a button press off the main thread (it may block on automation)"""
+        threading.Thread(target=action, daemon=True).start()
+
+    def run(self):
+        """Dial until signalled or out of leads; returns the exit code"""
+        engine = self.engine
+        self.attach()
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop('SIGTERM'))
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop('SIGINT'))
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.press(engine.toggle_call))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self.press(engine.hangup_next))
+
+        if not engine.is_configured():
+            self.log('error', 'error', text="Not configured - set DialLoop up in the "
+                                            "window first")
+            engine.shutdown()
+            return 1
+        atomic_write(PID_FILE, f"{os.getpid()}\n")
+        self.log('started', pid=os.getpid(), lead_source=engine.lead_source.description,
+                 startup_seconds=round(time.time() - self.started_at, 3))
+        engine.start()
+        self.write_status(force=True)
+
+        while not self.stopping.wait(STATUS_INTERVAL):
+            self.write_status()
+            if not engine.dial_thread.is_alive():
+                self.stop('finished')  # out of leads, or the dialer failed
+
+        self.log('stopping', reason=self.reason)
+        engine.shutdown()
+        self.status_text = "STOPPED"
+        self.write_status(force=True)
+        try:
+            os.remove(PID_FILE)
+        except OSError:
+            pass
+        self.log('stopped', session_calls=engine.session_calls,
+                 total_calls=engine.total_calls, connected=engine.connected_calls)
+        return 0
+
+
+def build_engine(args):
+    """The engine for a run: the Mac backend, or the simulator with --simulate"""
+    if args.simulate:
+        from simulator_backend import create_simulated_engine
+        os.makedirs(SIMULATE_DIR, exist_ok=True)
+        engine, backend = create_simulated_engine(SIMULATE_DIR, args.simulate, seed=1)
+        return engine
+    from dial_engine import create_engine
+    return create_engine()
+
+
+def cmd_run(args):
+    """Run in the foreground, logging to stdout"""
+    if read_pid() is not None:
+        print(f"DialLoop is already running (pid {read_pid()})", file=sys.stderr)
+        return 1
+    started_at = time.time()
+    return Daemon(build_engine(args), started_at=started_at).run()
+
+
+def cmd_start(args):
+    """Start the daemon in the background, logging to dialloop.log"""
+    pid = read_pid()
+    if pid is not None:
+        print(f"DialLoop is already running (pid {pid})")
+        return 1
+    command = [sys.executable, os.path.abspath(__file__), 'run']
+    if args.simulate:
+        command += ['--simulate', str(args.simulate)]
+    start = time.time()
+    with open(LOG_FILE, 'a') as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log,
+                                   stderr=subprocess.STDOUT, start_new_session=True)
+    # Ready once it has written its first status
+    while time.time() - start < START_TIMEOUT:
+        status = read_status()
+        if status is not None and status.get('pid') == process.pid:
+            print(f"DialLoop started (pid {process.pid}) in {time.time() - start:.2f} s")
+            return 0
+        if process.poll() is not None:
+            print(f"DialLoop exited with code {process.returncode} - see {LOG_FILE}")
+            return 1
+        time.sleep(0.02)
+    print(f"DialLoop did not report in within {START_TIMEOUT:g} s - see {LOG_FILE}")
+    return 1
+
+
+def cmd_stop(args):
+    """Stop the daemon and wait for it to flush and exit"""
+    pid = read_pid()
+    if pid is None:
+        print("DialLoop is not running")
+        return 1
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.time() + STOP_TIMEOUT
+    while time.time() < deadline:
+        if read_pid() is None:
+            status = read_status() or {}
+            print(f"DialLoop stopped ({status.get('session_calls', 0)} calls this session)")
+            return 0
+        time.sleep(0.05)
+    print(f"DialLoop (pid {pid}) did not stop within {STOP_TIMEOUT:g} s")
+    return 1
+
+
+def cmd_status(args):
+    """Print the daemon's last status"""
+    pid = read_pid()
+    status = read_status()
+    if args.json:
+        print(json.dumps(dict(status or {}, alive=pid is not None)))
+        return 0 if pid is not None else 3
+    if pid is None:
+        print("DialLoop is not running")
+        if status is not None:
+            print(f"Last run: {status['session_calls']} calls, {status['connected']} connected")
+        return 3
+    if status is None or status.get('pid') != pid:
+        print(f"DialLoop starting (pid {pid})")
+        return 0
+    print(f"DialLoop running (pid {pid}) - {status['status'] or status['state'].upper()}")
+    print(f"  Calls:     {status['session_calls']} this session, {status['total_calls']} total")
+    print(f"  Connected: {status['connected']}, talk time {status['talk_seconds']}s")
+    print(f"  Rate:      {status['rate_hour']:g}/hour, today {status['daily_progress']}% "
+          f"of goal")
+    print(f"  Leads:     {status['lead_source']}, memory {status['max_rss_mb']:g} MB")
+    return 0
+
+
+def cmd_signal(signum, label):
+    """A command that presses a button on the running daemon"""
+    def command(args):
+        pid = read_pid()
+        if pid is None:
+            print("DialLoop is not running")
+            return 1
+        os.kill(pid, signum)
+        print(label)
+        return 0
+    return command
+
+
+COMMANDS = {
+    'run': (cmd_run, "dial in the foreground, logging JSON lines to stdout"),
+    'start': (cmd_start, "start dialing in the background"),
+    'stop': (cmd_stop, "stop dialing, flush stats and exit"),
+    'status': (cmd_status, "show what the daemon is doing"),
+    'oncall': (cmd_signal(signal.SIGUSR1, "On/Off Call pressed"), "press On/Off Call"),
+    'next': (cmd_signal(signal.SIGUSR2, "Hangup & Next pressed"), "press Hangup & Next"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='dialloop', description="DialLoop Pro without the window")
+    parser.add_argument('command', choices=COMMANDS,
+                        help='; '.join(f"{name}: {help}" for name, (_, help) in COMMANDS.items()))
+    parser.add_argument('--dir', default='.',
+                        help="folder with settings.ini and stats (default: current)")
+    parser.add_argument('--simulate', type=float, metavar='SCALE',
+                        help="dial the simulator instead, with time scaled by SCALE "
+                             f"(0.01 = 100x speed; its settings and stats go in "
+                             f"{SIMULATE_DIR}/ under --dir, not the real ones)")
+    parser.add_argument('--json', action='store_true', help="status as JSON")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.dir)
+    return COMMANDS[args.command][0](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
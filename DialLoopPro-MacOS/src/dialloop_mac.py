@@ -6,30 +6,17 @@ Complete calling automation system for macOS
 """
 
 import sys
-import os
-import time
-import json
-import threading
-from datetime import datetime, timedelta
+import signal
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QLabel, QPushButton, QProgressBar,
                             QSystemTrayIcon, QMenu, QAction, QMessageBox,
-                            QGroupBox, QGridLayout)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
-from PyQt5.QtGui import QIcon, QFont, QColor, QPalette
-import pyautogui
-import pynput
-from pynput import keyboard
-import applescript
-import Quartz
-from AppKit import NSWorkspace
-import configparser
-import signal
+                            QGroupBox, QGridLayout, QInputDialog)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QFont
 
 # Local imports
-from mac_automation import MacAutomation
-from config_manager import ConfigManager
-from stats_manager import StatsManager
+from dial_engine import create_engine
+from view_model import DisplayModel, STATUS_STYLES, format_time
 
 class DialLoopMac(QMainWindow):
     """Main application window - macOS edition"""
@@ -37,99 +24,65 @@ class DialLoopMac(QMainWindow):
     # Signals for thread-safe GUI updates
     update_status = pyqtSignal(str)
     update_stats = pyqtSignal(dict)
-    update_progress = pyqtSignal(int, int)  # daily, weekly
+    update_countdown = pyqtSignal(str, float)  # kind, epoch seconds
+    warning = pyqtSignal(str, str)  # title, text
+    notification = pyqtSignal(str, str)  # title, text
     
     def __init__(self):
         super().__init__()
-        self.running = False
-        self.on_call = False
-        self.dialing_active = False
-        self.force_break = False
         self.first_run = False
         
         # Window visibility
         self.indicator_visible = True
         self.quick_access_visible = False
         
-        # Statistics
-        self.total_calls = 0
-        self.session_calls = 0
-        self.session_display_calls = 0
-        self.weekly_calls = 0
-        self.connected_calls = 0
-        self.total_talk_time = 0
-        
-        # Goals
-        self.daily_goal = 300
-        self.weekly_goal = 1500
-        self.best_hourly_rate = 0
-        
-        # Hourly tracking
-        self.current_hour_start = 0
-        self.current_hour_calls = 0
-        self.current_hour_rate = 0
-        
-        # Timing
-        self.call_start_time = 0
-        self.session_start_time = 0
-        self.first_start_time = 0
-        self.session_active = False
-        
-        # Configuration
-        self.config_manager = ConfigManager()
-        self.stats_manager = StatsManager()
-        self.automation = MacAutomation()
+        # Dialing engine - all dialing state and statistics live here; this
+        # window is one front end on it, dialloop_cli.py is another
+        self.engine = create_engine()
+        self.config_manager = self.engine.config_manager
+        self.stats_manager = self.engine.stats_manager
+        self.automation = self.engine.backend
+        self.engine.on_status = self.update_status.emit
+        self.engine.on_stats = self.update_stats.emit
+        self.engine.on_warning = self.warning.emit
+        self.engine.on_notify = self.notification.emit
+        self.engine.on_countdown = self.update_countdown.emit
         
         # Threading
-        self.dial_thread = None
         self.hotkey_listener = None
         
-        # Setup
-        self.load_configuration()
+        # Setup (the engine has loaded the configuration)
+        self.first_run = not self.engine.is_configured()
         self.setup_gui()
-        self.setup_hotkeys()
+        self.display = DisplayModel(self.render_fields, self.engine.time_scale)
+        # pynput is slow to load - hook the hotkeys once the window is up
+        QTimer.singleShot(0, self.setup_hotkeys)
         self.setup_tray()
         self.check_first_run()
         
         # Connect signals
         self.update_status.connect(self.update_status_text)
         self.update_stats.connect(self.update_stats_display)
-        self.update_progress.connect(self.update_progress_bars)
+        self.update_countdown.connect(self.display.start_countdown)
+        self.warning.connect(self.show_warning)
+        self.notification.connect(self.show_notification)
         
         # Start update timer
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_display)
         self.update_timer.start(1000)  # Update every second
         
+        # Wait/call countdown is rendered here, not ticked by the engine
+        self.countdown_timer = QTimer()
+        self.countdown_timer.timeout.connect(self.display.tick)
+        self.countdown_timer.start(200)
+        
     def load_configuration(self):
         """Load configuration from INI files"""
-        config = self.config_manager.load_config()
-        
-        # Basic configuration
-        self.dialer_window_title = config.get('dialer_title', '')
-        self.spreadsheet_window_title = config.get('spreadsheet_title', '')
-        self.hangup_x = config.get('hangup_x', 0)
-        self.hangup_y = config.get('hangup_y', 0)
-        self.dial_x = config.get('dial_x', 0)
-        self.dial_y = config.get('dial_y', 0)
-        self.wait_time = config.get('wait_time', 35000)
-        self.dial_prefix = config.get('dial_prefix', '1')
-        
-        # Goals
-        self.daily_goal = config.get('daily_goal', 300)
-        self.weekly_goal = config.get('weekly_goal', 1500)
-        self.best_hourly_rate = config.get('best_hourly_rate', 0)
-        
-        # Statistics
-        stats = self.stats_manager.load_stats()
-        self.total_calls = stats.get('total_calls', 0)
-        self.weekly_calls = stats.get('weekly_calls', 0)
-        self.session_calls = stats.get('session_calls', 0)
-        self.session_display_calls = self.session_calls
+        self.engine.load_configuration()
         
         # Check for first run
-        if not all([self.dialer_window_title, self.spreadsheet_window_title, 
-                    self.hangup_x, self.dial_x]):
+        if not self.engine.is_configured():
             self.first_run = True
     
     def setup_gui(self):
@@ -219,7 +172,7 @@ class DialLoopMac(QMainWindow):
         progress_layout = QVBoxLayout()
         
         # Daily progress
-        self.daily_label = QLabel(f"Today: 0/{self.daily_goal}")
+        self.daily_label = QLabel(f"Today: 0/{self.engine.daily_goal}")
         progress_layout.addWidget(self.daily_label)
         
         self.daily_progress = QProgressBar()
@@ -227,7 +180,7 @@ class DialLoopMac(QMainWindow):
         progress_layout.addWidget(self.daily_progress)
         
         # Weekly progress
-        self.weekly_label = QLabel(f"Week: 0/{self.weekly_goal}")
+        self.weekly_label = QLabel(f"Week: 0/{self.engine.weekly_goal}")
         progress_layout.addWidget(self.weekly_label)
         
         self.weekly_progress = QProgressBar()
@@ -255,6 +208,8 @@ class DialLoopMac(QMainWindow):
             ("👁 Hide Window", self.hide_window, 2, 1),
             ("📊 Statistics", self.show_stats, 3, 0),
             ("🎯 Goals", self.update_goals, 3, 1),
+            ("⏰ Callbacks", self.show_callbacks, 4, 0),
+            ("⤵ Go to Row", self.go_to_row, 4, 1),
         ]
         
         for text, slot, row, col in buttons:
@@ -271,11 +226,25 @@ class DialLoopMac(QMainWindow):
         footer.setStyleSheet("color: #8e8e93; font-size: 11px;")
         footer.setAlignment(Qt.AlignCenter)
         layout.addWidget(footer)
+        
+        # Widget setters for display model fields
+        self.field_setters = {
+            'status': self.status_label.setText,
+            'status_kind': self.apply_status_style,
+            'connected': self.connected_label.setText,
+            'talk_time': self.talk_time_label.setText,
+            'daily': self.daily_label.setText,
+            'weekly': self.weekly_label.setText,
+            'rate': self.rate_label.setText,
+            'daily_progress': self.daily_progress.setValue,
+            'weekly_progress': self.weekly_progress.setValue,
+        }
     
     def setup_hotkeys(self):
         """Setup global hotkeys for macOS"""
         try:
             # Use pynput for global hotkeys
+            from pynput import keyboard
             self.hotkey_listener = keyboard.GlobalHotKeys({
                 '<cmd>+<alt>+c': self.start_dialing,
                 '<cmd>+<alt>+s': self.stop_dialing,
@@ -381,382 +350,69 @@ class DialLoopMac(QMainWindow):
     
     def start_dialing(self):
         """Start automated dialing"""
-        if self.running:
+        if self.engine.running:
             return
         
         # Check configuration
-        if not all([self.dialer_window_title, self.spreadsheet_window_title,
-                   self.hangup_x, self.dial_x]):
+        if not self.engine.is_configured():
             QMessageBox.warning(self, "Configuration Required",
                               "Please configure DialLoop first!")
             self.open_config()
             return
         
-        self.running = True
-        self.force_break = False
-        self.dialing_active = False
-        
-        if self.first_start_time == 0:
-            self.first_start_time = int(time.time() * 1000)
-            self.session_active = True
-            self.current_hour_start = int(time.time() * 1000)
-            self.current_hour_calls = 0
-        
-        self.session_start_time = int(time.time() * 1000)
-        
         # Show window if hidden
         if not self.isVisible():
             self.show()
         
-        self.update_status.emit("DIALING NEXT...")
-        
-        # Start dialing in separate thread
-        self.dial_thread = threading.Thread(target=self.dial_loop, daemon=True)
-        self.dial_thread.start()
-    
-    def dial_loop(self):
-        """Main dialing automation loop"""
-        while self.running:
-            # Count the call
-            self.total_calls += 1
-            self.weekly_calls += 1
-            self.session_calls += 1
-            self.session_display_calls = self.session_calls
-            self.current_hour_calls += 1
-            
-            # Save stats
-            self.save_daily_count()
-            self.stats_manager.save_stats({
-                'total_calls': self.total_calls,
-                'weekly_calls': self.weekly_calls,
-            })
-            
-            # Update GUI via signal
-            self.update_stats.emit({
-                'connected': self.connected_calls,
-                'session_calls': self.session_calls,
-                'weekly_calls': self.weekly_calls,
-                'total_calls': self.total_calls,
-            })
-            
-            # Check if stopped
-            if not self.running:
-                break
-            
-            # Activate dialer
-            self.automation.activate_window(self.dialer_window_title)
-            time.sleep(0.5)
-            
-            # Check if on call
-            if self.on_call:
-                self.update_status.emit("ON CALL - WAITING...")
-                
-                # Update call timer while on call
-                while self.on_call and self.running:
-                    call_duration = int(time.time() * 1000) - self.call_start_time
-                    seconds = call_duration // 1000
-                    self.update_status.emit(f"CALL {seconds:02d}s")
-                    time.sleep(1)
-                
-                if not self.running:
-                    break
-            
-            # Dialing sequence
-            self.update_status.emit("COPYING NEXT NUMBER...")
-            
-            # Activate spreadsheet and copy
-            success = self.automation.copy_next_number(
-                self.spreadsheet_window_title
-            )
-            
-            if not success or not self.running:
-                break
-            
-            # Activate dialer and paste
-            self.update_status.emit("DIALING...")
-            success = self.automation.paste_and_dial(
-                self.dialer_window_title,
-                self.dial_x, self.dial_y,
-                self.dial_prefix
-            )
-            
-            if not success or not self.running:
-                break
-            
-            # Move to hangup position
-            pyautogui.moveTo(self.hangup_x, self.hangup_y, duration=0.2)
-            
-            self.dialing_active = True
-            self.update_status.emit("WAITING FOR CALL...")
-            
-            # Wait for call
-            start_wait = int(time.time() * 1000)
-            while (self.running and 
-                   (int(time.time() * 1000) - start_wait < self.wait_time)):
-                
-                if self.force_break:
-                    self.force_break = False
-                    self.dialing_active = False
-                    break
-                
-                if self.on_call:
-                    self.dialing_active = False
-                    break
-                
-                # Update countdown
-                elapsed = int(time.time() * 1000) - start_wait
-                remaining = max(0, self.wait_time - elapsed)
-                seconds = remaining // 1000
-                self.update_status.emit(f"WAIT {seconds:02d}s")
-                time.sleep(0.1)
-            
-            self.dialing_active = False
-            
-            if not self.running:
-                break
-            
-            # If timer completed, click hangup
-            if not self.on_call:
-                pyautogui.click(self.hangup_x, self.hangup_y)
-                time.sleep(1.5)
-            
-            self.update_status.emit("DIALING NEXT...")
+        # Start dialing in a separate thread
+        self.engine.start()
     
     def stop_dialing(self):
         """Stop automated dialing"""
-        if self.running:
-            if self.on_call:
-                QMessageBox.warning(self, "Cannot Stop",
-                                  "You are currently on a call! End the call first.")
-                return
-            
-            self.running = False
-            self.force_break = False
-            self.dialing_active = False
-            
-            self.update_status.emit("DIALING PAUSED")
-            self.save_session_stats()
+        self.engine.stop()
     
     def hangup_next(self):
         """Hangup and dial next number"""
-        if self.on_call:
-            QMessageBox.warning(self, "Cannot Hangup",
-                              "You are currently on a call! End the call first.")
-            return
-        
-        # Click hangup
-        pyautogui.click(self.hangup_x, self.hangup_y)
-        time.sleep(0.3)
-        
-        self.update_status.emit("HANGUP + NEXT...")
-        
-        # If not running, do manual dial
-        if not self.running:
-            success = self.manual_dial_next()
-            if success:
-                self.update_status.emit("MANUAL DIAL COMPLETE")
-        else:
-            self.force_break = True
-            self.dialing_active = False
-            self.update_status.emit("DIALING NEXT...")
-    
-    def manual_dial_next(self):
-        """Manual dialing sequence"""
-        self.update_status.emit("MANUAL DIALING...")
-        
-        # Copy next number from spreadsheet
-        success = self.automation.copy_next_number(self.spreadsheet_window_title)
-        if not success:
-            QMessageBox.warning(self, "Error", "Spreadsheet not found!")
-            return False
-        
-        # Paste and dial
-        success = self.automation.paste_and_dial(
-            self.dialer_window_title,
-            self.dial_x, self.dial_y,
-            self.dial_prefix
-        )
-        
-        if success:
-            # Update counts
-            self.total_calls += 1
-            self.weekly_calls += 1
-            self.session_calls += 1
-            self.session_display_calls = self.session_calls
-            self.current_hour_calls += 1
-            
-            self.save_daily_count()
-            self.stats_manager.save_stats({
-                'total_calls': self.total_calls,
-                'weekly_calls': self.weekly_calls,
-            })
-            
-            self.update_status.emit("MANUAL CALL DIALED")
-            return True
-        
-        return False
+        self.engine.hangup_next()
     
     def toggle_call(self):
         """Toggle on/off call with auto-hangup and auto-dial"""
-        if self.on_call:
-            # End call - first hangup
-            pyautogui.click(self.hangup_x, self.hangup_y)
-            time.sleep(0.5)
-            
-            self.on_call = False
-            call_duration = int(time.time() * 1000) - self.call_start_time
-            self.total_talk_time += call_duration
-            
-            # Update connected calls
-            self.connected_calls += 1
-            
-            self.update_status.emit("CALL ENDED + HANGUP")
-            
-            # Auto-dial next if not running
-            if not self.running:
-                time.sleep(0.5)
-                success = self.manual_dial_next()
-        else:
-            # Start call
-            self.on_call = True
-            self.connected_calls += 1
-            self.call_start_time = int(time.time() * 1000)
-            
-            self.update_status.emit("LIVE CALL")
-            
-            # Show notification
-            self.tray_icon.showMessage("Live Call!", "Client answered!", 
-                                      QSystemTrayIcon.Information, 2000)
-        
-        # Update stats
-        self.update_stats.emit({
-            'connected': self.connected_calls,
-            'on_call': self.on_call,
-        })
-    
-    def save_daily_count(self):
-        """Save daily call count with auto-reset at midnight"""
-        self.stats_manager.save_daily_count(self.session_calls)
-    
-    def save_session_stats(self):
-        """Save session statistics"""
-        if self.session_active:
-            total_session_ms = int(time.time() * 1000) - self.first_start_time
-            self.stats_manager.save_session_stats(
-                self.total_calls,
-                total_session_ms,
-                self.current_hour_rate,
-                self.best_hourly_rate
-            )
+        self.engine.toggle_call()
+    
+    def show_warning(self, title, text):
+        """Show a warning from the engine"""
+        QMessageBox.warning(self, title, text)
+    
+    def show_notification(self, title, text):
+        """Show a tray notification from the engine"""
+        self.tray_icon.showMessage(title, text, QSystemTrayIcon.Information, 2000)
     
     def update_display(self):
         """Update all display elements"""
         # Calculate hourly rate
-        if self.session_active:
-            total_time_ms = int(time.time() * 1000) - self.first_start_time
-            if total_time_ms > 0:
-                self.current_hour_rate = round(
-                    (self.session_calls * 3600000) / total_time_ms, 1
-                )
-                
-                if (self.current_hour_rate > self.best_hourly_rate and 
-                    self.session_calls >= 10):
-                    self.best_hourly_rate = self.current_hour_rate
-                    self.config_manager.save_setting(
-                        'best_hourly_rate', self.best_hourly_rate
-                    )
-        
-        # Calculate progress
-        daily_progress = 0
-        if self.daily_goal > 0:
-            daily_progress = min(100, round(
-                (self.session_display_calls / self.daily_goal) * 100
-            ))
-        
-        weekly_progress = 0
-        if self.weekly_goal > 0:
-            weekly_progress = min(100, round(
-                (self.weekly_calls / self.weekly_goal) * 100
-            ))
-        
-        # Update progress bars via signal
-        self.update_progress.emit(daily_progress, weekly_progress)
-        
-        # Update labels
-        talk_time_seconds = self.total_talk_time // 1000
-        talk_time_str = self.format_time(talk_time_seconds)
-        
-        stats_dict = {
-            'connected': self.connected_calls,
-            'talk_time': talk_time_str,
-            'session_calls': self.session_display_calls,
-            'weekly_calls': self.weekly_calls,
-            'daily_goal': self.daily_goal,
-            'weekly_goal': self.weekly_goal,
-            'current_rate': self.current_hour_rate,
-            'best_rate': self.best_hourly_rate,
-        }
-        
-        self.update_stats.emit(stats_dict)
+        self.engine.update_rate()
+        self.display.refresh(self.engine)
+    
+    def render_fields(self, changed):
+        """Apply changed display model fields to their widgets"""
+        for field, value in changed.items():
+            self.field_setters[field](value)
+    
+    def apply_status_style(self, kind):
+        """Colour the status label (only called when the kind changes)"""
+        self.status_label.setStyleSheet(STATUS_STYLES[kind])
     
     def update_status_text(self, text):
         """Update status label (thread-safe)"""
-        self.status_label.setText(text)
-        
-        # Color coding
-        if "WAIT" in text:
-            if "05" in text or "04" in text or "03" in text or "02" in text or "01" in text or "00" in text:
-                self.status_label.setStyleSheet("color: #ff3b30;")  # Red
-            elif "10" in text or "09" in text or "08" in text or "07" in text or "06" in text:
-                self.status_label.setStyleSheet("color: #ff9500;")  # Orange
-            else:
-                self.status_label.setStyleSheet("color: #34c759;")  # Green
-        elif "CALL" in text:
-            self.status_label.setStyleSheet("color: #5856d6;")  # Purple
-        elif "LIVE" in text:
-            self.status_label.setStyleSheet("color: #ff2d55;")  # Pink
-        else:
-            self.status_label.setStyleSheet("color: #007aff;")  # Blue
+        self.display.set_status(text)
     
     def update_stats_display(self, stats):
         """Update statistics display (thread-safe)"""
-        self.connected_label.setText(f"Connected: {stats.get('connected', 0)}")
-        
-        if 'talk_time' in stats:
-            self.talk_time_label.setText(f"Talk Time: {stats['talk_time']}")
-        
-        if 'session_calls' in stats:
-            self.daily_label.setText(
-                f"Today: {stats['session_calls']}/{self.daily_goal}"
-            )
-        
-        if 'weekly_calls' in stats:
-            self.weekly_label.setText(
-                f"Week: {stats['weekly_calls']}/{self.weekly_goal}"
-            )
-        
-        if 'current_rate' in stats and 'best_rate' in stats:
-            self.rate_label.setText(
-                f"Rate: {stats['current_rate']}/hr | Best: {stats['best_rate']}/hr"
-            )
-    
-    def update_progress_bars(self, daily_progress, weekly_progress):
-        """Update progress bars (thread-safe)"""
-        self.daily_progress.setValue(daily_progress)
-        self.weekly_progress.setValue(weekly_progress)
+        self.display.refresh(self.engine)
     
     def format_time(self, seconds):
         """Format time in human-readable format"""
-        if seconds > 3600:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            return f"{hours}h {minutes}m"
-        elif seconds > 60:
-            minutes = seconds // 60
-            secs = seconds % 60
-            return f"{minutes}m {secs}s"
-        else:
-            return f"{seconds}s"
+        return format_time(seconds)
     
     def open_config(self):
         """Open configuration dialog"""
@@ -773,6 +429,35 @@ class DialLoopMac(QMainWindow):
         dialog = StatsDialog(self)
         dialog.exec_()
     
+    def show_callbacks(self):
+        """Schedule or cancel callbacks"""
+        from callback_dialog import CallbackDialog
+        dialog = CallbackDialog(self)
+        dialog.exec_()
+    
+    def go_to_row(self):
+        """Dial one line of the lead file next, or continue the list from it"""
+        line, ok = QInputDialog.getInt(self, "Go to Row", "Lead file line:", 1, 1)
+        if not ok:
+            return
+        row = line - 1  # rows count from 0
+        box = QMessageBox(self)
+        box.setWindowTitle("Go to Row")
+        box.setText(f"Dial line {line} next, or continue the list from line {line}?")
+        dial_next = box.addButton("Dial Next", QMessageBox.AcceptRole)
+        continue_from = box.addButton("Continue From Here", QMessageBox.AcceptRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        if box.clickedButton() is dial_next:
+            ok = self.engine.dial_row_next(row)
+        elif box.clickedButton() is continue_from:
+            ok = self.engine.jump_to_row(row)
+        else:
+            return
+        if not ok:
+            QMessageBox.warning(self, "Go to Row",
+                                "Going to a row needs a lead file (Configure > Lead File).")
+    
     def update_goals(self):
         """Update daily/weekly goals"""
         # Implementation for goals dialog
@@ -791,7 +476,7 @@ class DialLoopMac(QMainWindow):
     def quit_app(self):
         """Quit application"""
         self.stop_dialing()
-        self.save_session_stats()
+        self.engine.shutdown()
         QApplication.quit()
     
     def closeEvent(self, event):
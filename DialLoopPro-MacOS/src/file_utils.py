@@ -0,0 +1,26 @@
+# file_utils.py
+"""
+Small file helpers shared by the settings and statistics stores
+"""
+
+import os
+
+
+def atomic_write(path, text):
+    """Write text to path via a temp file that is renamed into place"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def set_aside(path, suffix):
+    """Rename a file that can no longer be used to path + suffix, keeping it"""
+    try:
+        os.replace(path, path + suffix)
+    except FileNotFoundError:
+        return False
+    print(f"Moved {path} aside to {path + suffix}")
+    return True
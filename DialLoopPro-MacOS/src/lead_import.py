@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# lead_import.py
+"""
+Multi-list lead import for DialLoop Pro
+
+Parses several lead files in a process pool, normalizes numbers to E.164
+in vectorized NumPy batches, removes duplicates across all files and
+writes one clean, dial-ready list.
+
+Usage: python3 lead_import.py -o clean.csv list1.csv list2.tsv ...
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_BYTES = 32 * 1024 * 1024
+BATCH_ROWS = 250_000
+FIELD_WIDTH = 24  # bytes kept per raw phone field
+
+ImportReport = namedtuple('ImportReport', [
+    'rows', 'valid', 'invalid', 'duplicates', 'written', 'seconds'
+])
+
+
+def normalize_numbers(raw, country_code=1):
+    """Normalize a batch of raw phone fields to E.164 integers
+
+    raw is a NumPy bytes array (dtype 'S<n>'). Returns an int64 array of
+    E.164 digits without the '+' (e.g. 15551234567), with 0 where the
+    field is not a valid number. Numbers written with a leading '+' are
+    kept as international numbers (8-15 digits); everything else is read
+    as a NANP number, with or without the leading 1.
+    """
+    raw = np.ascontiguousarray(raw)
+    n = len(raw)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    chars = raw.view(np.uint8).reshape(n, raw.dtype.itemsize)
+    is_digit = (chars >= 48) & (chars <= 57)
+    count = is_digit.sum(axis=1)
+    has_plus = (chars == 43).any(axis=1)
+
+    # Place value of each digit counted from the right (0 = last digit)
+    place = count[:, None] - np.cumsum(is_digit, axis=1)
+    place = np.where(is_digit & (place < 16), place, 16)
+    powers = np.append(10 ** np.arange(16, dtype=np.int64), 0)
+    digits = (chars.astype(np.int64) - 48) * powers[place]
+    values = digits.sum(axis=1)
+
+    # NANP: 10 digits, or 11 starting with the country code
+    national = np.where(count == 11, values - country_code * 10**10, values)
+    nanp = ~has_plus & (
+        (count == 10) | ((count == 11) & (values // 10**10 == country_code))
+    )
+    area_ok = (national // 10**9) % 10 >= 2
+    exchange_ok = (national // 10**6) % 10 >= 2
+    nanp &= area_ok & exchange_ok
+
+    international = has_plus & (count >= 8) & (count <= 15)
+
+    result = np.zeros(n, dtype=np.int64)
+    result[nanp] = country_code * 10**10 + national[nanp]
+    result[international] = values[international]
+    return result
+
+
+def normalize_number(text, country_code=1):
+    """Normalize a single number (convenience wrapper around the batch form)"""
+    raw = np.array([text.encode('utf-8', 'replace')[:FIELD_WIDTH]],
+                   dtype=f'S{FIELD_WIDTH}')
+    return int(normalize_numbers(raw, country_code)[0])
+
+
+def format_e164(value):
+    """Format a normalized integer as an E.164 string"""
+    return f"+{value}"
+
+
+def detect_layout(path):
+    """Guess the delimiter and phone column from the first lines of a file"""
+    with open(path, 'rb') as f:
+        sample = f.read(64 * 1024).splitlines()[:20]
+    delimiter = b'\t' if path.lower().endswith('.tsv') or (
+        sample and b'\t' in sample[0]) else b','
+
+    for line in sample:
+        for i, field in enumerate(line.split(delimiter)):
+            if sum(48 <= c <= 57 for c in field) >= 7:
+                return delimiter, i
+    return delimiter, 0
+
+
+def split_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """Split a file into (start, end) byte ranges aligned on newlines"""
+    size = os.path.getsize(path)
+    chunks = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                end += len(f.readline())
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def parse_chunk(path, start, end, delimiter, column, country_code=1):
+    """Worker: extract and normalize the phone column of one byte range
+
+    Returns (rows, values) where values holds a normalized number (or 0)
+    for every row of the chunk, in file order.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).splitlines()
+
+    fields = []
+    for line in lines:
+        parts = line.split(delimiter, column + 1)
+        fields.append(parts[column][:FIELD_WIDTH] if column < len(parts) else b'')
+
+    values = np.empty(len(fields), dtype=np.int64)
+    for i in range(0, len(fields), BATCH_ROWS):
+        batch = np.array(fields[i:i + BATCH_ROWS], dtype=f'S{FIELD_WIDTH}')
+        values[i:i + BATCH_ROWS] = normalize_numbers(batch, country_code)
+    return len(lines), values
+
+
+def dedupe(values):
+    """Drop zeros and duplicates, keeping the first occurrence in order"""
+    valid = values[values > 0]
+    _, first = np.unique(valid, return_index=True)
+    return valid[np.sort(first)]
+
+
+def write_clean_list(path, numbers):
+    """Write one E.164 number per row, with a header"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('phone\n')
+        if len(numbers):
+            f.write('+' + '\n+'.join(map(str, numbers.tolist())) + '\n')
+    os.replace(tmp_path, path)
+
+
+def import_leads(input_files, output_file, workers=None, column=None,
+                 country_code=1):
+    """Import, normalize and dedupe several lead files into one list"""
+    start_time = time.perf_counter()
+
+    jobs = []
+    for path in input_files:
+        delimiter, detected = detect_layout(path)
+        col = detected if column is None else column
+        for start, end in split_chunks(path):
+            jobs.append((path, start, end, delimiter, col, country_code))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_chunk, *job) for job in jobs]
+        results = [future.result() for future in futures]
+
+    rows = sum(r[0] for r in results)
+    values = (np.concatenate([r[1] for r in results]) if results
+              else np.zeros(0, dtype=np.int64))
+    valid = int((values > 0).sum())
+    clean = dedupe(values)
+    write_clean_list(output_file, clean)
+
+    return ImportReport(
+        rows=rows,
+        valid=valid,
+        # Header rows are counted as invalid
+        invalid=rows - valid,
+        duplicates=valid - len(clean),
+        written=len(clean),
+        seconds=time.perf_counter() - start_time,
+    )
+
+
+def print_report(report):
+    """Print an import summary"""
+    rate = report.rows / report.seconds if report.seconds else 0
+    dup_rate = report.duplicates / report.valid * 100 if report.valid else 0
+    print(f"Rows read:      {report.rows:,}")
+    print(f"Valid numbers:  {report.valid:,}")
+    print(f"Invalid rows:   {report.invalid:,}")
+    print(f"Duplicates:     {report.duplicates:,} ({dup_rate:.1f}%)")
+    print(f"Written:        {report.written:,}")
+    print(f"Time:           {report.seconds:.2f}s ({rate:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and clean lead lists")
+    parser.add_argument('inputs', nargs='+', help="CSV/TSV lead files")
+    parser.add_argument('-o', '--output', required=True,
+                        help="clean dial-ready list to write")
+    parser.add_argument('--column', type=int, default=None,
+                        help="phone column (0-based); detected if omitted")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--country-code', type=int, default=1)
+    args = parser.parse_args()
+
+    report = import_leads(args.inputs, args.output, args.workers,
+                          args.column, args.country_code)
+    print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
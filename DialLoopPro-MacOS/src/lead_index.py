@@ -0,0 +1,182 @@
+# lead_index.py
+"""
+Memory-mapped row-offset index for large lead files
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from itertools import accumulate
+
+INDEX_MAGIC = b'DLIX'
+INDEX_VERSION = 2
+# magic, version, CRC-32 of the first and of the last FINGERPRINT_BYTES indexed
+HEADER = struct.Struct('<4sIII')
+FINGERPRINT_BYTES = 4096
+
+
+class LeadIndex:
+    """Sidecar index of row byte offsets for a lead file
+
+    The index file holds a 16-byte header followed by native unsigned
+    64-bit offsets: entry N is where row N starts and the last entry is
+    the end of the indexed data, so the file has rows + 1 entries. It is
+    opened with mmap, so seeking to row N is a single array lookup and
+    nothing is read from the lead file up front. Rows are physical lines.
+
+    The header also keeps checksums of the first and last few KB of the
+    indexed data. Appending rows leaves those bytes alone; a lead file
+    replaced by another (even of the same size) does not, and is indexed
+    afresh with replaced set, so the caller knows its own sidecars (resume
+    cursor, redial store) describe a different file.
+    """
+
+    def __init__(self, lead_file, index_file=None):
+        self.lead_file = lead_file
+        self.index_file = index_file or lead_file + '.idx'
+        self._mmap = None
+        self._offsets = None
+        self._fingerprint = None
+        self.replaced = False  # the lead file is not the one last indexed
+        self.open()
+
+    def open(self):
+        """Open the index, building, extending or rebuilding it as needed"""
+        self._load()
+        self.refresh()
+
+    def _load(self):
+        """Map an existing index file, returning False if it is unusable"""
+        self._unmap()
+        try:
+            size = os.path.getsize(self.index_file)
+        except OSError:
+            return False
+        if size < HEADER.size + 8 or (size - HEADER.size) % 8:
+            return False
+
+        with open(self.index_file, 'rb') as f:
+            magic, version, *fingerprint = HEADER.unpack(f.read(HEADER.size))
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                return False
+            self._fingerprint = tuple(fingerprint)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._mmap)[HEADER.size:].cast('Q')
+        return True
+
+    def _unmap(self):
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def fingerprint(self, size):
+        """Checksums of the first and last bytes of the lead file up to size
+
+        None if the file is now shorter than size.
+        """
+        with open(self.lead_file, 'rb') as f:
+            head = f.read(min(size, FINGERPRINT_BYTES))
+            f.seek(max(0, size - FINGERPRINT_BYTES))
+            tail = f.read(size - f.tell())
+        if len(tail) < min(size, FINGERPRINT_BYTES):
+            return None
+        return zlib.crc32(head), zlib.crc32(tail)
+
+    def _same_file(self):
+        """True if the indexed bytes are still the start of the lead file"""
+        return self.fingerprint(self.indexed_size) == self._fingerprint
+
+    @property
+    def indexed_size(self):
+        """Bytes of the lead file covered by the index"""
+        return self._offsets[-1] if self._offsets is not None else 0
+
+    def refresh(self):
+        """Index rows appended since the last update; rebuild if replaced
+
+        Returns the number of rows added.
+        """
+        file_size = os.path.getsize(self.lead_file)
+        old_rows = len(self)
+
+        if self._offsets is not None and not self._same_file():
+            print(f"{self.lead_file} is not the file that was indexed - reindexing")
+            self.replaced = True
+            self._unmap()
+        if self._offsets is None:
+            self._build()
+            return len(self)
+        if file_size == self.indexed_size:
+            return 0
+
+        # A last row without a newline may have been completed since -
+        # re-scan it from its start rather than keep a partial row
+        start_row = old_rows
+        if old_rows and not self._ends_with_newline():
+            start_row = old_rows - 1
+        start = self._offsets[start_row]
+
+        with open(self.lead_file, 'rb') as f:
+            f.seek(start)
+            new_offsets = array('Q', accumulate(map(len, f), initial=start))
+        keep = start_row  # entries before the re-scanned row
+
+        self._unmap()
+        with open(self.index_file, 'r+b') as f:
+            f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION,
+                                *self.fingerprint(new_offsets[-1])))
+            f.seek(HEADER.size + keep * 8)
+            f.truncate()
+            new_offsets.tofile(f)
+        self._load()
+        return len(self) - old_rows
+
+    def _build(self):
+        """Build the whole index with a single pass over the lead file"""
+        with open(self.lead_file, 'rb') as f:
+            offsets = array('Q', accumulate(map(len, f), initial=0))
+
+        self._unmap()
+        tmp_path = self.index_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self.fingerprint(offsets[-1])))
+            offsets.tofile(f)
+        os.replace(tmp_path, self.index_file)
+        self._load()
+
+    def _ends_with_newline(self):
+        end = self.indexed_size
+        if end == 0:
+            return True
+        with open(self.lead_file, 'rb') as f:
+            f.seek(end - 1)
+            return f.read(1) == b'\n'
+
+    def __len__(self):
+        """Number of indexed rows"""
+        return len(self._offsets) - 1 if self._offsets is not None else 0
+
+    def offset(self, row):
+        """Byte offset where a row starts (row == len(self) is end of data)"""
+        return self._offsets[row]
+
+    def remaining(self, cursor):
+        """Rows from cursor to the end of the file"""
+        return max(0, len(self) - cursor)
+
+    def read_row(self, row):
+        """Raw bytes of a single row, without the line ending"""
+        start = self._offsets[row]
+        end = self._offsets[row + 1]
+        with open(self.lead_file, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).rstrip(b'\r\n')
+
+    def close(self):
+        """Unmap the index"""
+        self._unmap()
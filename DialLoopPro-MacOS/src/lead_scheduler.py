@@ -0,0 +1,275 @@
+# lead_scheduler.py
+"""
+Indexed priority queue of lead rows for DialLoop Pro
+"""
+
+import math
+import time
+from array import array
+
+MAX_ATTEMPTS = 255
+
+# Most rows moved from waiting to ready per pop(), so a large batch of
+# deferred leads coming due at once is spread over several pops
+PROMOTE_BATCH = 1000
+
+
+class LeadScheduler:
+    """Priority queue of lead rows with O(log n) re-prioritizing
+
+    Each queued row has a score (higher dials first), a due time and an
+    attempt count. Rows that are due wait in a ready heap ordered by
+    score, then rows that waited for a due time (redials, deferred leads)
+    ahead of fresh ones, earliest due first, then attempts and row; rows
+    due later wait in a second heap ordered by due time and move over as
+    their time comes. With equal keys rows come out in file order.
+
+    Keys live in flat arrays indexed by row (score float32, due as whole
+    seconds after the scheduler's epoch, attempts capped at 255) and each
+    row's heap position is tracked, so a queued lead costs about 17 bytes
+    and update() re-keys it in place instead of pushing a duplicate.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.epoch = int(clock()) - 1  # so a past due time, stored as 1, is due
+        self.score = array('f')
+        self.due = array('I')
+        self.attempts = array('B')
+        # Heap index per row: i in ready, -(i + 2) in waiting, -1 not queued
+        self.pos = array('i')
+        self.ready = array('i')
+        self.waiting = array('i')
+
+    def __len__(self):
+        return len(self.ready) + len(self.waiting)
+
+    def __contains__(self, row):
+        return row < len(self.pos) and self.pos[row] != -1
+
+    def _grow(self, size):
+        """Make room for keys of rows below size"""
+        extra = size - len(self.pos)
+        if extra > 0:
+            self.score.frombytes(bytes(4 * extra))
+            self.due.frombytes(bytes(4 * extra))
+            self.attempts.frombytes(bytes(extra))
+            self.pos.extend(array('i', [-1]) * extra)
+
+    def _seconds(self, due):
+        """Epoch time to stored due seconds (rounded up - never early)
+
+        Any due time, even one before the epoch, is stored as at least 1,
+        so it still ranks ahead of rows that never had one (0).
+        """
+        return max(1, math.ceil(due - self.epoch)) if due else 0
+
+    def due_time(self, row):
+        """Due time of a row as an epoch time"""
+        return self.epoch + self.due[row]
+
+    # --- Heap plumbing ----------------------------------------------------
+
+    def _ready_before(self, a, b):
+        score = self.score
+        if score[a] != score[b]:
+            return score[a] > score[b]
+        due = self.due
+        if due[a] != due[b]:
+            # Anything that waited for a due time goes before fresh rows (0)
+            return 0 < due[a] < due[b] or not due[b]
+        attempts = self.attempts
+        if attempts[a] != attempts[b]:
+            return attempts[a] < attempts[b]
+        return a < b
+
+    def _waiting_before(self, a, b):
+        due = self.due
+        if due[a] != due[b]:
+            return due[a] < due[b]
+        return a < b
+
+    def _heap(self, row):
+        """(heap, position) holding a queued row"""
+        p = self.pos[row]
+        return (self.ready, p) if p >= 0 else (self.waiting, -p - 2)
+
+    def _place(self, heap, i, row):
+        heap[i] = row
+        self.pos[row] = i if heap is self.ready else -i - 2
+
+    def _sift_up(self, heap, i):
+        before = self._ready_before if heap is self.ready else self._waiting_before
+        row = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not before(row, heap[parent]):
+                break
+            self._place(heap, i, heap[parent])
+            i = parent
+        self._place(heap, i, row)
+
+    def _sift_down(self, heap, i):
+        before = self._ready_before if heap is self.ready else self._waiting_before
+        size = len(heap)
+        row = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and before(heap[child + 1], heap[child]):
+                child += 1
+            if not before(heap[child], row):
+                break
+            self._place(heap, i, heap[child])
+            i = child
+        self._place(heap, i, row)
+
+    def _take(self, heap, i):
+        """Remove and return the row at heap position i"""
+        row = heap[i]
+        last = heap.pop()
+        if i < len(heap):
+            self._place(heap, i, last)
+            self._sift_down(heap, i)
+            self._sift_up(heap, self.pos[last] if heap is self.ready
+                          else -self.pos[last] - 2)
+        self.pos[row] = -1
+        return row
+
+    def _insert(self, row):
+        """Queue a row whose keys are set"""
+        heap = self.waiting if self.epoch + self.due[row] > self.clock() else self.ready
+        heap.append(row)
+        self._sift_up(heap, len(heap) - 1)
+
+    # --- Public API -------------------------------------------------------
+
+    def push(self, row, score=0.0, due=0, attempts=0):
+        """Queue a row (or re-key it if already queued)"""
+        self._grow(row + 1)
+        if row in self:
+            self.update(row, score, due, attempts)
+            return
+        self.score[row] = score
+        self.due[row] = self._seconds(due)
+        self.attempts[row] = min(attempts, MAX_ATTEMPTS)
+        self._insert(row)
+
+    def extend(self, start, stop, skip=()):
+        """Queue rows start..stop-1 (except those in skip) with default keys
+
+        Rows in ascending order with equal keys already form a valid
+        heap, so into an empty scheduler they are laid out with a few
+        slice assignments rather than one push per row.
+        """
+        if stop <= start:
+            return
+        self._grow(stop)
+        skip = sorted(row for row in skip if start <= row < stop)
+        if len(self):
+            skipped = set(skip)
+            for row in range(start, stop):
+                if row not in skipped:
+                    self.push(row)
+            return
+
+        count = stop - start
+        self.score[start:stop] = array('f', bytes(4 * count))
+        self.due[start:stop] = array('I', bytes(4 * count))
+        self.attempts[start:stop] = array('B', bytes(count))
+        i = 0
+        for low, high in zip([start] + [row + 1 for row in skip], skip + [stop]):
+            if high > low:
+                self.ready.extend(range(low, high))
+                self.pos[low:high] = array('i', range(i, i + high - low))
+                i += high - low
+
+    def push_many(self, rows, due, attempts):
+        """Queue rows with parallel due times and attempt counts (scores kept)
+
+        A sorted array is a valid heap, so a batch that is large next to
+        the heaps is merged in by re-sorting them rather than sifting
+        each row in.
+        """
+        if not rows:
+            return
+        self._grow(max(rows) + 1)
+        score, pos, epoch = self.score, self.pos, self.epoch
+        now = self.clock() - epoch
+        ready, waiting = [], []
+        # _seconds() and the attempts cap, inlined - this runs per row
+        for row, when, count in zip(rows, due, attempts):
+            if pos[row] != -1:
+                self.update(row, due=when, attempts=count)
+                continue
+            seconds = (-int((epoch - when) // 1) if when > epoch else 1) if when else 0
+            self.due[row] = seconds
+            self.attempts[row] = count if count < MAX_ATTEMPTS else MAX_ATTEMPTS
+            (waiting if seconds > now else ready).append(row)
+
+        due, attempts = self.due, self.attempts
+        for heap, batch, key in (
+                (self.ready, ready, lambda r: (-score[r], not due[r], due[r], attempts[r], r)),
+                (self.waiting, waiting, lambda r: due[r] << 32 | r)):
+            if len(batch) < len(heap) // 8 + 64:
+                for row in batch:
+                    heap.append(row)
+                    self._sift_up(heap, len(heap) - 1)
+                continue
+            merged = sorted(heap.tolist() + batch, key=key)
+            heap[:] = array('i', merged)
+            if heap is self.ready:
+                for i, row in enumerate(merged):
+                    pos[row] = i
+            else:
+                for i, row in enumerate(merged):
+                    pos[row] = -i - 2
+
+    def update(self, row, score=None, due=None, attempts=None):
+        """Change a queued row's keys in O(log n); queues it if it isn't"""
+        if row not in self:
+            self._grow(row + 1)
+            self.push(row, self.score[row] if score is None else score,
+                      self.due_time(row) if due is None else due,
+                      self.attempts[row] if attempts is None else attempts)
+            return
+        if score is not None:
+            self.score[row] = score
+        if due is not None:
+            self.due[row] = self._seconds(due)
+        if attempts is not None:
+            self.attempts[row] = min(attempts, MAX_ATTEMPTS)
+
+        heap, i = self._heap(row)
+        if due is not None:
+            # May have to change heaps - simplest to re-insert
+            self._take(heap, i)
+            self._insert(row)
+            return
+        self._sift_up(heap, i)
+        self._sift_down(heap, self._heap(row)[1])
+
+    def remove(self, row):
+        """Drop a row from the queue; True if it was queued"""
+        if row not in self:
+            return False
+        self._take(*self._heap(row))
+        return True
+
+    def pop(self):
+        """Highest-priority due row, or None if none is due"""
+        now = self.clock()
+        for _ in range(PROMOTE_BATCH):
+            if not self.waiting or self.epoch + self.due[self.waiting[0]] > now:
+                break
+            self._insert(self._take(self.waiting, 0))
+        if not self.ready:
+            return None
+        return self._take(self.ready, 0)
+
+    def next_due(self):
+        """Epoch time the next waiting row comes due, or None"""
+        if not self.waiting:
+            return None
+        return self.due_time(self.waiting[0])
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+# lead_server.py
+"""
+Lead server for DialLoop Pro - one lead file shared by many agents
+
+Hands leads out in leases over JSON lines on a local TCP port, so agents
+on the same list never dial the same row. RemoteLeadSource is the
+client side used by the dial loop.
+
+Usage: python3 lead_server.py lead_file [port] [lease_seconds]
+"""
+
+import heapq
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+from calling_windows import CallingWindows
+from lead_source import Lead, LeadSource, ScheduledLeadSource
+from redial import RedialPolicy
+
+DEFAULT_PORT = 8765
+DEFAULT_LEASE_SECONDS = 600.0
+
+# Share of a lease a client keeps in hand: a buffered lead with less of
+# its lease left than this is given back rather than handed out to dial
+LEASE_MARGIN = 0.1
+
+
+class Lease:
+    """Leads handed to one client and not claimed yet"""
+
+    def __init__(self, id, client, leads, expires):
+        self.id = id
+        self.client = client
+        self.leads = leads  # row -> Lead
+        self.expires = expires
+
+
+class LeaseQueue:
+    """Leads from a ScheduledLeadSource handed out in expiring leases
+
+    lease() takes up to count due leads off the source and gives them to
+    one client. When it dials a lead the client claims it, which marks
+    it dialed in the source (so the cursor and redials work as for one
+    agent) and keeps the client's leases alive for another
+    lease_seconds. Leads not claimed by the time a lease expires - the
+    client crashed, hung or lost its connection - go back to the source
+    to be leased again, and a late claim on one of them is refused, so
+    no lead is dialed twice. Expiry is checked lazily on each request
+    from a heap of lease deadlines.
+
+    Claims and releases are only taken from the client a lease was
+    given to, and an outcome only from the client that claimed the row,
+    once per claim.
+
+    handle() takes a request dict and returns a response dict; the same
+    calls serve LeadServer and LocalLeadClient.
+    """
+
+    def __init__(self, source, lease_seconds=DEFAULT_LEASE_SECONDS, clock=time.time):
+        self.source = source
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.leases = {}  # lease id -> Lease
+        self.clients = {}  # client -> ids of its leases
+        self.expiry = []  # (expires, lease id), stale entries skipped
+        self.dialed = {}  # row -> client that claimed it, until its outcome
+        self.leased = 0
+        self.claimed = 0
+        self.expired = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def expire(self, now):
+        """Put the unclaimed leads of expired leases back"""
+        while self.expiry and self.expiry[0][0] <= now:
+            expires, lease_id = heapq.heappop(self.expiry)
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.expires != expires:
+                continue  # finished, or renewed by a claim
+            self.finish(lease)
+            for lead in lease.leads.values():
+                self.source.release(lead)
+            self.expired += len(lease.leads)
+
+    def renew(self, lease, now):
+        lease.expires = now + self.lease_seconds
+        heapq.heappush(self.expiry, (lease.expires, lease.id))
+
+    def finish(self, lease):
+        """Forget a lease that expired or has no leads left"""
+        del self.leases[lease.id]
+        ids = self.clients[lease.client]
+        ids.discard(lease.id)
+        if not ids:
+            del self.clients[lease.client]
+
+    def lease(self, client, count):
+        """Lease up to count leads: (lease id, leads), or (None, [], when to ask again)"""
+        with self._lock:
+            now = self.clock()
+            self.expire(now)
+            leads = []
+            while len(leads) < count:
+                lead = self.source.next_lead()
+                if lead is None:
+                    break
+                leads.append(lead)
+            if not leads:
+                # Leads out on lease may still come back
+                times = [t for t in (self.source.next_due(),
+                                     self.expiry[0][0] if self.expiry else None)
+                         if t is not None]
+                return None, [], min(times) if times else None
+            lease = Lease(self._next_id, client, {lead.row: lead for lead in leads}, 0.0)
+            self._next_id += 1
+            self.leases[lease.id] = lease
+            self.clients.setdefault(client, set()).add(lease.id)
+            self.renew(lease, now)
+            self.leased += len(leads)
+            return lease.id, leads, now
+
+    def claim(self, client, lease_id, row):
+        """Mark a leased lead dialed; False if the lease lapsed or is not the client's"""
+        with self._lock:
+            now = self.clock()
+            self.expire(now)
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.client != client:
+                return False
+            lead = lease.leads.pop(row, None)
+            if lead is None:
+                return False
+            self.source.mark_dialed(lead)
+            self.dialed[row] = client
+            self.claimed += 1
+            if not lease.leads:
+                self.finish(lease)
+            # The client is alive - keep its prefetched leases too
+            for other in self.clients.get(lease.client, ()):
+                self.renew(self.leases[other], now)
+            return True
+
+    def release(self, client, lease_id, rows):
+        """Give back leased leads the client will not dial"""
+        with self._lock:
+            lease = self.leases.get(lease_id)
+            if lease is None or lease.client != client:
+                return
+            for row in rows:
+                lead = lease.leads.pop(row, None)
+                if lead is not None:
+                    self.source.release(lead)
+            if not lease.leads:
+                self.finish(lease)
+
+    def record_outcome(self, client, row, outcome):
+        """Record how a lead the client claimed ended (for redials); False if it didn't"""
+        with self._lock:
+            if self.dialed.get(row) != client:
+                return False
+            del self.dialed[row]
+            self.source.record_outcome(Lead(row, None), outcome)
+            return True
+
+    def stats(self):
+        """Counters and what is out on lease"""
+        with self._lock:
+            return {
+                'leased': self.leased,
+                'claimed': self.claimed,
+                'expired': self.expired,
+                'leases': len(self.leases),
+                'outstanding': sum(len(lease.leads) for lease in self.leases.values()),
+                'remaining': self.source.remaining(),
+            }
+
+    def handle(self, request):
+        """Answer one request dict"""
+        try:
+            op = request['op']
+            client = request.get('client', '')
+            if op == 'lease':
+                lease_id, leads, due = self.lease(client, max(1, int(request.get('count', 1))))
+                return {'ok': True, 'lease': lease_id, 'next_due': due,
+                        'lease_seconds': self.lease_seconds,
+                        'leads': [[lead.row, lead.number] for lead in leads]}
+            if op == 'claim':
+                return {'ok': self.claim(client, request['lease'], request['row'])}
+            if op == 'outcome':
+                return {'ok': self.record_outcome(client, request['row'], request['outcome'])}
+            if op == 'release':
+                self.release(client, request['lease'], request['rows'])
+            elif op == 'stats':
+                return dict(self.stats(), ok=True)
+            else:
+                return {'ok': False, 'error': f"unknown op {op!r}"}
+            return {'ok': True}
+        except (KeyError, TypeError, ValueError) as e:
+            return {'ok': False, 'error': f"bad request: {e!r}"}
+
+    def close(self):
+        """Put every outstanding lead back and close the source"""
+        with self._lock:
+            for lease in self.leases.values():
+                for lead in lease.leads.values():
+                    self.source.release(lead)
+            self.leases = {}
+            self.clients = {}
+            self.expiry = []
+            self.source.close()
+
+
+class LeadRequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: a JSON request per line, a JSON response per line"""
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.queue.handle(json.loads(line))
+            except ValueError as e:
+                response = {'ok': False, 'error': f"bad request: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+class LeadServer(socketserver.ThreadingTCPServer):
+    """TCP front end for a LeaseQueue, a thread per connected client"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, queue, host='127.0.0.1', port=DEFAULT_PORT):
+        self.queue = queue
+        super().__init__((host, port), LeadRequestHandler)
+
+    @property
+    def address(self):
+        """'host:port' as clients should configure it"""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def close(self):
+        """Stop serving and put outstanding leads back"""
+        self.shutdown()
+        self.server_close()
+        self.queue.close()
+
+
+class LeadClient:
+    """Connection to a LeadServer (connects on first request)"""
+
+    def __init__(self, address, timeout=10.0):
+        host, _, port = address.rpartition(':')
+        self.host = host or '127.0.0.1'
+        self.port = int(port)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def request(self, op, **fields):
+        """Send one request and return the response dict"""
+        with self._lock:
+            if self._sock is None:
+                self._sock = socket.create_connection((self.host, self.port), self.timeout)
+                self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._file = self._sock.makefile('rwb')
+            try:
+                self._file.write(json.dumps(dict(fields, op=op)).encode() + b'\n')
+                self._file.flush()
+                line = self._file.readline()
+                if not line:
+                    raise ConnectionError("lead server closed the connection")
+                return json.loads(line)
+            except (OSError, ValueError):
+                self._close()
+                raise
+
+    def _close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._close()
+
+
+class LocalLeadClient:
+    """In-process stand-in for LeadClient, for tests and benchmarks
+
+    Calls a LeaseQueue directly, with requests and responses passed
+    through JSON as they would be on the wire.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def request(self, op, **fields):
+        """Answer one request from the queue"""
+        request = json.loads(json.dumps(dict(fields, op=op)))
+        return json.loads(json.dumps(self.queue.handle(request)))
+
+    def close(self):
+        pass
+
+
+class RemoteLeadSource(LeadSource):
+    """Leads leased from a lead server, prefetched a batch at a time
+
+    Keeps a local buffer of leased leads and, once it is down to half a
+    batch, leases the next batch on a background thread so next_lead()
+    does not wait on the server. A lead is claimed when it is dialed
+    (mark_dialed), so one handed out but never dialed - the dial failed
+    or the loop stopped - is not counted as dialed. Each lease's expiry
+    is tracked on the local clock (a claim renews them all), and a
+    buffered lead with less than LEASE_MARGIN of its lease left is given
+    back rather than handed out, so it is not dialed after the server
+    leased it again. Leads still buffered or handed out on close() are
+    released to other agents.
+    """
+
+    description = "lead server"
+
+    def __init__(self, client, name=None, batch=20):
+        self.client = client
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch = batch
+        self.buffer = deque()  # (lease id, Lead)
+        self.handed_out = {}  # row -> lease id, handed out and not dialed yet
+        self.lease_ends = {}  # lease id -> time.monotonic() its lease runs out
+        self.lease_seconds = DEFAULT_LEASE_SECONDS
+        self._next_due = None
+        self._fetch = None
+        self._lock = threading.Lock()
+
+    def fetch(self):
+        """Lease the next batch into the buffer"""
+        sent = time.monotonic()
+        try:
+            response = self.client.request('lease', client=self.name, count=self.batch)
+        except (OSError, ValueError) as e:
+            print(f"Lead server request failed: {e}")
+            return
+        with self._lock:
+            self._next_due = response.get('next_due')
+            self.lease_seconds = response.get('lease_seconds', self.lease_seconds)
+            if response.get('leads'):
+                self.lease_ends[response['lease']] = sent + self.lease_seconds
+            self.buffer.extend((response['lease'], Lead(row, number))
+                               for row, number in response.get('leads', []))
+
+    def prefetch(self):
+        """Start leasing the next batch in the background, unless already"""
+        if self._fetch is None or not self._fetch.is_alive():
+            self._fetch = threading.Thread(target=self.fetch, daemon=True)
+            self._fetch.start()
+
+    def take(self):
+        """Next buffered (lease id, Lead), fetching if the buffer ran dry"""
+        if not self.buffer and self._fetch is not None:
+            self._fetch.join()  # a prefetch on its way
+        with self._lock:
+            if self.buffer:
+                return self.buffer.popleft()
+        self.fetch()
+        with self._lock:
+            return self.buffer.popleft() if self.buffer else None
+
+    def next_lead(self):
+        """Next leased lead with enough of its lease left to dial it"""
+        lapsing = {}
+        while True:
+            item = self.take()
+            if item is None:
+                break
+            if len(self.buffer) <= self.batch // 2:
+                self.prefetch()
+            lease_id, lead = item
+            with self._lock:
+                ends = self.lease_ends.get(lease_id, 0.0)
+            if ends - time.monotonic() > self.lease_seconds * LEASE_MARGIN:
+                self.handed_out[lead.row] = lease_id
+                break
+            lapsing.setdefault(lease_id, []).append(lead.row)
+            item = None
+        self.give_back(lapsing)
+        return item[1] if item is not None else None
+
+    def mark_dialed(self, lead):
+        """Claim a dialed lead, which renews this client's leases"""
+        lease_id = self.handed_out.pop(lead.row, None)
+        if lease_id is None:
+            return
+        sent = time.monotonic()
+        try:
+            claimed = self.client.request('claim', client=self.name, lease=lease_id,
+                                          row=lead.row)['ok']
+        except (OSError, ValueError) as e:
+            print(f"Lead server request failed: {e}")
+            return
+        if not claimed:
+            print(f"Lead server refused the claim on row {lead.row} - its lease lapsed")
+            return
+        with self._lock:
+            # Every lease this client still holds was renewed; forget the rest
+            held = {lease_id for lease_id, _ in self.buffer}
+            held.update(self.handed_out.values())
+            self.lease_ends = {other: sent + self.lease_seconds
+                               for other in self.lease_ends if other in held}
+
+    def release(self, lead):
+        """Give a lead handed out but not dialed back to the server"""
+        lease_id = self.handed_out.pop(lead.row, None)
+        if lease_id is not None:
+            self.give_back({lease_id: [lead.row]})
+
+    def give_back(self, leases):
+        """Give leads back to the server: {lease id: rows}"""
+        try:
+            for lease_id, rows in leases.items():
+                self.client.request('release', client=self.name, lease=lease_id, rows=rows)
+        except (OSError, ValueError) as e:
+            print(f"Lead server request failed: {e}")
+
+    def record_outcome(self, lead, outcome):
+        """Send the outcome to the server, which keeps the redial store"""
+        try:
+            response = self.client.request('outcome', client=self.name, row=lead.row,
+                                           outcome=outcome)
+        except (OSError, ValueError) as e:
+            print(f"Lead server request failed: {e}")
+            return
+        if not response['ok']:
+            print(f"Lead server refused the outcome for row {lead.row} - not claimed here")
+
+    def next_due(self):
+        """Now while leads are buffered, else when the server expects one"""
+        with self._lock:
+            if self.buffer:
+                return time.time()
+            return self._next_due
+
+    def close(self):
+        """Release buffered and undialed leads and disconnect"""
+        if self._fetch is not None:
+            self._fetch.join()
+            self._fetch = None
+        with self._lock:
+            leases = {}
+            for lease_id, lead in self.buffer:
+                leases.setdefault(lease_id, []).append(lead.row)
+            for row, lease_id in self.handed_out.items():
+                leases.setdefault(lease_id, []).append(row)
+            self.buffer.clear()
+            self.handed_out = {}
+            self.lease_ends = {}
+        self.give_back(leases)
+        self.client.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return 1
+    lead_file = sys.argv[1]
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    lease_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_LEASE_SECONDS
+
+    source = ScheduledLeadSource(lead_file, windows=CallingWindows(), redial=RedialPolicy())
+    server = LeadServer(LeaseQueue(source, lease_seconds), port=port)
+    print(f"Serving {lead_file} on {server.address} ({source.remaining()} leads queued)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.queue.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,607 @@
+# lead_source.py
+"""
+Lead sources for DialLoop Pro - where the next number to dial comes from
+"""
+
+import csv
+import os
+import threading
+import time
+from collections import namedtuple
+
+from file_utils import atomic_write, set_aside
+from lead_index import LeadIndex
+from lead_scheduler import MAX_ATTEMPTS, LeadScheduler
+from redial import RedialStore
+
+# row is the line number in the lead file (None for the spreadsheet);
+# number is None when the number is waiting on the clipboard; callback is
+# the callback id when the lead is a scheduled callback
+Lead = namedtuple('Lead', ['row', 'number', 'callback'], defaults=[None])
+
+# Seconds of dials coalesced into one cursor file write
+CURSOR_SAVE_DELAY = 1.0
+
+
+class LeadSource:
+    """Base class for lead sources used by the dial loop"""
+
+    description = "lead"
+
+    def next_lead(self):
+        """Return the next Lead, or None when no lead is available"""
+        raise NotImplementedError
+
+    def mark_dialed(self, lead):
+        """Record that a lead was dialed successfully"""
+        pass
+
+    def priority(self, lead):
+        """Scheduling priority of a handed-out lead (higher dials first)"""
+        return 0.0
+
+    def came_due(self, lead):
+        """True if a handed-out lead waited for a due time (e.g. a redial)"""
+        return False
+
+    def release(self, lead):
+        """Give back a lead handed out but not dialed"""
+        pass
+
+    def record_outcome(self, lead, outcome):
+        """Record how a dialed lead's call ended (see call_history outcomes)"""
+        pass
+
+    def next_due(self):
+        """When a held-back lead becomes available, or None if none is"""
+        return None
+
+    def jump_to(self, row):
+        """Continue dialing from a given row; False if the source can't"""
+        return False
+
+    def prioritize(self, row, score=None, due=None):
+        """Change a lead's score and/or due time; False if the source can't"""
+        return False
+
+    def close(self):
+        """Release any resources held by the source"""
+        pass
+
+
+class SpreadsheetLeadSource(LeadSource):
+    """Fallback backend: copy the next row from the spreadsheet app"""
+
+    description = "spreadsheet"
+
+    def __init__(self, automation, spreadsheet_title):
+        self.automation = automation
+        self.spreadsheet_title = spreadsheet_title
+
+    def next_lead(self):
+        """Copy the next number to the clipboard"""
+        if self.automation.copy_next_number(self.spreadsheet_title):
+            return Lead(None, None)
+        return None
+
+
+class FileLeadSource(LeadSource):
+    """Stream numbers straight from a CSV/TSV lead file
+
+    The first row not yet dialed is kept in a small cursor file next to
+    the lead file, so a restart resumes where the last session stopped.
+    Leads may be dialed out of order (see OrderedLeadSource): rows handed
+    out but not dialed hold the cursor back, and rows dialed past it are
+    saved alongside it and skipped on resume.
+    A LeadIndex sidecar lets resume and jump_to seek straight to a row
+    instead of reading the file from the start. If the index finds the
+    lead file is not the one it indexed, the old cursor is set aside and
+    dialing starts from the top of the new file.
+    Dials save the cursor through a debounced writer, so a burst of dials
+    is one cursor write; close() writes anything still pending.
+    """
+
+    description = "lead file"
+
+    def __init__(self, lead_file, column=None, cursor_file=None):
+        self.lead_file = lead_file
+        self.column = column
+        self.cursor_file = cursor_file or lead_file + '.cursor'
+        self.dialed_ahead = set()  # rows dialed beyond the cursor
+        self.pending = set()  # rows handed out but not dialed yet
+        self.save_delay = CURSOR_SAVE_DELAY
+        self.cursor_writes = 0
+        self._cursor_lock = threading.RLock()
+        self._save_timer = None
+        self.index = LeadIndex(lead_file)
+        if self.index.replaced:
+            set_aside(self.cursor_file, '.old')  # rows of a different file
+        self.cursor = self.load_cursor()
+        self._rows = None
+        self._next_row = self.cursor
+
+    def load_cursor(self):
+        """Load the persisted cursor (first row not yet dialed)"""
+        try:
+            with open(self.cursor_file, 'r') as f:
+                lines = f.read().split('\n')
+            cursor = int(lines[0].strip() or 0)
+            if len(lines) > 1:
+                self.dialed_ahead = {int(row) for row in lines[1].split()}
+            return cursor
+        except (OSError, ValueError):
+            return 0
+
+    def save_cursor(self):
+        """Persist the cursor (and any rows dialed beyond it) now"""
+        with self._cursor_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            ahead = ' '.join(str(row) for row in sorted(self.dialed_ahead))
+            atomic_write(self.cursor_file, f"{self.cursor}\n{ahead}\n" if ahead
+                         else f"{self.cursor}\n")
+            self.cursor_writes += 1
+
+    def schedule_save(self):
+        """Persist the cursor after save_delay, once for a burst of dials"""
+        with self._cursor_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self._save_due)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def _save_due(self):
+        try:
+            self.save_cursor()
+        except Exception as e:
+            print(f"Cursor save failed: {e}")
+
+    def detect_delimiter(self, first_line):
+        """Pick tab or comma from the file extension or the first line"""
+        if self.lead_file.lower().endswith('.tsv') or '\t' in first_line:
+            return '\t'
+        return ','
+
+    def find_phone_column(self, fields):
+        """Return the index of the first field that looks like a number"""
+        for i, field in enumerate(fields):
+            if sum(c.isdigit() for c in field) >= 7:
+                return i
+        return None
+
+    def iter_rows(self, start_row=0):
+        """Generator of (row, number) for every dialable row from start_row"""
+        if start_row >= len(self.index):
+            return
+        with open(self.lead_file, 'rb') as f:
+            first_line = f.readline().decode('utf-8', 'replace')
+            f.seek(self.index.offset(start_row))
+            lines = (line.decode('utf-8', 'replace').lstrip('\ufeff')
+                     for line in f)
+            reader = csv.reader(lines, delimiter=self.detect_delimiter(first_line))
+
+            for row, fields in enumerate(reader, start_row):
+                column = self.column
+                if column is None:
+                    column = self.find_phone_column(fields)
+                if column is None or column >= len(fields):
+                    continue  # header or blank row
+                number = fields[column].strip()
+                if (sum(c.isdigit() for c in number) >= 7 and
+                        row not in self.dialed_ahead):
+                    yield row, number
+
+    def next_lead(self):
+        """Return the next row of the lead file"""
+        if self._rows is None:
+            self._rows = self.iter_rows(self._next_row)
+        try:
+            row, number = next(self._rows)
+        except StopIteration:
+            # Pick up rows appended to the file since it was indexed
+            self._rows = None
+            if self.index.refresh() <= 0:
+                return None
+            return self.next_lead()
+        self._next_row = row + 1
+        self.pending.add(row)
+        return Lead(row, number)
+
+    def jump_to(self, row):
+        """Continue dialing from a given row (rows handed out are dropped)"""
+        with self._cursor_lock:
+            if self._rows is not None:
+                self._rows.close()
+                self._rows = None
+            self.pending.clear()
+            self.dialed_ahead.clear()
+            self.cursor = self._next_row = max(0, min(row, len(self.index)))
+            self.save_cursor()
+        return True
+
+    def remaining(self):
+        """Rows left after the cursor"""
+        return self.index.remaining(self.cursor)
+
+    def mark_dialed(self, lead):
+        """Advance and persist the resume cursor"""
+        with self._cursor_lock:
+            self.pending.discard(lead.row)
+            self.dialed_ahead.add(lead.row)
+            # Earliest row still owed a dial (in order, just lead.row + 1)
+            self.cursor = min(self.pending) if self.pending else self._next_row
+            self.dialed_ahead = {row for row in self.dialed_ahead if row >= self.cursor}
+        self.schedule_save()
+
+    def close(self):
+        """Write a pending cursor save and close the underlying file"""
+        if self._save_timer is not None:
+            self.save_cursor()
+        if self._rows is not None:
+            self._rows.close()
+            self._rows = None
+        self.pending.clear()
+        self._next_row = self.cursor
+
+
+class ScheduledLeadSource(FileLeadSource):
+    """Lead file dialed in priority order through a LeadScheduler
+
+    Every undialed row from the cursor on is queued (by row number only -
+    nothing is read up front) and next_lead() pops the highest-priority
+    due row and reads just that line through the index. With no
+    priorities set, rows come out in file order. prioritize() re-keys a
+    lead in O(log n).
+
+    With calling windows set, a lead outside calling hours in its area
+    code's time zone is deferred until its window opens instead of being
+    handed out; at most max_deferrals are deferred per next_lead() call.
+
+    With a redial policy, each dialed lead's outcome is kept in a
+    RedialStore next to the lead file, and a lead due to be tried again
+    is put back in the scheduler with its due time, on restart too.
+
+    The cursor is the first row not yet dialed; rows dialed past it are
+    saved with it, as with out-of-order dialing in FileLeadSource.
+    """
+
+    def __init__(self, lead_file, column=None, cursor_file=None, clock=time.time,
+                 windows=None, max_deferrals=1000, redial=None):
+        super().__init__(lead_file, column, cursor_file)
+        self.clock = clock
+        self.windows = windows
+        self.max_deferrals = max_deferrals
+        self.deferred = 0  # leads deferred for calling hours, for the front end
+        self.redials = None
+        if redial is not None:
+            if self.index.replaced:
+                set_aside(lead_file + '.redial', '.old')
+            self.redials = RedialStore(lead_file + '.redial', redial)
+        self._file = None
+        self._delimiter = ','
+        self.queue_rows()
+
+    def queue_rows(self):
+        """Queue every undialed row from the cursor on, and pending redials"""
+        self.scheduler = LeadScheduler(self.clock)
+        self.scheduler.extend(self.cursor, len(self.index), self.dialed_ahead)
+        self._queued_rows = len(self.index)
+        if self.redials is not None:
+            rows = self.redials.pending_rows(len(self.index))
+            base, due, attempts = self.redials.base, self.redials.due, self.redials.attempts
+            self.scheduler.push_many(rows, [base + due[row] for row in rows],
+                                     [attempts[row] for row in rows])
+
+    def read_number(self, row):
+        """Phone number on one row of the lead file, or None"""
+        if self._file is None:
+            self._file = open(self.lead_file, 'rb')
+            first_line = self._file.readline().decode('utf-8', 'replace')
+            self._delimiter = self.detect_delimiter(first_line)
+        self._file.seek(self.index.offset(row))
+        line = self._file.readline().decode('utf-8', 'replace').lstrip('\ufeff')
+        fields = next(csv.reader([line], delimiter=self._delimiter), [])
+        column = self.column
+        if column is None:
+            column = self.find_phone_column(fields)
+        if column is None or column >= len(fields):
+            return None
+        number = fields[column].strip()
+        return number if sum(c.isdigit() for c in number) >= 7 else None
+
+    def next_lead(self):
+        """Highest-priority due row of the lead file"""
+        deferrals = 0
+        while True:
+            row = self.scheduler.pop()
+            if row is None:
+                # Pick up rows appended to the file since it was indexed
+                if self.index.refresh() <= 0 or len(self.index) <= self._queued_rows:
+                    return None
+                self.scheduler.extend(self._queued_rows, len(self.index))
+                self._queued_rows = len(self.index)
+                continue
+            number = self.read_number(row)
+            if number is None:
+                self.advance_cursor(row)  # header or blank row
+                continue
+            if self.windows is not None:
+                opens = self.windows.next_open(number, self.clock())
+                if opens is not None:
+                    self.scheduler.update(row, due=opens)
+                    self.deferred += 1
+                    deferrals += 1
+                    if deferrals >= self.max_deferrals:
+                        return None  # next_due() says to come straight back
+                    continue
+            self.pending.add(row)
+            return Lead(row, number)
+
+    def prioritize(self, row, score=None, due=None):
+        """Change a lead's score and/or due time (queues it if needed)"""
+        if row in self.pending:
+            if score is not None:
+                self.scheduler.score[row] = score  # handed out - ranked by score
+            return True
+        self.scheduler.update(row, score=score, due=due)
+        return True
+
+    def priority(self, lead):
+        """Score the lead was queued with"""
+        return self.scheduler.score[lead.row]
+
+    def came_due(self, lead):
+        """True for a redial or a lead deferred for calling hours"""
+        return self.scheduler.due[lead.row] != 0
+
+    def record_outcome(self, lead, outcome):
+        """Store the outcome and queue the lead again if it is due a redial"""
+        if self.redials is None or lead.row is None:
+            return
+        due = self.redials.record(lead.row, outcome, self.clock())
+        if due is not None and lead.row not in self.pending:
+            self.scheduler.update(lead.row, due=due,
+                                  attempts=self.redials.attempts[lead.row])
+
+    def next_due(self):
+        """Now if leads are ready, else when the next deferred lead comes due"""
+        if self.scheduler.ready:
+            return self.clock()
+        return self.scheduler.next_due()
+
+    def advance_cursor(self, row):
+        """Count a row as done and move the cursor past done rows"""
+        with self._cursor_lock:
+            self.pending.discard(row)
+            if row >= self.cursor:  # redials come from behind the cursor
+                self.dialed_ahead.add(row)
+            while self.cursor in self.dialed_ahead:
+                self.dialed_ahead.remove(self.cursor)
+                self.cursor += 1
+
+    def mark_dialed(self, lead):
+        """Count the attempt and persist the resume cursor"""
+        attempts = self.scheduler.attempts
+        attempts[lead.row] = min(attempts[lead.row] + 1, MAX_ATTEMPTS)
+        self.advance_cursor(lead.row)
+        self.schedule_save()
+
+    def release(self, lead):
+        """Queue a lead handed out but not dialed again"""
+        if lead.row in self.pending:
+            self.pending.discard(lead.row)
+            self.scheduler.update(lead.row)
+
+    def jump_to(self, row):
+        """Continue dialing from a given row (drops any priorities)"""
+        super().jump_to(row)
+        self.queue_rows()
+        return True
+
+    def remaining(self):
+        """Leads still queued"""
+        return len(self.scheduler)
+
+    def close(self):
+        """Requeue leads handed out but not dialed, and close the file"""
+        for row in sorted(self.pending):
+            self.scheduler.update(row)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.redials is not None:
+            self.redials.close()
+        super().close()
+
+
+class OrderedLeadSource(LeadSource):
+    """Dial the best-scoring of the next few leads first
+
+    Keeps a lookahead buffer of leads from another source and hands out
+    the one with the highest score(number, now) among those with the
+    highest source priority, redials and other leads that came due before
+    fresh ones; ties go to file order.
+    The wrapped source still tracks what was dialed, so resume neither
+    skips nor repeats a lead.
+    """
+
+    def __init__(self, source, score, clock, lookahead=100):
+        self.source = source
+        self.score = score
+        self.clock = clock
+        self.lookahead = lookahead
+        self.description = source.description
+        self.buffer = []
+
+    def fill(self):
+        """Top the buffer up; False once the source has nothing more"""
+        while len(self.buffer) < self.lookahead:
+            lead = self.source.next_lead()
+            if lead is None:
+                return False
+            self.buffer.append(lead)
+        return True
+
+    def next_lead(self):
+        """Best lead in the lookahead buffer"""
+        self.fill()
+        if not self.buffer:
+            return None
+        if self.buffer[0].number is None:
+            return self.buffer.pop(0)  # on the clipboard - nothing to rank
+        now = self.clock()
+        best = max(range(len(self.buffer)),
+                   key=lambda i: (self.source.priority(self.buffer[i]),
+                                  self.source.came_due(self.buffer[i]),
+                                  self.score(self.buffer[i].number, now), -i))
+        return self.buffer.pop(best)
+
+    def mark_dialed(self, lead):
+        """Record the dial with the wrapped source"""
+        self.source.mark_dialed(lead)
+
+    def priority(self, lead):
+        """Priority from the wrapped source"""
+        return self.source.priority(lead)
+
+    def came_due(self, lead):
+        """Whether the lead waited for a due time, from the wrapped source"""
+        return self.source.came_due(lead)
+
+    def release(self, lead):
+        """Put a lead handed out but not dialed back in the buffer"""
+        self.buffer.insert(0, lead)
+
+    def record_outcome(self, lead, outcome):
+        """Record the outcome with the wrapped source"""
+        self.source.record_outcome(lead, outcome)
+
+    def remaining(self):
+        """Rows left after the wrapped source's cursor"""
+        return self.source.remaining()
+
+    def next_due(self):
+        """When the wrapped source has a held-back lead available"""
+        return self.source.next_due()
+
+    def prioritize(self, row, score=None, due=None):
+        """Re-key a lead in the wrapped source (buffered leads rank by it too)"""
+        return self.source.prioritize(row, score, due)
+
+    def jump_to(self, row):
+        """Drop the buffer and move the wrapped source to a given row"""
+        if not self.source.jump_to(row):
+            return False
+        self.buffer = []
+        return True
+
+    def close(self):
+        """Drop the buffer and close the wrapped source"""
+        self.buffer = []
+        self.source.close()
+
+
+class CallbackLeadSource(LeadSource):
+    """Due callbacks first, then leads from another source
+
+    A callback lead carries its callback id; dialing it completes the
+    callback instead of moving the wrapped source's cursor.
+    """
+
+    def __init__(self, source, callbacks):
+        self.source = source
+        self.callbacks = callbacks
+        self.description = source.description
+        self.handed_out = {}  # callback id -> Callback not dialed yet
+
+    def next_lead(self):
+        """A due callback if there is one, else the next lead"""
+        callback = self.callbacks.pop_due()
+        if callback is not None:
+            self.handed_out[callback.id] = callback
+            return Lead(callback.row, callback.number, callback.id)
+        return self.source.next_lead()
+
+    def mark_dialed(self, lead):
+        """Complete a callback, or record the dial with the wrapped source"""
+        if lead.callback is None:
+            self.source.mark_dialed(lead)
+            return
+        self.handed_out.pop(lead.callback, None)
+        self.callbacks.complete(lead.callback)
+
+    def priority(self, lead):
+        """Priority from the wrapped source (callbacks have none)"""
+        if lead.callback is not None:
+            return 0.0
+        return self.source.priority(lead)
+
+    def came_due(self, lead):
+        """True for a callback, else from the wrapped source"""
+        if lead.callback is not None:
+            return True
+        return self.source.came_due(lead)
+
+    def release(self, lead):
+        """Put a callback handed out but not dialed back in front, or release the lead"""
+        if lead.callback is None:
+            self.source.release(lead)
+            return
+        callback = self.handed_out.pop(lead.callback, None)
+        if callback is not None:
+            self.callbacks.release(callback)
+
+    def record_outcome(self, lead, outcome):
+        """Record a lead's outcome with the wrapped source (callbacks aren't redialed)"""
+        if lead.callback is None:
+            self.source.record_outcome(lead, outcome)
+
+    def next_due(self):
+        """Earliest of the next callback and the wrapped source's next lead"""
+        times = [t for t in (self.callbacks.next_due(), self.source.next_due())
+                 if t is not None]
+        return min(times) if times else None
+
+    def prioritize(self, row, score=None, due=None):
+        """Re-key a lead in the wrapped source"""
+        return self.source.prioritize(row, score, due)
+
+    def jump_to(self, row):
+        """Move the wrapped source to a given row (callbacks are kept)"""
+        return self.source.jump_to(row)
+
+    def close(self):
+        """Put undialed callbacks back and close the wrapped source"""
+        for callback in self.handed_out.values():
+            self.callbacks.release(callback)
+        self.handed_out = {}
+        self.source.close()
+
+
+def dial_digits(number, prefix):
+    """What to type for a lead number
+
+    E.164 NANP numbers (+1XXXXXXXXXX, as written by lead_import) are dialed
+    with the configured prefix like any other number; other E.164 numbers
+    are typed as they are.
+    """
+    if number.startswith('+1') and len(number) == 12:
+        number = number[2:]
+    elif number.startswith('+'):
+        return number
+    return f"{prefix or ''}{number}"
+
+
+def create_lead_source(automation, lead_file='', spreadsheet_title='', clock=time.time,
+                       windows=None, redial=None, lead_server=''):
+    """Use the lead server, or the lead file, when one is configured, else the spreadsheet"""
+    if lead_server:
+        from lead_server import LeadClient, RemoteLeadSource
+        try:
+            return RemoteLeadSource(LeadClient(lead_server))
+        except ValueError as e:
+            print(f"Lead server address invalid: {e}")
+    if lead_file and os.path.exists(lead_file):
+        return ScheduledLeadSource(lead_file, clock=clock, windows=windows, redial=redial)
+    return SpreadsheetLeadSource(automation, spreadsheet_title)
@@ -1,18 +1,34 @@
 # mac_automation.py
 """
 macOS-specific automation functions
+
+pyautogui and AppKit are imported on first use rather than with the
+module: they take longer to load than the rest of the app, and nothing
+needs them until the first automation step.
 """
 
 import subprocess
 import time
-import pyautogui
-import applescript
-import Quartz
-from AppKit import NSWorkspace, NSApplicationActivateIgnoringOtherApps
 
-class MacAutomation:
+from automation_backend import AutomationBackend
+from waits import wait_until
+
+# Upper bounds for condition waits (seconds)
+FOCUS_TIMEOUT = 2.0
+CLIPBOARD_TIMEOUT = 2.0
+
+# Time given to the target app to process a keystroke or click that has
+# no observable effect we can poll for
+KEY_SETTLE = 0.05
+
+class MacAutomation(AutomationBackend):
     """Handle macOS-specific automation tasks"""
     
+    def clipboard_change_count(self):
+        """Pasteboard change counter (increments on every copy)"""
+        from AppKit import NSPasteboard
+        return NSPasteboard.generalPasteboard().changeCount()
+    
     def activate_window(self, window_title):
         """Activate a window by title on macOS"""
         try:
@@ -25,6 +41,7 @@ class MacAutomation:
             subprocess.run(['osascript', '-e', script], check=False)
             
             # Alternative: Use NSWorkspace
+            from AppKit import NSWorkspace, NSApplicationActivateIgnoringOtherApps
             ws = NSWorkspace.sharedWorkspace()
             apps = ws.runningApplications()
             for app in apps:
@@ -32,8 +49,14 @@ class MacAutomation:
                     app.activateWithOptions_(NSApplicationActivateIgnoringOtherApps)
                     break
             
-            time.sleep(0.5)
-            return True
+            # Wait until it is actually in front
+            focused, waited = wait_until(
+                lambda: self.is_window_focused(window_title), FOCUS_TIMEOUT
+            )
+            self.record_wait('activate', waited)
+            if not focused:
+                print(f"Window did not come to front: {window_title}")
+            return focused
         except Exception as e:
             print(f"Window activation failed: {e}")
             return False
@@ -45,17 +68,21 @@ class MacAutomation:
             if not self.activate_window(spreadsheet_title):
                 return False
             
-            time.sleep(0.3)
-            
             # Press down arrow
+            import pyautogui
             pyautogui.press('down')
-            time.sleep(0.3)
+            time.sleep(KEY_SETTLE)
             
-            # Copy (Cmd+C on macOS)
+            # Copy (Cmd+C on macOS) and wait for the clipboard to change
+            change_count = self.clipboard_change_count()
             pyautogui.hotkey('command', 'c')
-            time.sleep(0.5)
+            copied, waited = wait_until(
+                lambda: self.clipboard_change_count() != change_count,
+                CLIPBOARD_TIMEOUT
+            )
+            self.record_wait('copy', waited)
             
-            return True
+            return copied
         except Exception as e:
             print(f"Copy failed: {e}")
             return False
@@ -67,33 +94,79 @@ class MacAutomation:
             if not self.activate_window(dialer_title):
                 return False
             
-            time.sleep(0.5)
-            
             # Click dial field
-            pyautogui.moveTo(x, y, duration=0.2)
-            pyautogui.click()
-            time.sleep(0.2)
+            import pyautogui
+            started = time.monotonic()
+            pyautogui.click(x, y)
+            time.sleep(KEY_SETTLE)
             
             # Type prefix if any
             if prefix:
                 pyautogui.write(prefix)
-                time.sleep(0.1)
             
             # Paste (Cmd+V on macOS)
             pyautogui.hotkey('command', 'v')
-            time.sleep(0.3)
+            time.sleep(KEY_SETTLE)
+            
+            # Press enter
+            pyautogui.press('enter')
+            time.sleep(KEY_SETTLE)
+            self.record_wait('dial', time.monotonic() - started)
+            
+            return True
+        except Exception as e:
+            print(f"Dial failed: {e}")
+            return False
+    
+    def dial_number(self, dialer_title, x, y, digits):
+        """Type a number straight into the dialer and dial (no clipboard)"""
+        try:
+            # Activate dialer
+            if not self.activate_window(dialer_title):
+                return False
+            
+            # Click dial field
+            import pyautogui
+            started = time.monotonic()
+            pyautogui.click(x, y)
+            time.sleep(KEY_SETTLE)
+            
+            # Type the full number, prefix included
+            pyautogui.write(digits)
+            time.sleep(KEY_SETTLE)
             
             # Press enter
             pyautogui.press('enter')
-            time.sleep(0.5)
+            time.sleep(KEY_SETTLE)
+            self.record_wait('dial', time.monotonic() - started)
             
             return True
         except Exception as e:
             print(f"Dial failed: {e}")
             return False
     
+    def hangup(self, x, y):
+        """Click the dialer's hangup button"""
+        import pyautogui
+        pyautogui.click(x, y)
+    
+    def move_to(self, x, y):
+        """Park the mouse over a point"""
+        import pyautogui
+        pyautogui.moveTo(x, y, duration=0.2)
+    
+    def read_clipboard(self):
+        """Return the current clipboard text"""
+        try:
+            result = subprocess.check_output(['pbpaste'])
+            return result.decode('utf-8', 'replace').strip()
+        except Exception as e:
+            print(f"Clipboard read failed: {e}")
+            return ''
+    
     def get_mouse_position(self):
         """Get current mouse position"""
+        import pyautogui
         return pyautogui.position()
     
     def get_window_info(self, window_title):
@@ -122,6 +195,15 @@ class MacAutomation:
     
     def is_window_focused(self, window_title):
         """Check if a window is focused"""
+        # In-process check first - cheap enough to poll
+        try:
+            from AppKit import NSWorkspace
+            front = NSWorkspace.sharedWorkspace().frontmostApplication()
+            if front is not None:
+                return window_title.lower() in front.localizedName().lower()
+        except Exception:
+            pass
+        
         script = '''
         tell application "System Events"
             set frontApp to name of first application process whose frontmost is true
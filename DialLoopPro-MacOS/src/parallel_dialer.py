@@ -0,0 +1,264 @@
+# parallel_dialer.py
+"""
+Multi-line dialing for DialLoop Pro: several lines ringing at once, the
+first answer routed to the agent
+"""
+
+import time
+from collections import deque
+
+from call_history import ABANDONED, DROPPED, FORCED_NEXT, NO_ANSWER, STOPPED
+from dial_engine import COPYING, DIALING, ON_CALL, WAITING
+from lead_source import dial_digits
+
+# Line states
+FREE = 'free'
+RINGING = 'ringing'
+HELD = 'held'
+AGENT = 'agent'
+
+# Most recent clear latencies kept for stats
+LATENCY_SAMPLES = 1000
+
+
+class Line:
+    """One dialer session and the attempt on it"""
+
+    def __init__(self, index):
+        self.index = index
+        self.state = FREE
+        self.attempt = None
+        self.deadline = 0.0  # engine seconds: ring timeout, or hold limit
+
+
+class ParallelDialer:
+    """Keep up to N lines ringing and route the first answer to the agent
+
+    Runs on the engine's dial thread in place of the one-line state
+    machine, for backends with more than one session (max_lines > 1).
+    The backend reports answers from its own threads through
+    line_answered(); everything else - dialing, hanging up, routing -
+    happens on the dial thread, which only blocks for one automation step
+    at a time, so other lines are cleared within about one step of a
+    connect (clear latencies are kept in latencies).
+
+    When a line answers and the agent is free, it is bridged to the agent
+    and every other ringing line is hung up as dropped (redialed like a
+    no-answer). A line that answers while the agent is busy - including
+    one whose answer came in with the routed one - is held for up to
+    hold_seconds for the agent to come free, then hung up and counted as
+    abandoned, as is a line that picks up just as it is hung up. New
+    lines are only dialed while the agent is free and nobody is on hold.
+    """
+
+    def __init__(self, engine, lines, hold_seconds=2.0):
+        self.engine = engine
+        self.backend = engine.backend
+        self.lines = [Line(i) for i in range(lines)]
+        self.hold_seconds = hold_seconds
+        self.answers = deque()  # (line index, engine seconds) from backend threads
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.agent_line = None
+        self.out_of_leads = False
+
+    def now(self):
+        return self.engine.now_ms() / 1000
+
+    def line_answered(self, index):
+        """Backend callback: the prospect on a line picked up"""
+        with self.engine._signal:
+            self.answers.append((index, self.now()))
+            self.engine._signal.notify_all()
+
+    def busy(self):
+        """Lines not free"""
+        return [line for line in self.lines if line.state != FREE]
+
+    def run(self):
+        """Dial until stopped or out of leads"""
+        engine = self.engine
+        self.backend.on_line_answered = self.line_answered
+        try:
+            while engine.running:
+                self.handle_answers()
+                self.handle_agent()
+                self.expire()
+                if engine.force_break:
+                    # Hangup & Next: drop everything still ringing
+                    engine.force_break = False
+                    self.clear(RINGING, FORCED_NEXT)
+                if self.can_dial() and self.dial_next():
+                    continue
+                if not self.busy() and self.out_of_leads and not engine.on_call:
+                    if not self.wait_for_leads():
+                        break
+                    continue
+                self.wait()
+        finally:
+            self.backend.on_line_answered = None
+            self.clear(RINGING, STOPPED)
+            self.clear(HELD, ABANDONED)
+
+    def can_dial(self):
+        """True if a free line may be dialed now"""
+        engine = self.engine
+        return (not engine.on_call and self.agent_line is None and not self.out_of_leads and
+                all(line.state != HELD for line in self.lines) and
+                any(line.state == FREE for line in self.lines))
+
+    def dial_next(self):
+        """Dial the next lead on a free line; False if there is none"""
+        engine = self.engine
+        engine.set_state(COPYING)
+        with engine.phase('copy'):
+            lead = engine.next_dialable_lead()
+        if lead is None:
+            self.out_of_leads = True
+            return False
+
+        line = next(line for line in self.lines if line.state == FREE)
+        number = lead.number
+        if number is None:
+            number = self.backend.read_clipboard()
+        engine.set_state(DIALING)
+        engine.on_status(f"DIALING LINE {line.index + 1}...")
+        with engine.phase('dial'):
+            success = self.backend.dial_line(line.index, dial_digits(number, engine.dial_prefix))
+        if not success:
+            engine.dial_failed()
+            return False
+
+        with engine._state_lock:
+            engine.lead_source.mark_dialed(lead)
+        line.attempt = engine.make_attempt(lead, number)
+        line.state = RINGING
+        line.deadline = self.now() + engine.wait_time / 1000
+        engine.count_call()
+        engine.emit_stats()
+        return True
+
+    def wait_for_leads(self):
+        """Nothing in flight and no lead now: wait for one, or stop"""
+        engine = self.engine
+        due = engine.lead_source.next_due()
+        if due is None:
+            engine.running = False
+            engine.on_status("NO MORE LEADS")
+            return False
+        engine.on_status(f"WAITING - NEXT LEAD AT "
+                         f"{time.strftime('%a %H:%M', time.localtime(due * engine.time_scale))}")
+        engine.leads_changed = False
+        engine.wait_for_signal(lambda: not engine.running or engine.leads_changed,
+                               max(0.0, due - self.now()))
+        self.out_of_leads = False
+        return True
+
+    def wait(self):
+        """Sleep until an answer, a deadline, a button or stop"""
+        engine = self.engine
+        ringing = [line for line in self.lines if line.state == RINGING]
+        if engine.on_call:
+            engine.set_state(ON_CALL)
+        elif ringing:
+            engine.set_state(WAITING)
+            engine.on_status(f"RINGING {len(ringing)} LINE{'S' if len(ringing) > 1 else ''}")
+        deadlines = [line.deadline for line in self.busy() if line.state != AGENT]
+        timeout = max(0.0, min(deadlines) - self.now()) if deadlines else None
+        on_call = engine.on_call
+        engine.wait_for_signal(
+            lambda: (not engine.running or self.answers or engine.force_break or
+                     engine.on_call != on_call or
+                     (self.out_of_leads and engine.leads_changed)),
+            timeout)
+        if engine.leads_changed:
+            engine.leads_changed = False
+            self.out_of_leads = False
+
+    def handle_answers(self):
+        """Route or hold lines that picked up, then drop the rest"""
+        engine = self.engine
+        routed_at = None
+        while True:
+            with engine._signal:
+                if not self.answers:
+                    break
+                index, answered_at = self.answers.popleft()
+            line = self.lines[index]
+            if line.state != RINGING:
+                continue  # hung up before the answer got through
+            if not engine.on_call and self.agent_line is None:
+                self.route(line)
+                routed_at = answered_at
+            elif self.hold_seconds > 0:
+                self.backend.hold_line(index)
+                line.state = HELD
+                line.deadline = answered_at + self.hold_seconds
+            else:
+                self.hang_up(line, ABANDONED)
+        if routed_at is not None:
+            self.clear(RINGING, DROPPED)
+            self.latencies.append(self.now() - routed_at)
+
+    def answer_pending(self, index):
+        """True if a line's answer is queued but not handled yet"""
+        with self.engine._signal:
+            return any(i == index for i, _ in self.answers)
+
+    def route(self, line):
+        """Bridge a line to the agent"""
+        self.ring_time(line)
+        line.state = AGENT
+        self.agent_line = line
+        self.engine.connect_agent(line.index, line.attempt)
+        line.attempt = None
+
+    def handle_agent(self):
+        """Free the agent's line once the call has ended; take a held line"""
+        engine = self.engine
+        if self.agent_line is not None and not engine.on_call:
+            # toggle_call hung the line up and recorded the attempt
+            self.agent_line.state = FREE
+            self.agent_line = None
+        if self.agent_line is None and engine.on_call:
+            # On Call pressed by hand: the agent is busy, stop ringing
+            self.clear(RINGING, DROPPED)
+        if self.agent_line is None and not engine.on_call:
+            held = [line for line in self.lines if line.state == HELD]
+            if held:
+                self.route(min(held, key=lambda line: line.deadline))
+
+    def expire(self):
+        """Hang up lines that rang out or waited too long on hold"""
+        now = self.now()
+        for line in self.lines:
+            if line.state == RINGING and now >= line.deadline:
+                self.hang_up(line, NO_ANSWER)
+            elif line.state == HELD and now >= line.deadline:
+                self.hang_up(line, ABANDONED)
+
+    def clear(self, state, outcome):
+        """Hang up every line in a state"""
+        lines = [line for line in self.lines if line.state == state]
+        if lines:
+            with self.engine.phase('clear_lines'):
+                for line in lines:
+                    self.hang_up(line, outcome)
+            self.engine.attempt_phases.pop('clear_lines', None)  # not any one dial's
+
+    def hang_up(self, line, outcome):
+        """Hang up one line and record its attempt"""
+        self.backend.hangup_line(line.index)
+        if line.state == RINGING and self.answer_pending(line.index):
+            outcome = ABANDONED  # picked up as it was being hung up
+        self.ring_time(line)
+        if outcome == ABANDONED:
+            self.engine.count_abandoned()
+        self.engine.record_attempt(line.attempt, outcome)
+        line.attempt = None
+        line.state = FREE
+
+    def ring_time(self, line):
+        """Record how long a line rang as its attempt's wait phase"""
+        phases = line.attempt['phases']
+        if 'wait' not in phases:
+            phases['wait'] = self.now() - line.attempt['dialed_at']
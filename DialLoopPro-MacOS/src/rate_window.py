@@ -0,0 +1,77 @@
+# rate_window.py
+"""
+Sliding-window call rates for DialLoop Pro
+"""
+
+import threading
+from array import array
+
+
+class RateWindow:
+    """Calls in the last N seconds, for a few fixed windows, in O(1)
+
+    Calls are counted into a ring of one-second buckets covering the
+    longest window, and a running total is kept per window. Moving the
+    clock forward subtracts the buckets that fall out of each window, so
+    both add() and count() cost a constant amount of work per elapsed
+    second, and memory is fixed at one bucket per second of the longest
+    window. Windows are whole-second granular: at time t they cover the
+    seconds floor(t) - window + 1 through floor(t).
+    """
+
+    def __init__(self, windows=(300, 900, 3600)):
+        self.windows = tuple(sorted(windows))
+        self.size = self.windows[-1]
+        self._buckets = array('I', bytes(4 * self.size))
+        self._totals = dict.fromkeys(self.windows, 0)
+        self._head = None  # newest second the ring covers
+        self._lock = threading.Lock()
+
+    def _advance(self, second):
+        """Move the ring forward so it ends at second"""
+        if self._head is None or second - self._head >= self.size:
+            self._buckets = array('I', bytes(4 * self.size))
+            self._totals = dict.fromkeys(self.windows, 0)
+            self._head = second
+            return
+        buckets, size = self._buckets, self.size
+        while self._head < second:
+            self._head += 1
+            for window in self.windows:
+                # The bucket `window` seconds back leaves this window
+                self._totals[window] -= buckets[(self._head - window) % size]
+            buckets[self._head % size] = 0
+
+    def add(self, timestamp, count=1):
+        """Count calls at timestamp (epoch seconds)"""
+        second = int(timestamp)
+        with self._lock:
+            if self._head is None or second > self._head:
+                self._advance(second)
+            age = self._head - second
+            if age >= self.size:
+                return  # Older than every window
+            self._buckets[second % self.size] += count
+            for window in self.windows:
+                if age < window:
+                    self._totals[window] += count
+
+    def count(self, window, now):
+        """Calls in the window seconds ending at now"""
+        with self._lock:
+            if self._head is None:
+                return 0
+            second = int(now)
+            if second > self._head:
+                self._advance(second)
+            return self._totals[window]
+
+    def rate(self, window, now, elapsed=None):
+        """Calls per hour over the window (or over elapsed, if shorter)"""
+        if elapsed is not None:
+            span = min(window, elapsed)
+        else:
+            span = window
+        if span <= 0:
+            return 0
+        return round(self.count(window, now) * 3600 / span, 1)
@@ -0,0 +1,207 @@
+# redial.py
+"""
+Redial policy and per-lead attempt store for DialLoop Pro
+"""
+
+import os
+import struct
+import sys
+from array import array
+from itertools import compress
+
+from call_history import ABANDONED, CONNECTED, DROPPED, FORCED_NEXT, NO_ANSWER, STOPPED
+from file_utils import set_aside
+
+STORE_MAGIC = b'DLRD'
+STORE_VERSION = 1
+HEADER = struct.Struct('<4sIq')  # magic, version, base epoch second
+# Per row: due (seconds after the base, 0 = no redial pending), attempts,
+# last outcome
+RECORD = struct.Struct('<IBB2x')
+MAX_DUE = 0xFFFFFFFF
+
+MAX_ATTEMPTS = 255
+
+# Outcome codes stored in a record (0 = never dialed)
+OUTCOME_CODES = {NO_ANSWER: 1, CONNECTED: 2, FORCED_NEXT: 3, STOPPED: 4, ABANDONED: 5,
+                 DROPPED: 6}
+OUTCOMES = {code: outcome for outcome, code in OUTCOME_CODES.items()}
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Rule values: SPACING follows the attempt spacing, NEVER ends redials,
+# anything else is a fixed delay in seconds
+SPACING = 'spacing'
+NEVER = 'never'
+
+DEFAULT_RULES = {
+    NO_ANSWER: SPACING,
+    FORCED_NEXT: SPACING,
+    STOPPED: 0,  # stopped while ringing - it never really rang out
+    ABANDONED: SPACING,
+    DROPPED: SPACING,  # rang, but was hung up for another line's answer
+    CONNECTED: NEVER,
+}
+
+
+def parse_duration(text):
+    """Seconds in a duration like '90', '30m', '4h' or '3d'"""
+    text = text.strip().lower()
+    unit = DURATION_UNITS.get(text[-1:])
+    try:
+        if unit is None:
+            return int(float(text))
+        return int(float(text[:-1]) * unit)
+    except ValueError:
+        raise ValueError(f"bad duration {text!r}") from None
+
+
+def parse_rules(text):
+    """Outcome rules from 'outcome: rule, ...' (rule: spacing, never or a duration)"""
+    rules = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        outcome, _, rule = item.partition(':')
+        outcome, rule = outcome.strip().lower(), rule.strip().lower()
+        if outcome not in OUTCOME_CODES:
+            raise ValueError(f"unknown outcome {outcome!r}")
+        rules[outcome] = rule if rule in (SPACING, NEVER) else parse_duration(rule)
+    return rules
+
+
+class RedialPolicy:
+    """When to dial a lead again after an attempt that did not connect
+
+    After the Nth attempt the lead comes back spacing[N - 1] seconds
+    later (the last gap repeats), until max_attempts have been made.
+    rules maps an outcome to SPACING, NEVER or a fixed delay in seconds,
+    over DEFAULT_RULES.
+    """
+
+    def __init__(self, spacing=(4 * 3600, 86400, 3 * 86400), max_attempts=4, rules=None):
+        self.spacing = tuple(spacing) or (0,)
+        self.max_attempts = max(1, min(max_attempts, MAX_ATTEMPTS))
+        self.rules = dict(DEFAULT_RULES, **(rules or {}))
+
+    @classmethod
+    def from_settings(cls, spacing, max_attempts, rules=''):
+        """Policy from the settings strings, e.g. '4h, 1d, 3d', 4, 'stopped: 0'"""
+        return cls([parse_duration(gap) for gap in spacing.split(',') if gap.strip()],
+                   max_attempts, parse_rules(rules))
+
+    def next_due(self, outcome, attempts, now):
+        """Epoch time to dial again after attempts dials, or None for never"""
+        rule = self.rules.get(outcome, NEVER)
+        if rule == NEVER or attempts >= self.max_attempts:
+            return None
+        if rule == SPACING:
+            rule = self.spacing[min(attempts, len(self.spacing)) - 1]
+        return now + rule
+
+
+class RedialStore:
+    """Attempt count, last outcome and redial due time per lead row
+
+    A sidecar file of fixed 8-byte records indexed by row after a 16-byte
+    header, so recording an outcome is one positioned write and the file
+    only grows as far as the highest row dialed (rows never dialed read
+    as zeros). Due times are whole seconds after a base epoch time kept
+    in the header. The whole store is loaded into flat arrays on open.
+    """
+
+    def __init__(self, path, policy):
+        self.path = path
+        self.policy = policy
+        self.due = array('I')
+        self.attempts = array('B')
+        self.outcomes = array('B')
+        self.base = None  # set from the header, or by the first record
+        self._fd = None
+        self.load()
+
+    def __len__(self):
+        return len(self.due)
+
+    def load(self):
+        """Read the store file, starting empty if it is missing or unusable
+
+        An unusable file is moved aside to .bad rather than overwritten.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        if len(data) < HEADER.size or HEADER.unpack_from(data)[:2] != (STORE_MAGIC,
+                                                                     STORE_VERSION):
+            print(f"Redial store {self.path} unreadable - starting over")
+            set_aside(self.path, '.bad')
+            return
+        self.base = HEADER.unpack_from(data)[2]
+        body = memoryview(data)[HEADER.size:]
+        body = body[:len(body) - len(body) % RECORD.size]
+        words = array('I')
+        words.frombytes(body)
+        if sys.byteorder == 'big':
+            words.byteswap()
+        self.due = words[0::2]
+        self.attempts = array('B', bytes(body[4::RECORD.size]))
+        self.outcomes = array('B', bytes(body[5::RECORD.size]))
+
+    def _open(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(self._fd).st_size < HEADER.size:
+                os.pwrite(self._fd, HEADER.pack(STORE_MAGIC, STORE_VERSION, self.base), 0)
+        return self._fd
+
+    def _grow(self, size):
+        extra = size - len(self.due)
+        if extra > 0:
+            self.due.frombytes(bytes(4 * extra))
+            self.attempts.frombytes(bytes(extra))
+            self.outcomes.frombytes(bytes(extra))
+
+    def record(self, row, outcome, now):
+        """Count an attempt's outcome; returns when to redial, or None"""
+        self._grow(row + 1)
+        if self.base is None:
+            self.base = int(now) - 1  # so a due time is never 0
+        attempts = min(self.attempts[row] + 1, MAX_ATTEMPTS)
+        due = self.policy.next_due(outcome, attempts, now)
+        # Stored to the second, rounded up so a redial is never early
+        due = 0 if due is None else min(MAX_DUE, max(1, -int((self.base - due) // 1)))
+        self.due[row] = due
+        self.attempts[row] = attempts
+        self.outcomes[row] = OUTCOME_CODES.get(outcome, 0)
+        os.pwrite(self._open(), RECORD.pack(due, attempts, self.outcomes[row]),
+                  HEADER.size + row * RECORD.size)
+        return self.due_time(row)
+
+    def due_time(self, row):
+        """Epoch time a row's redial is due, or None if none is pending"""
+        if row >= len(self.due) or not self.due[row]:
+            return None
+        return self.base + self.due[row]
+
+    def outcome(self, row):
+        """Last recorded outcome of a row, or None"""
+        return OUTCOMES.get(self.outcomes[row]) if row < len(self.outcomes) else None
+
+    def pending_rows(self, limit=None):
+        """Rows (below limit) with a redial pending"""
+        size = len(self.due) if limit is None else min(limit, len(self.due))
+        return list(compress(range(size), self.due))
+
+    def flush(self):
+        """Make recorded outcomes durable"""
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close(self):
+        """Flush and close the store file (reopened on the next record)"""
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# simulator_backend.py
+"""
+Headless simulator backend for DialLoop Pro
+
+Stands in for the dialer and spreadsheet apps with configurable step
+latencies and call outcomes, and plays the agent: when a simulated call
+is answered it presses On/Off Call, and after the talk time it presses
+it again. A share of unanswered calls is skipped with Hangup & Next, so
+the on-call and force-break paths of the dial loop are exercised too.
+With lines > 1 it is a multi-session dialer for parallel dialing.
+
+Usage: python3 simulator_backend.py [simulated_minutes] [time_scale] [lines]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from automation_backend import AutomationBackend
+
+# Per-step latency as (mean, standard deviation) in seconds
+DEFAULT_LATENCY = {
+    'activate': (0.15, 0.05),
+    'copy': (0.25, 0.08),
+    'dial': (0.35, 0.10),
+    'hangup': (0.10, 0.03),
+}
+
+
+class SimulatorBackend(AutomationBackend):
+    """Simulated dialer, spreadsheet and agent"""
+
+    def __init__(self, answer_rate=0.15, ring_time=(8.0, 4.0),
+                 talk_time=(90.0, 60.0), skip_rate=0.05, skip_after=(5.0, 2.0),
+                 latency=None, time_scale=1.0, seed=None, lines=1):
+        super().__init__()
+        self.max_lines = lines
+        self.answer_rate = answer_rate
+        self.ring_time = ring_time
+        self.talk_time = talk_time
+        self.skip_rate = skip_rate
+        self.skip_after = skip_after
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+
+        self.engine = None
+        self.front_app = ''
+        self.clipboard = ''
+        self.row = 0
+
+        # Outcome counters
+        self.dials = 0
+        self.answered = 0
+        self.skipped = 0
+        self.picked_up = 0  # answers on any line, routed to the agent or not
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._line_calls = {}  # line -> token of the call on it
+
+    def attach(self, engine):
+        """Let the simulated agent press buttons on an engine"""
+        self.engine = engine
+
+    def sample(self, distribution):
+        """Draw a non-negative duration from (mean, sd)"""
+        mean, sd = distribution
+        return max(0.0, self.rng.gauss(mean, sd))
+
+    def delay(self, step):
+        """Sleep for a sampled step latency and record it"""
+        seconds = self.sample(self.latency[step])
+        time.sleep(seconds * self.time_scale)
+        self.record_wait(step, seconds)
+
+    def schedule(self, seconds, action):
+        """Run an agent action after a simulated delay"""
+        timer = threading.Timer(seconds * self.time_scale, action)
+        timer.daemon = True
+        with self._lock:
+            self._pending.append(timer)
+        timer.start()
+
+    def cancel_pending(self):
+        """Drop ring/skip events for the current call"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for timer in pending:
+            timer.cancel()
+
+    def number_for_row(self, row):
+        """Synthetic lead number for a spreadsheet row"""
+        return f"555{2000000 + row % 8000000:07d}"
+
+    # --- AutomationBackend ------------------------------------------------
+
+    def activate_window(self, window_title):
+        """Bring a simulated app to the front"""
+        if not self.is_window_focused(window_title):
+            self.delay('activate')
+            self.front_app = window_title
+        return True
+
+    def is_window_focused(self, window_title):
+        """True if the simulated app is frontmost"""
+        return bool(window_title) and window_title.lower() in self.front_app.lower()
+
+    def copy_next_number(self, spreadsheet_title):
+        """Move down one row and copy it"""
+        self.activate_window(spreadsheet_title)
+        self.delay('copy')
+        self.row += 1
+        self.clipboard = self.number_for_row(self.row)
+        return True
+
+    def read_clipboard(self):
+        """Simulated clipboard text"""
+        return self.clipboard
+
+    def paste_and_dial(self, dialer_title, x, y, prefix):
+        """Dial the clipboard number"""
+        return self.dial_number(dialer_title, x, y, f"{prefix or ''}{self.clipboard}")
+
+    def dial_number(self, dialer_title, x, y, digits):
+        """Place a simulated call and decide its outcome"""
+        self.activate_window(dialer_title)
+        self.delay('dial')
+        self.place_call(digits)
+        return True
+
+    def hangup(self, x, y):
+        """Hang up the simulated line"""
+        self.cancel_pending()
+        self.delay('hangup')
+
+    # --- Simulated calls and agent ----------------------------------------
+
+    def answer_probability(self, digits):
+        """Chance this number answers (override for per-lead models)"""
+        return self.answer_rate
+
+    def place_call(self, digits):
+        """Roll the outcome of a dial and schedule the agent's reaction"""
+        self.cancel_pending()
+        self.dials += 1
+        roll = self.rng.random()
+        answer = self.answer_probability(digits)
+        if roll < answer:
+            self.schedule(self.sample(self.ring_time), self.answer_call)
+        elif roll < answer + self.skip_rate:
+            self.schedule(self.sample(self.skip_after), self.skip_call)
+
+    def answer_call(self):
+        """Prospect picked up - the agent goes on call"""
+        with self._lock:
+            self._pending = []
+        if self.engine is None:
+            return
+        self.answered += 1
+        self.engine.toggle_call()
+        talk = self.sample(self.talk_time)
+        timer = threading.Timer(talk * self.time_scale, self.end_call)
+        timer.daemon = True
+        timer.start()
+
+    def end_call(self):
+        """Conversation over - the agent ends the call"""
+        if self.engine is not None and self.engine.on_call:
+            self.engine.toggle_call()
+
+    def skip_call(self):
+        """Agent gives up on a ringing line"""
+        with self._lock:
+            self._pending = []
+        if self.engine is not None:
+            self.skipped += 1
+            self.engine.hangup_next()
+
+    # --- Multi-line sessions ----------------------------------------------
+
+    def dial_line(self, line, digits):
+        """Place a simulated call on one line"""
+        self.delay('dial')
+        token = object()
+        with self._lock:
+            self.dials += 1
+            self._line_calls[line] = token
+        if self.rng.random() < self.answer_probability(digits):
+            timer = threading.Timer(self.sample(self.ring_time) * self.time_scale,
+                                    self.answer_line, (line, token))
+            timer.daemon = True
+            timer.start()
+        return True
+
+    def answer_line(self, line, token):
+        """Prospect on a line picked up - tell the engine"""
+        with self._lock:
+            if self._line_calls.get(line) is not token:
+                return  # hung up (or redialed) before it was answered
+            self.picked_up += 1
+        if self.on_line_answered is not None:
+            self.on_line_answered(line)
+
+    def hangup_line(self, line):
+        """Hang up one line"""
+        with self._lock:
+            self._line_calls.pop(line, None)
+        self.delay('hangup')
+
+    def connect_line(self, line):
+        """The agent takes an answered line and ends the call after the talk time"""
+        with self._lock:
+            self.answered += 1
+        timer = threading.Timer(self.sample(self.talk_time) * self.time_scale, self.end_call)
+        timer.daemon = True
+        timer.start()
+
+
+def create_simulated_engine(workdir, time_scale=0.01, wait_time=35000, lines=1, **kwargs):
+    """Build a DialEngine wired to a SimulatorBackend, with files in workdir"""
+    from config_manager import ConfigManager
+    from dial_engine import DialEngine
+    from stats_manager import StatsManager
+
+    config = ConfigManager(os.path.join(workdir, 'settings.ini'))
+    config.update_config({
+        'Configuration': {
+            'DialerTitle': 'Simulated Dialer',
+            'SpreadsheetTitle': 'Simulated Sheet',
+            'HangupX': '100', 'HangupY': '100',
+            'DialX': '200', 'DialY': '200',
+            'WaitTime': str(wait_time),
+            'Lines': str(lines),
+        }
+    })
+    stats = StatsManager(os.path.join(workdir, 'stats.ini'))
+
+    backend = SimulatorBackend(time_scale=time_scale, lines=lines, **kwargs)
+    engine = DialEngine(backend, config, stats, time_scale=time_scale)
+    backend.attach(engine)
+    engine.load_configuration()
+    return engine, backend
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    time_scale = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    lines = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, backend = create_simulated_engine(tmp, time_scale, lines=lines, seed=1)
+        engine.on_warning = lambda title, text: None
+        engine.start()
+        time.sleep(minutes * 60 * time_scale)
+        while not engine.stop():
+            backend.end_call()  # finish a call in progress first
+        engine.dial_thread.join()
+        engine.shutdown()
+
+        print(f"Simulated {minutes:g} min at {1 / time_scale:g}x speed")
+        print(f"Dials:     {backend.dials}")
+        print(f"Answered:  {backend.answered}")
+        print(f"Skipped:   {backend.skipped}")
+        if lines > 1:
+            print(f"Abandoned: {engine.abandoned_calls} of {backend.picked_up} answers")
+        print(f"Counted:   {engine.session_calls} calls, "
+              f"{engine.total_talk_time // 1000}s talk time")
+
+
+if __name__ == '__main__':
+    main()
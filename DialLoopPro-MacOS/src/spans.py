@@ -0,0 +1,94 @@
+# spans.py
+"""
+Lightweight timing spans for the DialLoop Pro hot path
+"""
+
+import itertools
+import json
+import threading
+
+
+class SpanRing:
+    """Fixed-size in-memory ring buffer of timing spans
+
+    record() takes no lock: the sequence number comes from an
+    itertools.count (atomic under the GIL) and each span is a single list
+    store into its slot. Readers check the stored sequence number to skip
+    slots that were overwritten before they got to them.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._seq = itertools.count()
+        self.next_seq = 0  # one past the highest sequence handed out
+
+    def record(self, name, start, seconds, call=None):
+        """Store one span (start is wall-clock epoch seconds)"""
+        seq = next(self._seq)
+        self._slots[seq % self.capacity] = (seq, name, start, seconds, call)
+        self.next_seq = seq + 1
+
+    def read_since(self, seq):
+        """Spans with sequence >= seq still in the buffer, plus how many were lost"""
+        end = self.next_seq
+        start = max(seq, end - self.capacity)
+        spans = []
+        lost = start - seq
+        for i in range(start, end):
+            span = self._slots[i % self.capacity]
+            if span is not None and span[0] == i:
+                spans.append(span)
+            else:
+                lost += 1
+        return spans, lost
+
+
+class SpanExporter:
+    """Periodically append new spans from a SpanRing to a JSONL file"""
+
+    def __init__(self, ring, path, interval=5.0):
+        self.ring = ring
+        self.path = path
+        self.interval = interval
+        self.exported = 0
+        self.dropped = 0
+        self._next = ring.next_seq
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def export(self):
+        """Write spans recorded since the last export"""
+        with self._lock:
+            spans, lost = self.ring.read_since(self._next)
+            self.dropped += lost
+            if not spans:
+                self._next += lost
+                return 0
+            self._next = spans[-1][0] + 1
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for seq, name, start, seconds, call in spans:
+                    f.write(json.dumps({
+                        'seq': seq,
+                        'span': name,
+                        'start': round(start, 6),
+                        'ms': round(seconds * 1000, 3),
+                        'call': call,
+                    }) + '\n')
+            self.exported += len(spans)
+            return len(spans)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.export()
+            except Exception as e:
+                print(f"Span export failed: {e}")
+
+    def close(self):
+        """Stop the exporter after a final export"""
+        self._stop.set()
+        self._thread.join()
+        self.export()
@@ -0,0 +1,132 @@
+# stats_dialog.py
+"""
+Statistics dialog for DialLoop Pro macOS
+"""
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QGroupBox, QFormLayout, QTabWidget,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import Qt
+
+from view_model import format_time
+
+COLUMNS = ["Period", "Dials", "Connected", "Connect %", "Forced Next",
+           "Talk Time", "Avg Wait"]
+
+
+class StatsDialog(QDialog):
+    """Session counters plus hourly/daily/weekly history
+
+    History comes from the call history rollup tables, so opening the
+    dialog reads a few dozen pre-aggregated rows however long the history
+    is.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("DialLoop Pro Statistics")
+        self.resize(640, 520)
+
+        self.setup_ui()
+        self.load_stats()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        # Current counters
+        counters_group = QGroupBox("Counters")
+        counters_layout = QFormLayout()
+
+        self.today_label = QLabel()
+        counters_layout.addRow("Today:", self.today_label)
+        self.week_label = QLabel()
+        counters_layout.addRow("This Week:", self.week_label)
+        self.lifetime_label = QLabel()
+        counters_layout.addRow("Lifetime:", self.lifetime_label)
+        self.connected_label = QLabel()
+        counters_layout.addRow("Connected:", self.connected_label)
+        self.rate_label = QLabel()
+        counters_layout.addRow("Rate:", self.rate_label)
+
+        counters_group.setLayout(counters_layout)
+        layout.addWidget(counters_group)
+
+        # History tables
+        self.tabs = QTabWidget()
+        self.tables = {}
+        for level, title in (('hourly', "Last 24 Hours"),
+                             ('daily', "Last 30 Days"),
+                             ('weekly', "Last 12 Weeks")):
+            table = QTableWidget(0, len(COLUMNS))
+            table.setHorizontalHeaderLabels(COLUMNS)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            table.verticalHeader().setVisible(False)
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self.tables[level] = table
+            self.tabs.addTab(table, title)
+        layout.addWidget(self.tabs)
+
+        self.history_note = QLabel()
+        self.history_note.setStyleSheet("color: #8e8e93; font-size: 11px;")
+        layout.addWidget(self.history_note)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.refresh_btn = QPushButton("🔄 Refresh")
+        self.refresh_btn.clicked.connect(self.load_stats)
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.accept)
+
+        button_layout.addWidget(self.refresh_btn)
+        button_layout.addWidget(self.close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def load_stats(self):
+        """Fill counters from the engine and tables from the rollups"""
+        engine = self.parent.engine
+
+        self.today_label.setText(f"{engine.session_display_calls}/{engine.daily_goal}")
+        self.week_label.setText(f"{engine.weekly_calls}/{engine.weekly_goal}")
+        self.lifetime_label.setText(f"{engine.total_calls} dials, "
+                                    f"{engine.suppressed_calls} do-not-call skipped")
+        self.connected_label.setText(
+            f"{engine.connected_calls} this session, "
+            f"{format_time(engine.total_talk_time // 1000)} talk time")
+        self.rate_label.setText(
+            f"{engine.current_hour_rate}/hr (15m: {engine.rate_15m}/hr) | "
+            f"Best: {engine.best_hourly_rate}/hr")
+
+        if engine.history is None:
+            self.history_note.setText("Call history is not enabled.")
+            return
+
+        summary = engine.history.summary()
+        for level, table in self.tables.items():
+            self.fill_table(table, summary[level])
+
+        attempts, connected = summary['lifetime'][:2]
+        self.history_note.setText(
+            f"History: {attempts} attempts, {connected} connected")
+
+    def fill_table(self, table, rows):
+        """Show rollup rows, newest first"""
+        table.setRowCount(len(rows))
+        for i, row in enumerate(reversed(rows)):
+            period, attempts, connected, forced_next, talk_ms, wait_ms = row
+            values = [
+                period,
+                str(attempts),
+                str(connected),
+                f"{connected * 100 / attempts:.1f}" if attempts else "-",
+                str(forced_next),
+                format_time(talk_ms // 1000),
+                f"{wait_ms / attempts / 1000:.1f}s" if attempts else "-",
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(i, col, item)
@@ -0,0 +1,169 @@
+# stats_journal.py
+"""
+Append-only journal with group commit for DialLoop Pro statistics
+"""
+
+import os
+import threading
+
+# First line of a journal, followed by its generation number
+GENERATION = '# generation '
+
+
+class StatsJournal:
+    """Write-behind log of (section, key, value) updates
+
+    Updates are buffered in memory and appended to the journal file by a
+    background thread, either every flush_interval seconds or as soon as
+    flush_every updates are waiting, with one fsync per batch. Once
+    compact_every updates have been written, the compactor callback is
+    asked to write a full snapshot and the journal is truncated.
+
+    Each compaction starts a new generation: the compactor stores its
+    number in the snapshot and the emptied journal starts with a
+    "# generation N" line. A crash after the snapshot is written but
+    before the journal is truncated leaves a journal older than the
+    snapshot, which recover() then skips instead of replaying older
+    values over newer ones.
+    """
+
+    def __init__(self, path, compactor=None, flush_interval=0.5,
+                 flush_every=32, compact_every=1000):
+        self.path = path
+        self.compactor = compactor
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.compact_every = compact_every
+
+        self.writes = 0  # fsync'd batches, for benchmarks
+        self._buffer = []
+        self._since_compact = 0
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self.generation = self.read_generation()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, section, key, value):
+        """Queue a single update for the next group commit"""
+        line = f"{section}\t{key}\t{value}\n"
+        with self._buffer_lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._wakeup.set()
+
+    def read_generation(self):
+        """Generation from the journal's first line (0 for a journal without one)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                first = f.readline()
+        except OSError:
+            return 0
+        if first.startswith(GENERATION) and first.endswith('\n'):
+            try:
+                return int(first[len(GENERATION):])
+            except ValueError:
+                pass
+        return 0
+
+    def replay(self):
+        """Yield (section, key, value) for every complete journal entry"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # A torn last line from a crash has no newline - skip it
+                if not line.endswith('\n'):
+                    break
+                if line.startswith('#'):
+                    continue
+                parts = line[:-1].split('\t', 2)
+                if len(parts) == 3:
+                    yield parts[0], parts[1], parts[2]
+
+    def recover(self, load_snapshot):
+        """Call load_snapshot and return the journal entries to replay on top
+
+        load_snapshot returns the generation stored in the snapshot (None
+        for 0). Pending updates are flushed first and compaction is held
+        off, so the snapshot and the journal are read as one consistent
+        pair.
+        """
+        with self._file_lock:
+            self._flush_locked()
+            snapshot = load_snapshot() or 0
+            if snapshot > self.generation:
+                # Compaction was cut short after the snapshot: it already
+                # holds everything in the journal
+                self._reset_locked(snapshot)
+                entries = []
+            else:
+                entries = list(self.replay())
+            # Updates queued while the snapshot was loading are not on disk yet
+            with self._buffer_lock:
+                pending = list(self._buffer)
+        for line in pending:
+            parts = line[:-1].split('\t', 2)
+            entries.append((parts[0], parts[1], parts[2]))
+        return entries
+
+    def flush(self):
+        """Write and fsync all buffered updates"""
+        with self._file_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        with self._buffer_lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._since_compact += len(lines)
+        self.writes += 1
+
+    def compact(self):
+        """Snapshot through the compactor and start the next generation"""
+        with self._file_lock:
+            self._flush_locked()
+            generation = self.generation + 1
+            if self.compactor is not None:
+                self.compactor(generation)
+            self._reset_locked(generation)
+
+    def _reset_locked(self, generation):
+        """Empty the journal down to its generation line"""
+        self._file.seek(0)
+        self._file.truncate(0)
+        self._file.write(f"{GENERATION}{generation}\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.generation = generation
+        self._since_compact = 0
+
+    def _run(self):
+        """Background group-commit loop"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self._since_compact >= self.compact_every:
+                    self.compact()
+            except Exception as e:
+                print(f"Stats journal write failed: {e}")
+
+    def close(self):
+        """Stop the writer thread and compact whatever is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.compact()
+        self._file.close()
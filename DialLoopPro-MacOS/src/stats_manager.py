@@ -4,22 +4,41 @@ Statistics management for DialLoop Pro
 """
 
 import configparser
+import io
 import os
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
+
+from file_utils import atomic_write
+from stats_journal import StatsJournal
+
+
+def iso_week(when=None):
+    """ISO week key like '2024-W19' (weeks start on Monday)"""
+    year, week, _ = (when or datetime.now()).isocalendar()
+    return f"{year}-W{week:02d}"
+
 
 class StatsManager:
-    def __init__(self, stats_file='stats.ini'):
+    def __init__(self, stats_file='stats.ini', journal_file=None):
         self.stats_file = stats_file
+        self.journal_file = journal_file or stats_file + '.journal'
         self.stats = configparser.ConfigParser()
+        self.snapshots = 0  # full INI writes, for benchmarks
+        self._lock = threading.RLock()
+        
+        self.journal = StatsJournal(self.journal_file,
+                                    compactor=self.write_snapshot)
         
         # Create default stats if doesn't exist
         if not os.path.exists(stats_file):
             self.create_default_stats()
         else:
-            self.stats.read(stats_file)
+            self.rebuild_stats()
             
         # Ensure daily section exists
         self.initialize_daily_stats()
+        self.check_weekly_reset()
     
     def create_default_stats(self):
         """Create default statistics file"""
@@ -27,12 +46,13 @@ class StatsManager:
         
         self.stats['Lifetime'] = {
             'TotalCalls': '0',
+            'SuppressedCalls': '0',
             'LastSession': 'Never'
         }
         
         self.stats['Weekly'] = {
             'TotalCalls': '0',
-            'LastResetDate': '0'
+            'Week': iso_week()
         }
         
         self.stats['Daily'] = {
@@ -47,6 +67,29 @@ class StatsManager:
         
         self.save_stats_file()
     
+    def rebuild_stats(self):
+        """Rebuild counters from the INI snapshot plus journal replay"""
+        def load_snapshot():
+            with self._lock:
+                self.stats = configparser.ConfigParser()
+                self.stats.read(self.stats_file)
+                return self.stats.getint('Journal', 'Generation', fallback=0)
+        
+        entries = self.journal.recover(load_snapshot)
+        with self._lock:
+            for section, key, value in entries:
+                if section not in self.stats:
+                    self.stats[section] = {}
+                self.stats[section][key] = value
+    
+    def set_value(self, section, key, value):
+        """Update a counter in memory and journal it (write-behind)"""
+        with self._lock:
+            if section not in self.stats:
+                self.stats[section] = {}
+            self.stats[section][key] = value
+            self.journal.append(section, key, value)
+    
     def initialize_daily_stats(self):
         """Initialize daily statistics with auto-reset"""
         today = datetime.now().strftime('%Y%m%d')
@@ -58,16 +101,18 @@ class StatsManager:
         
         # Reset if it's a new day
         if last_reset != today:
-            self.stats['Daily']['LastResetDate'] = today
-            self.stats['Daily']['Calls'] = '0'
+            self.set_value('Daily', 'LastResetDate', today)
+            self.set_value('Daily', 'Calls', '0')
             self.save_stats_file()
     
     def load_stats(self):
         """Load all statistics"""
+        self.rebuild_stats()
         stats_dict = {}
         
         if 'Lifetime' in self.stats:
             stats_dict['total_calls'] = self.stats['Lifetime'].getint('TotalCalls', 0)
+            stats_dict['suppressed_calls'] = self.stats['Lifetime'].getint('SuppressedCalls', 0)
         
         if 'Weekly' in self.stats:
             stats_dict['weekly_calls'] = self.stats['Weekly'].getint('TotalCalls', 0)
@@ -84,46 +129,75 @@ class StatsManager:
     def save_stats(self, stats_dict):
         """Save statistics"""
         if 'total_calls' in stats_dict:
-            self.stats['Lifetime']['TotalCalls'] = str(stats_dict['total_calls'])
-            self.stats['Lifetime']['LastSession'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.set_value('Lifetime', 'TotalCalls', str(stats_dict['total_calls']))
+            self.set_value('Lifetime', 'LastSession', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         if 'weekly_calls' in stats_dict:
-            self.stats['Weekly']['TotalCalls'] = str(stats_dict['weekly_calls'])
-            
-            # Check for weekly reset (Monday)
-            self.check_weekly_reset()
+            self.set_value('Weekly', 'TotalCalls', str(stats_dict['weekly_calls']))
         
         if 'connected_calls' in stats_dict:
-            self.stats['Session']['ConnectedCalls'] = str(stats_dict['connected_calls'])
+            self.set_value('Session', 'ConnectedCalls', str(stats_dict['connected_calls']))
         
-        self.save_stats_file()
+        if 'suppressed_calls' in stats_dict:
+            self.set_value('Lifetime', 'SuppressedCalls', str(stats_dict['suppressed_calls']))
     
     def save_daily_count(self, count):
         """Save daily call count"""
-        self.stats['Daily']['Calls'] = str(count)
-        self.save_stats_file()
+        self.set_value('Daily', 'Calls', str(count))
     
     def save_session_stats(self, total_calls, session_time_ms, current_rate, best_rate):
         """Save session statistics"""
-        self.stats['Lifetime']['TotalCalls'] = str(total_calls)
-        self.stats['Lifetime']['LastSession'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.stats['Session']['AccumulatedTime'] = str(session_time_ms)
-        self.save_stats_file()
+        self.set_value('Lifetime', 'TotalCalls', str(total_calls))
+        self.set_value('Lifetime', 'LastSession', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        self.set_value('Session', 'AccumulatedTime', str(session_time_ms))
+        self.journal.flush()
     
     def check_weekly_reset(self):
-        """Check and reset weekly stats on Monday"""
-        today = datetime.now()
-        
-        # Monday is weekday 0 in Python
-        if today.weekday() == 0:  # Monday
-            last_reset = self.stats['Weekly'].get('LastResetDate', '0')
-            today_str = today.strftime('%Y%m%d')
-            
-            if last_reset != today_str:
-                self.stats['Weekly']['LastResetDate'] = today_str
-                self.stats['Weekly']['TotalCalls'] = '0'
+        """Reset weekly stats when the ISO week changes; True if it did
+        
+        Unlike a check that only runs on Mondays, this also catches weeks
+        where the app was first opened on a later day.
+        """
+        week = iso_week()
+        if 'Weekly' not in self.stats:
+            self.stats['Weekly'] = {}
+        stored = self.stats['Weekly'].get('Week')
+        
+        if stored is None:
+            # Older stats only know the Monday of the last reset, if any
+            try:
+                last_reset = datetime.strptime(
+                    self.stats['Weekly'].get('LastResetDate', '0'), '%Y%m%d')
+                stored = iso_week(last_reset)
+            except ValueError:
+                stored = week
+            self.set_value('Weekly', 'Week', stored)
+        
+        if stored != week:
+            self.set_value('Weekly', 'Week', week)
+            self.set_value('Weekly', 'TotalCalls', '0')
+            return True
+        return False
     
     def save_stats_file(self):
-        """Save statistics to file"""
-        with open(self.stats_file, 'w') as f:
-            self.stats.write(f)
\ No newline at end of file
+        """Save statistics to file (compacts the journal into the snapshot)"""
+        self.journal.compact()
+    
+    def write_snapshot(self, generation=None):
+        """Write the full INI snapshot atomically, with the journal generation"""
+        with self._lock:
+            if generation is not None:
+                self.stats['Journal'] = {'Generation': str(generation)}
+            buf = io.StringIO()
+            self.stats.write(buf)
+        atomic_write(self.stats_file, buf.getvalue())
+        self.snapshots += 1
+    
+    @property
+    def file_writes(self):
+        """Journal batches plus snapshot writes so far"""
+        return self.journal.writes + self.snapshots
+    
+    def close(self):
+        """Flush pending updates and compact before exit"""
+        self.journal.close()
\ No newline at end of file
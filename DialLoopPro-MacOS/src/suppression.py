@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# suppression.py
+"""
+Do-not-call suppression index for DialLoop Pro
+
+The index is a sorted array of normalized E.164 numbers stored as
+fixed-width 64-bit integers and opened with mmap. A small fence array
+(every FENCE_STEP-th number, stored after the numbers) is loaded into
+memory; a lookup binary-searches the fence, then one page-sized block of
+the mapped array, so tens of millions of entries cost almost no resident
+memory. An optional Bloom filter in front answers most misses without
+touching the array.
+
+Numbers merged in from other lists are also appended to a <dnc>.added
+sidecar, which a rebuild reads along with the DNC file, so rebuilding
+after the DNC file changes never drops them.
+
+Usage:
+    python3 suppression.py build dnc.txt [--bloom]
+    python3 suppression.py merge dnc.txt new_entries.txt
+    python3 suppression.py check dnc.txt 555-234-5678
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from lead_import import (detect_layout, format_e164, normalize_number, parse_chunk,
+                         split_chunks)
+
+INDEX_MAGIC = b'DLSX'
+BLOOM_MAGIC = b'DLBF'
+INDEX_VERSION = 1
+HEADER = struct.Struct('<4sIQ')  # magic, version, number count
+BLOOM_HEADER = struct.Struct('<4sIQ')  # magic, hash count, bit count
+
+FENCE_STEP = 512  # numbers per 4 KB page
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 4
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+def index_path(dnc_file):
+    """Sidecar path of the suppression index for a DNC file"""
+    return dnc_file + '.sup'
+
+
+def bloom_path(dnc_file):
+    """Sidecar path of the optional Bloom filter for a DNC file"""
+    return dnc_file + '.bloom'
+
+
+def added_path(dnc_file):
+    """Sidecar path of the numbers merged into a DNC file's index"""
+    return dnc_file + '.added'
+
+
+class SuppressionIndex:
+    """Read-only view of a suppression index (and Bloom filter, if built)"""
+
+    def __init__(self, path, bloom_file=None):
+        self.path = path
+        self.checked = 0
+        self.suppressed = 0
+
+        with open(path, 'rb') as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"Not a suppression index: {path}")
+            if count:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                data = memoryview(self._mmap)[HEADER.size:].cast('Q')
+                self._numbers = data[:count]
+                self._fence = data[count:].tolist()
+                data.release()
+            else:
+                self._mmap = None
+                self._numbers = ()
+                self._fence = []
+
+        self._bloom = None
+        if bloom_file and os.path.exists(bloom_file):
+            with open(bloom_file, 'rb') as f:
+                magic, self._hashes, self._bits = BLOOM_HEADER.unpack(
+                    f.read(BLOOM_HEADER.size))
+                if magic == BLOOM_MAGIC and self._bits:
+                    self._bloom_mmap = mmap.mmap(f.fileno(), 0,
+                                                 access=mmap.ACCESS_READ)
+                    self._bloom = memoryview(self._bloom_mmap)[BLOOM_HEADER.size:]
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def contains(self, value):
+        """True if a normalized number is in the index"""
+        bloom = self._bloom
+        if bloom is not None:
+            h = (value * HASH_MULTIPLIER) & MASK64
+            h1, h2 = h >> 32, (h & 0xFFFFFFFF) | 1
+            bits = self._bits
+            for i in range(self._hashes):
+                bit = (h1 + i * h2) % bits
+                if not bloom[bit >> 3] & (1 << (bit & 7)):
+                    return False
+
+        block = bisect_right(self._fence, value) - 1
+        if block < 0:
+            return False
+        numbers = self._numbers
+        lo = block * FENCE_STEP
+        hi = min(lo + FENCE_STEP, len(numbers))
+        i = bisect_left(numbers, value, lo, hi)
+        return i < hi and numbers[i] == value
+
+    def is_suppressed(self, number):
+        """Normalize a dialed number and check it, keeping counts"""
+        self.checked += 1
+        value = normalize_number(number)
+        if value and self.contains(value):
+            self.suppressed += 1
+            return True
+        return False
+
+    def close(self):
+        """Unmap the index"""
+        if self._mmap is not None:
+            self._numbers.release()
+            self._mmap.close()
+            self._mmap = None
+        if self._bloom is not None:
+            self._bloom.release()
+            self._bloom_mmap.close()
+            self._bloom = None
+
+
+def read_numbers(path):
+    """Parse and normalize every number in a DNC file (sorted, unique)"""
+    delimiter, column = detect_layout(path)
+    parts = [parse_chunk(path, start, end, delimiter, column)[1]
+             for start, end in split_chunks(path)]
+    values = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    return np.unique(values[values > 0]).astype(np.uint64)
+
+
+def load_index_array(path):
+    """Existing index contents as a NumPy array"""
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=np.uint64)
+    with open(path, 'rb') as f:
+        _, _, count = HEADER.unpack(f.read(HEADER.size))
+    return np.fromfile(path, dtype=np.uint64, count=count, offset=HEADER.size)
+
+
+def write_index(path, numbers):
+    """Write sorted numbers as an index file (temp file, then rename)"""
+    numbers = np.ascontiguousarray(numbers, dtype=np.uint64)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(numbers)))
+        numbers.tofile(f)
+        numbers[::FENCE_STEP].tofile(f)
+    os.replace(tmp_path, path)
+
+
+def write_bloom(path, numbers, bits_per_entry=BLOOM_BITS_PER_ENTRY,
+                hashes=BLOOM_HASHES):
+    """Build a Bloom filter matching SuppressionIndex.contains"""
+    bits = max(64, len(numbers) * bits_per_entry)
+    table = np.zeros((bits + 7) // 8, dtype=np.uint8)
+
+    with np.errstate(over='ignore'):
+        h = numbers.astype(np.uint64) * np.uint64(HASH_MULTIPLIER)
+    h1 = h >> np.uint64(32)
+    h2 = (h & np.uint64(0xFFFFFFFF)) | np.uint64(1)
+    for i in range(hashes):
+        bit = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+        np.bitwise_or.at(table, (bit >> np.uint64(3)).astype(np.int64),
+                         (np.uint8(1) << (bit & np.uint64(7)).astype(np.uint8)))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, hashes, bits))
+        table.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def rebuild(dnc_file, bloom=False):
+    """Rebuild the suppression index from a DNC file and its merged numbers"""
+    numbers = read_numbers(dnc_file)
+    if os.path.exists(added_path(dnc_file)):
+        numbers = np.union1d(numbers, read_numbers(added_path(dnc_file)))
+    write_index(index_path(dnc_file), numbers)
+    if bloom:
+        write_bloom(bloom_path(dnc_file), numbers)
+    elif os.path.exists(bloom_path(dnc_file)):
+        os.remove(bloom_path(dnc_file))
+    return len(numbers)
+
+
+def merge(dnc_file, new_entries_file):
+    """Merge new DNC entries into the index; returns entries added
+
+    The new numbers go into the .added sidecar before the index, so a
+    later rebuild keeps them.
+    """
+    path = index_path(dnc_file)
+    if not os.path.exists(path):
+        rebuild(dnc_file)
+    existing = load_index_array(path)
+    added = np.setdiff1d(read_numbers(new_entries_file), existing)
+    if len(added):
+        with open(added_path(dnc_file), 'a') as f:
+            f.write(''.join(f"{format_e164(value)}\n" for value in added.tolist()))
+            f.flush()
+            os.fsync(f.fileno())
+    merged = np.union1d(existing, added)
+    write_index(path, merged)
+    if os.path.exists(bloom_path(dnc_file)):
+        write_bloom(bloom_path(dnc_file), merged)
+    return len(merged) - len(existing)
+
+
+def open_suppression(dnc_file):
+    """Open the index for a configured DNC file, building it if missing"""
+    if not dnc_file or not os.path.exists(dnc_file):
+        return None
+    path = index_path(dnc_file)
+    if not os.path.exists(path):
+        rebuild(dnc_file)
+    elif os.path.getmtime(path) < os.path.getmtime(dnc_file):
+        print(f"Suppression index is older than {dnc_file} - "
+              f"run: python3 suppression.py build {dnc_file}")
+    return SuppressionIndex(path, bloom_path(dnc_file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Do-not-call suppression index")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="rebuild the index from a DNC file")
+    build_cmd.add_argument('dnc_file')
+    build_cmd.add_argument('--bloom', action='store_true',
+                           help="also build a Bloom filter")
+
+    merge_cmd = sub.add_parser('merge', help="merge new entries into the index")
+    merge_cmd.add_argument('dnc_file')
+    merge_cmd.add_argument('new_entries')
+
+    check_cmd = sub.add_parser('check', help="check a number")
+    check_cmd.add_argument('dnc_file')
+    check_cmd.add_argument('number')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = rebuild(args.dnc_file, args.bloom)
+        print(f"✅ Suppression index built: {count:,} numbers")
+    elif args.command == 'merge':
+        added = merge(args.dnc_file, args.new_entries)
+        print(f"✅ Merged {added:,} new numbers")
+    else:
+        index = SuppressionIndex(index_path(args.dnc_file),
+                                 bloom_path(args.dnc_file))
+        suppressed = index.is_suppressed(args.number)
+        print("SUPPRESSED" if suppressed else "OK to dial")
+        return 1 if suppressed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
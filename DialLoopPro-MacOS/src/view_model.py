@@ -0,0 +1,132 @@
+# view_model.py
+"""
+Display model for the DialLoop Pro window
+
+Holds the last rendered value of every field and pushes only the ones
+that changed, so the Qt window touches a widget (or its style) only when
+what it shows is actually different. GUI-free, so it can be driven
+headless by the benchmarks.
+"""
+
+import time
+from enum import Enum
+
+
+class StatusKind(Enum):
+    """What the status line is showing, which decides its colour"""
+    INFO = 'info'
+    WAIT = 'wait'
+    WAIT_SOON = 'wait_soon'
+    WAIT_NOW = 'wait_now'
+    CALL = 'call'
+    LIVE = 'live'
+
+
+# Pre-built status label styles, applied only when the kind changes
+STATUS_STYLES = {
+    StatusKind.INFO: "color: #007aff;",       # Blue
+    StatusKind.WAIT: "color: #34c759;",       # Green
+    StatusKind.WAIT_SOON: "color: #ff9500;",  # Orange
+    StatusKind.WAIT_NOW: "color: #ff3b30;",   # Red
+    StatusKind.CALL: "color: #5856d6;",       # Purple
+    StatusKind.LIVE: "color: #ff2d55;",       # Pink
+}
+
+
+def status_kind(text):
+    """Kind of a free-form engine status message"""
+    if 'WAIT' in text:
+        return StatusKind.WAIT
+    if 'LIVE' in text:
+        return StatusKind.LIVE
+    if 'CALL' in text:
+        return StatusKind.CALL
+    return StatusKind.INFO
+
+
+def wait_kind(seconds):
+    """Colour band for the seconds left on the wait countdown"""
+    if seconds <= 5:
+        return StatusKind.WAIT_NOW
+    if seconds <= 10:
+        return StatusKind.WAIT_SOON
+    return StatusKind.WAIT
+
+
+def format_time(seconds):
+    """Format time in human-readable format"""
+    if seconds > 3600:
+        hours = seconds // 3600
+        minutes = (seconds % 3600) // 60
+        return f"{hours}h {minutes}m"
+    elif seconds > 60:
+        minutes = seconds // 60
+        secs = seconds % 60
+        return f"{minutes}m {secs}s"
+    else:
+        return f"{seconds}s"
+
+
+class DisplayModel:
+    """Last rendered window values; render(changed) gets only the diffs
+
+    Fields: status, status_kind, connected, talk_time, daily, weekly,
+    rate, daily_progress, weekly_progress.
+    """
+
+    def __init__(self, render, time_scale=1.0):
+        self.render = render
+        self.time_scale = time_scale
+        self.values = {}
+        self.countdown = None  # (kind, anchor epoch seconds)
+        self.pushes = 0
+
+    def update(self, fields):
+        """Push the fields whose value differs from what is shown"""
+        changed = {key: value for key, value in fields.items()
+                   if key not in self.values or self.values[key] != value}
+        if changed:
+            self.values.update(changed)
+            self.pushes += 1
+            self.render(changed)
+        return changed
+
+    def set_status(self, text):
+        """Show an engine status message (ends any countdown)"""
+        self.countdown = None
+        self.update({'status': text, 'status_kind': status_kind(text)})
+
+    def start_countdown(self, kind, anchor):
+        """Count down to a wait deadline ('wait') or up from a call start ('call')"""
+        self.countdown = (kind, anchor)
+        self.tick()
+
+    def tick(self, now=None):
+        """Render the countdown for the current time (GUI timer slot)"""
+        if self.countdown is None:
+            return {}
+        kind, anchor = self.countdown
+        if now is None:
+            now = time.time()
+        if kind == 'wait':
+            seconds = int(max(0.0, anchor - now) / self.time_scale)
+            return self.update({'status': f"WAIT {seconds:02d}s",
+                                'status_kind': wait_kind(seconds)})
+        seconds = int(max(0.0, now - anchor) / self.time_scale)
+        return self.update({'status': f"CALL {seconds:02d}s",
+                            'status_kind': StatusKind.CALL})
+
+    def refresh(self, engine):
+        """Re-read the engine's statistics and push what changed"""
+        daily_progress, weekly_progress = engine.progress()
+        talk_time = format_time(engine.total_talk_time // 1000)
+        return self.update({
+            'connected': f"Connected: {engine.connected_calls}",
+            'talk_time': f"Talk Time: {talk_time}",
+            'daily': f"Today: {engine.session_display_calls}/{engine.daily_goal}",
+            'weekly': f"Week: {engine.weekly_calls}/{engine.weekly_goal}",
+            'rate': (f"Rate: {engine.current_hour_rate}/hr | "
+                     f"Best: {engine.best_hourly_rate}/hr"),
+            'daily_progress': daily_progress,
+            'weekly_progress': weekly_progress,
+        })
@@ -0,0 +1,28 @@
+# waits.py
+"""
+Condition-based waiting for DialLoop Pro automation
+"""
+
+import time
+
+
+def wait_until(predicate, timeout, interval=0.01, max_interval=0.2, backoff=1.5):
+    """Poll predicate until it returns True or timeout seconds pass
+
+    Polling starts every interval seconds and backs off by the given factor
+    up to max_interval, so fast UI transitions are seen within a few
+    milliseconds without spinning on slow ones.
+
+    Returns (ok, waited): whether the condition was met and how many
+    seconds were actually spent waiting.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        if predicate():
+            return True, time.monotonic() - start
+        now = time.monotonic()
+        if now >= deadline:
+            return False, now - start
+        time.sleep(min(interval, deadline - now))
+        interval = min(interval * backoff, max_interval)
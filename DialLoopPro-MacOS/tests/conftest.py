@@ -0,0 +1,9 @@
+# conftest.py
+"""
+Test setup: the app's modules live flat in src/, imported by name
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
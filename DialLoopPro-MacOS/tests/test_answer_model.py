@@ -0,0 +1,74 @@
+# test_answer_model.py
+"""
+Answer model: table probabilities, and the stale row/column recompute
+"""
+
+import pytest
+
+from answer_model import HOURS_PER_WEEK, AnswerModel, hour_of_week
+
+ROWS = [(212, 10, 40, 12), (212, 11, 5, 4), (310, 10, 30, 3), (415, 100, 8, 0)]
+
+
+def rate(attempts, connected, k, overall):
+    return (connected + k * overall) / (attempts + k)
+
+
+def expected_table(rows, k):
+    """Every cell worked out from the counts alone"""
+    totals, areas, hours, cells = [0, 0], {}, {}, {}
+    for npa, how, attempts, connected in rows:
+        for counts in (totals, areas.setdefault(npa, [0, 0]), hours.setdefault(how, [0, 0]),
+                       cells.setdefault((npa, how), [0, 0])):
+            counts[0] += attempts
+            counts[1] += connected
+    overall = (totals[1] + 1) / (totals[0] + 2)
+
+    def probability(npa, how):
+        area_rate = rate(*areas.get(npa, (0, 0)), k, overall)
+        hour_rate = rate(*hours.get(how, (0, 0)), k, overall)
+        prior = min(1.0, area_rate * hour_rate / overall)
+        return rate(*cells.get((npa, how), (0, 0)), k, prior)
+    return probability
+
+
+def test_loaded_table_matches_the_formula():
+    model = AnswerModel()
+    model.load(ROWS)
+    expected = expected_table(ROWS, model.k)
+    for npa in (212, 310, 415, 999):
+        for how in range(HOURS_PER_WEEK):
+            assert model.probability(npa, how) == pytest.approx(expected(npa, how), rel=1e-6)
+
+    # Answered dials raise a cell, unanswered ones lower it
+    assert model.probability(212, 11) > model.probability(212, 12)
+    assert model.probability(415, 100) < model.probability(415, 101)
+
+
+def test_observe_recomputes_its_row_and_column_only():
+    model = AnswerModel()
+    model.load(ROWS)
+    before = model.table.tolist()
+    number, when = '3105550100', 1_800_000_000.0
+    how = hour_of_week(when)
+    for _ in range(10):
+        model.observe(number, when, True)
+    assert model.table.tolist() == before  # stale until read
+
+    assert model.probability(310, how) > before[310 * HOURS_PER_WEEK + how]
+    overall = (model.totals[1] + 1) / (model.totals[0] + 2)
+    for npa in range(1000):
+        for hour in range(HOURS_PER_WEEK):
+            i = npa * HOURS_PER_WEEK + hour
+            if npa != 310 and hour != how:
+                assert model.table[i] == before[i]
+                continue
+            prior = min(1.0, model.area_rate[npa] * model.hour_rate[hour] / overall)
+            assert model.table[i] == pytest.approx(
+                rate(model.attempts[i], model.connected[i], model.k, prior), rel=1e-6)
+
+    # A full rebuild from the same counts lands on the formula again
+    rebuilt = AnswerModel()
+    rebuilt.load(ROWS + [(310, how, 10, 10)])
+    expected = expected_table(ROWS + [(310, how, 10, 10)], rebuilt.k)
+    assert rebuilt.probability(310, how) == pytest.approx(expected(310, how), rel=1e-6)
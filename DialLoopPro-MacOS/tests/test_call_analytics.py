@@ -0,0 +1,67 @@
+# test_call_analytics.py
+"""
+Call analytics: .npz export of the call history and the NumPy reports
+"""
+
+import numpy as np
+import pytest
+
+from answer_model import hour_of_week
+from call_analytics import (OUTCOMES, connect_rate_by_hour, export_history, load_export,
+                            session_rates, talk_time_distribution, wasted_wait_per_connect)
+from call_history import ABANDONED, CONNECTED, DROPPED, NO_ANSWER, CallHistory
+
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def export(tmp_path):
+    history = CallHistory(str(tmp_path / 'history.db'))
+    attempts = [
+        (NOW, '(212) 555-0100', 3, 20000, CONNECTED, 45000, {'dial': 0.5, 'wait': 20.0}),
+        (NOW + 60, '2125550101', None, 35000, NO_ANSWER, 0, None),
+        (NOW + 120, None, 5, 10000, ABANDONED, 0, None),
+        (NOW + 180, '3105550199', 6, 15000, DROPPED, 0, None),
+        (NOW + 7200, '3105550199', 6, 5000, CONNECTED, 400000, None),
+    ]
+    for attempt in attempts:
+        history.record(*attempt)
+    history.close()
+
+    path = str(tmp_path / 'history.npz')
+    assert export_history(str(tmp_path / 'history.db'), path, phases=True) == 5
+    return load_export(path)
+
+
+def test_export_columns(export):
+    assert export['number'].tolist() == [12125550100, 12125550101, 0, 13105550199,
+                                         13105550199]
+    assert export['lead_row'].tolist() == [3, -1, 5, 6, 6]
+    assert [OUTCOMES[code] for code in export['outcome']] == [
+        CONNECTED, NO_ANSWER, ABANDONED, DROPPED, CONNECTED]
+    assert export['talk_ms'].dtype == np.int32
+    assert export['phase_dial'][0] == pytest.approx(0.5)
+    assert np.isnan(export['phase_dial'][1])
+
+
+def test_connect_rate_by_hour(export):
+    attempts, connects, rate = connect_rate_by_hour(export)
+    assert attempts.shape == (7, 24) and attempts.sum() == 5
+    day, hour = divmod(hour_of_week(NOW), 24)
+    assert (attempts[day, hour], connects[day, hour]) == (4, 1)
+    assert rate[day, hour] == 0.25
+    assert connects.sum() == 2
+
+
+def test_talk_time_wasted_wait_and_sessions(export):
+    talk = talk_time_distribution(export)
+    assert talk['counts'] == [0, 1, 0, 0, 1, 0, 0]  # 45 s and 400 s
+    assert talk['mean'] == pytest.approx(222.5)
+
+    # Wait on the three calls that did not connect, per connect
+    assert wasted_wait_per_connect(export) == pytest.approx((35 + 10 + 15) / 2)
+
+    starts, calls, rates = session_rates(export)
+    assert starts.tolist() == [NOW, NOW + 7200]
+    assert calls.tolist() == [4, 1]
+    assert rates.tolist() == [4 / (180 / 3600), 0.0]
@@ -0,0 +1,179 @@
+# test_call_history.py
+"""
+Call history: batched writes, rollups against the raw attempts, and the
+rollups feeding the answer model
+"""
+
+import random
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+import call_history
+from answer_model import AnswerModel, area_code, hour_of_week
+from call_history import (ABANDONED, CONNECTED, DROPPED, FORCED_NEXT, NO_ANSWER, ROLLUPS,
+                          CallHistory, answered, period_keys)
+
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = CallHistory(str(tmp_path / 'history.db'), flush_interval=60, batch_size=50)
+    yield history
+    history.close()
+
+
+def fill(history, count, days, seed=1):
+    """Random attempts over the days before NOW"""
+    rng = random.Random(seed)
+    for i in range(count):
+        outcome = rng.choice((CONNECTED, ABANDONED, NO_ANSWER, NO_ANSWER, FORCED_NEXT,
+                              DROPPED))
+        number = f"{rng.choice((212, 310))}5550{i % 1000:03d}"
+        history.record(NOW - rng.random() * days * 86400, number, i,
+                       rng.randint(2000, 35000), outcome, rng.randint(1000, 60000) if outcome == CONNECTED else 0)
+
+
+def raw_rollups(history):
+    """Every rollup worked out from the raw attempts"""
+    levels = {level: {} for level in ROLLUPS}
+    areas = {}
+    for dialed_at, number, _, wait_ms, outcome, talk_ms, _ in history.attempts():
+        when = datetime.fromtimestamp(dialed_at)
+        for level, key in zip(ROLLUPS, period_keys(when)):
+            counts = levels[level].setdefault(key, [0, 0, 0, 0, 0])
+            for i, value in enumerate((1, outcome == CONNECTED, outcome == FORCED_NEXT,
+                                       talk_ms, wait_ms)):
+                counts[i] += value
+        counts = areas.setdefault((area_code(number), hour_of_week(dialed_at)), [0, 0])
+        counts[0] += 1
+        counts[1] += answered(outcome)
+    return ({level: sorted((key,) + tuple(counts) for key, counts in totals.items())
+             for level, totals in levels.items()},
+            sorted(key + tuple(counts) for key, counts in areas.items()))
+
+
+def stored_rollups(history):
+    return ({level: history.rollups(level) for level in ROLLUPS},
+            sorted(history.area_hours()))
+
+
+def test_attempts_are_written_in_batches(history):
+    for i in range(49):
+        history.record(NOW + i, '2125550100', i, 1000, NO_ANSWER)
+    time.sleep(0.05)
+    assert history.writes == 0  # under batch_size, and the interval is a minute away
+
+    history.record(NOW + 49, '2125550100', 49, 1000, NO_ANSWER)
+    deadline = time.monotonic() + 5
+    while not history.writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert history.writes == 1
+    assert history.count() == 50
+    assert history.writes == 1  # nothing left for count() to write
+
+
+def test_database_is_in_wal_mode(history):
+    db = sqlite3.connect(history.path)
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    db.close()
+
+
+def test_failed_write_keeps_the_batch_for_the_next_flush(history, capsys):
+    history.record(NOW, '2125550100', 1, 1000, CONNECTED, 5000)
+    history._db.execute("PRAGMA busy_timeout = 0")
+    other = sqlite3.connect(history.path)
+    other.execute("BEGIN IMMEDIATE")  # another writer holds the database
+
+    history.flush()
+    assert 'Call history write failed' in capsys.readouterr().out
+    assert history.writes == 0
+    history.record(NOW + 1, '2125550100', 2, 1000, NO_ANSWER)
+
+    other.rollback()
+    other.close()
+    history.flush()
+    assert [row[2] for row in history.attempts()] == [1, 2]
+    assert history.rollups('daily')[0][1:3] == (2, 1)
+
+
+def test_rollups_match_the_raw_attempts(history):
+    fill(history, 3000, 60)
+    assert stored_rollups(history) == raw_rollups(history)
+
+
+def test_iso_weeks():
+    # 3 Jan 2021 is a Sunday in the last ISO week of 2020
+    assert period_keys(datetime(2021, 1, 3, 9)) == ('2021-01-03 09', '2021-01-03', '2020-W53')
+    assert period_keys(datetime(2021, 1, 4, 23))[2] == '2021-W01'
+
+
+def test_old_rollups_are_rebuilt_on_open(tmp_path, monkeypatch):
+    path = str(tmp_path / 'history.db')
+    history = CallHistory(path, batch_size=1000)
+    fill(history, 500, 20)
+    expected = stored_rollups(history)
+    history.close()
+
+    # A database from before the current rollups: stale counts, older version
+    db = sqlite3.connect(path)
+    db.execute("UPDATE rollup_daily SET attempts = attempts + 1000")
+    db.execute("DELETE FROM rollup_area_hour")
+    db.execute(f"PRAGMA user_version = {call_history.ROLLUP_VERSION - 1}")
+    db.commit()
+    db.close()
+
+    history = CallHistory(path)
+    assert stored_rollups(history) == expected
+    history.close()
+
+    # Up to date: left alone
+    monkeypatch.setattr(call_history, 'aggregate', None)
+    CallHistory(path).close()
+
+
+def test_summary_windows_and_lifetime(history):
+    now = datetime.fromtimestamp(NOW)
+    for hours_ago, outcome in ((0, CONNECTED), (2, NO_ANSWER), (30, CONNECTED),
+                               (24 * 40, FORCED_NEXT), (24 * 7 * 20, NO_ANSWER)):
+        history.record(NOW - hours_ago * 3600, '2125550100', None, 1000, outcome,
+                       7000 if outcome == CONNECTED else 0)
+
+    summary = history.summary(now=now)
+    assert sum(row[1] for row in summary['hourly']) == 2  # last 24 hours
+    assert sum(row[1] for row in summary['daily']) == 3  # last 30 days
+    assert sum(row[1] for row in summary['weekly']) == 4  # last 12 weeks
+    assert summary['daily'] == sorted(summary['daily'])
+    assert summary['lifetime'] == (5, 2, 1, 14000, 5000)
+
+
+def test_abandoned_counts_as_answered_but_not_connected(tmp_path):
+    history = CallHistory(str(tmp_path / 'history.db'))
+    for i, outcome in enumerate((CONNECTED, ABANDONED, NO_ANSWER, FORCED_NEXT)):
+        history.record(NOW + i, '2125550100', i, 1000, outcome)
+
+    assert history.area_hours() == [(212, hour_of_week(NOW), 4, 2)]
+    assert history.summary()['lifetime'][1] == 1  # connected calls
+    history.close()
+
+
+def test_model_reloaded_from_history_matches_the_live_model(tmp_path):
+    path = str(tmp_path / 'history.db')
+    history = CallHistory(path)
+    live = AnswerModel()
+    outcomes = (CONNECTED, ABANDONED, NO_ANSWER, NO_ANSWER, ABANDONED)
+    for i, outcome in enumerate(outcomes * 20):
+        number = f"{212 + i % 3}5550{i:03d}"
+        history.record(NOW + i, number, i, 1000, outcome)
+        live.observe(number, NOW + i, answered(outcome))
+    history.close()
+
+    reloaded = AnswerModel()
+    reloaded.load(CallHistory(path).area_hours())
+    for npa in (212, 213, 214):
+        number = f"{npa}5550100"
+        assert area_code(number) == npa
+        assert reloaded.score(number, NOW) == live.score(number, NOW)
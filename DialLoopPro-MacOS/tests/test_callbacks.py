@@ -0,0 +1,159 @@
+# test_callbacks.py
+"""
+Callbacks: timer wheel firing and cascading, the log, and next_due
+"""
+
+import os
+import random
+
+import pytest
+
+from callbacks import LEVELS, SLOT_BITS, CallbackQueue, TimerWheel
+
+START = 1_800_000_000
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(float(START))
+
+
+def test_keys_cascade_down_every_level_and_fire_on_time():
+    wheel = TimerWheel(START)
+    # One key in each level's range, and one past the top level
+    offsets = [5] + [(1 << (SLOT_BITS * level)) + 7 for level in range(1, LEVELS)]
+    offsets.append((1 << (SLOT_BITS * LEVELS)) + 11)
+    for key, offset in enumerate(offsets):
+        wheel.add(key, START + offset - 0.5)
+    assert {wheel.where[key][0] for key in range(LEVELS)} == set(range(LEVELS))
+
+    for key, offset in enumerate(offsets):
+        assert wheel.advance(START + offset - 1) == []
+        assert wheel.advance(START + offset) == [key]
+    assert len(wheel) == 0
+
+
+def test_wheel_matches_a_sorted_reference():
+    rng = random.Random(3)
+    wheel = TimerWheel(START)
+    due = {key: START + rng.random() * 10 * 86400 for key in range(2000)}
+    for key, when in due.items():
+        wheel.add(key, when)
+    cancelled = set(rng.sample(sorted(due), 200))
+    for key in cancelled:
+        assert wheel.remove(key)
+    assert not wheel.remove(next(iter(cancelled)))
+
+    now, fired = START, {}
+    while now < START + 11 * 86400:
+        now += rng.random() * 3000
+        for key in wheel.advance(now):
+            fired[key] = now
+    assert set(fired) == set(due) - cancelled
+    for key, at in fired.items():
+        assert due[key] <= at < due[key] + 3001  # never early, by the next step
+
+
+def test_due_callbacks_come_out_oldest_first(tmp_path, clock):
+    queue = CallbackQueue(str(tmp_path / 'callbacks.log'), clock)
+    late = queue.schedule(START + 90, '3105550001')
+    early = queue.schedule(START + 30, '3105550002')
+    assert queue.pop_due() is None
+
+    clock.now += 100
+    assert [queue.pop_due().id, queue.pop_due().id] == [early, late]
+    assert queue.pop_due() is None
+    queue.close()
+
+
+def test_cancel_and_complete(tmp_path, clock):
+    queue = CallbackQueue(str(tmp_path / 'callbacks.log'), clock)
+    kept = queue.schedule(START + 10, '3105550001')
+    dropped = queue.schedule(START + 5, '3105550002')
+    assert queue.cancel(dropped)
+    assert not queue.cancel(dropped)
+
+    clock.now += 20
+    callback = queue.pop_due()
+    assert callback.id == kept
+    queue.release(callback)  # not dialed: back in front
+    assert queue.pop_due().id == kept
+    queue.complete(kept)
+    assert len(queue) == 0 and queue.pop_due() is None
+    queue.close()
+
+
+def test_next_due_tracks_schedule_cancel_and_complete(tmp_path, clock):
+    queue = CallbackQueue(str(tmp_path / 'callbacks.log'), clock)
+    assert queue.next_due() is None
+    ids = [queue.schedule(START + offset, '3105550001') for offset in (300, 100, 200)]
+    assert queue.next_due() == START + 100
+    queue.cancel(ids[1])
+    assert queue.next_due() == START + 200
+    clock.now += 250
+    queue.complete(queue.pop_due().id)
+    assert queue.next_due() == START + 300
+
+    rng = random.Random(5)
+    for _ in range(500):
+        callback_id = queue.schedule(START + rng.random() * 86400, '3105550001')
+        if rng.random() < 0.8:
+            queue.cancel(callback_id)
+    assert queue.next_due() == min(c.due for c in queue.upcoming())
+    assert len(queue.soonest) <= 2 * len(queue) + 64
+    queue.close()
+
+
+def test_restart_recovers_pending_callbacks(tmp_path, clock):
+    path = str(tmp_path / 'callbacks.log')
+    queue = CallbackQueue(path, clock)
+    first = queue.schedule(START + 60, '3105550001', 7, 'after\tlunch')
+    done = queue.schedule(START + 30, '3105550002')
+    cancelled = queue.schedule(START + 90, '3105550003')
+    clock.now += 45
+    queue.complete(queue.pop_due().id)
+    queue.cancel(cancelled)
+    queue.close()
+    with open(path, 'a') as f:
+        f.write("add\t99\t1800000100.000\t\t310555")  # torn by a crash
+
+    queue = CallbackQueue(path, clock)
+    assert [(c.id, c.row, c.note) for c in queue.upcoming()] == [(first, 7, 'after lunch')]
+    later = queue.schedule(START + 120, '3105550004')
+    assert later > cancelled
+    clock.now += 100
+    assert queue.pop_due().id == first
+    assert done not in queue.pending
+    queue.close()
+
+    # What was logged after the torn line reads back too
+    queue = CallbackQueue(path, clock)
+    assert [c.id for c in queue.upcoming()] == [first, later]
+    queue.close()
+
+
+def test_reopen_compacts_a_mostly_dead_log(tmp_path, clock):
+    path = str(tmp_path / 'callbacks.log')
+    queue = CallbackQueue(path, clock)
+    ids = [queue.schedule(START + 10 + i, f"310555{i:04d}") for i in range(400)]
+    for callback_id in ids:
+        if callback_id % 10:
+            queue.cancel(callback_id)
+    queue.close()
+    size = os.path.getsize(path)
+
+    queue = CallbackQueue(path, clock)
+    kept = [callback_id for callback_id in ids if not callback_id % 10]
+    assert [c.id for c in queue.upcoming()] == kept
+    queue.close()
+    assert os.path.getsize(path) < size / 5
+    with open(path) as f:
+        assert sum(1 for _ in f) == len(kept)
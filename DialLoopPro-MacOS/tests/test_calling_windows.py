@@ -0,0 +1,104 @@
+# test_calling_windows.py
+"""
+Calling windows across the 2026 US DST changes, and deferral in the scheduler
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from calling_windows import CallingWindows
+from lead_source import ScheduledLeadSource
+
+
+def utc(*args):
+    """Epoch seconds for a UTC date and time"""
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# (description, number, start_hour, end_hour, now, expected next_open)
+CASES = [
+    ("NY before spring forward, 7:59 EST", '2125550100', 8, 21,
+     utc(2026, 3, 7, 12, 59), utc(2026, 3, 7, 13, 0)),
+    ("NY at 8:00 EST", '2125550100', 8, 21, utc(2026, 3, 7, 13, 0), None),
+    ("NY spring forward day, 7:59 EDT", '2125550100', 8, 21,
+     utc(2026, 3, 8, 11, 59), utc(2026, 3, 8, 12, 0)),
+    ("NY spring forward day, 8:00 EDT", '2125550100', 8, 21,
+     utc(2026, 3, 8, 12, 0), None),
+    ("NY spring forward day, 20:59 EDT", '2125550100', 8, 21,
+     utc(2026, 3, 9, 0, 59), None),
+    ("NY spring forward day, 21:00 EDT", '2125550100', 8, 21,
+     utc(2026, 3, 9, 1, 0), utc(2026, 3, 9, 12, 0)),
+    ("NY window opening in the skipped hour (2:00)", '2125550100', 2, 21,
+     utc(2026, 3, 8, 5, 0), utc(2026, 3, 8, 7, 0)),
+    ("NY fall back day, 7:59 EST", '2125550100', 8, 21,
+     utc(2026, 11, 1, 12, 59), utc(2026, 11, 1, 13, 0)),
+    ("NY day before fall back, 21:00 EDT", '2125550100', 8, 21,
+     utc(2026, 11, 1, 1, 0), utc(2026, 11, 1, 13, 0)),
+    ("NY window opening in the repeated hour (1:00)", '2125550100', 1, 21,
+     utc(2026, 11, 1, 4, 0), utc(2026, 11, 1, 5, 0)),
+    ("LA spring forward day, 7:59 PDT", '+1 (310) 555-0100', 8, 21,
+     utc(2026, 3, 8, 14, 59), utc(2026, 3, 8, 15, 0)),
+    ("Phoenix, no DST, same UTC open before", '6025550100', 8, 21,
+     utc(2026, 3, 7, 14, 0), utc(2026, 3, 7, 15, 0)),
+    ("Phoenix, no DST, same UTC open after", '6025550100', 8, 21,
+     utc(2026, 3, 9, 14, 0), utc(2026, 3, 9, 15, 0)),
+    ("Regina, no DST", '3065550100', 8, 21,
+     utc(2026, 7, 1, 13, 30), utc(2026, 7, 1, 14, 0)),
+    ("Idaho 208 (Denver+LA), Denver open, LA not", '2085550100', 8, 21,
+     utc(2026, 7, 1, 14, 30), utc(2026, 7, 1, 15, 0)),
+    ("Idaho 208, Denver closed at 21:00 MDT", '2085550100', 8, 21,
+     utc(2026, 7, 2, 3, 0), utc(2026, 7, 2, 15, 0)),
+    ("Idaho 208, both open", '2085550100', 8, 21, utc(2026, 7, 1, 16, 0), None),
+]
+
+
+@pytest.mark.parametrize('description, number, start, end, now, expected', CASES,
+                         ids=[case[0] for case in CASES])
+def test_next_open(description, number, start, end, now, expected):
+    assert CallingWindows(start, end).next_open(number, now) == expected
+
+
+def test_cached_answer_flips_at_the_boundary():
+    windows = CallingWindows()
+    for now, expected in ((utc(2026, 3, 8, 11, 59, 59), utc(2026, 3, 8, 12, 0)),
+                          (utc(2026, 3, 8, 12, 0), None),
+                          (utc(2026, 3, 9, 0, 59, 59), None),
+                          (utc(2026, 3, 9, 1, 0), utc(2026, 3, 9, 12, 0))):
+        assert windows.next_open('2125550100', now) == expected
+
+
+def test_deferred_leads_return_when_their_window_opens(tmp_path):
+    """NY and LA leads at 7:00 EDT: NY comes back at 8:00 EDT, LA at 8:00 PDT"""
+    lead_file = str(tmp_path / 'leads.csv')
+    with open(lead_file, 'w') as f:
+        f.write("name,phone\n")
+        for i in range(10):
+            f.write(f"Lead {i},{'212' if i % 2 else '310'}555{i:04d}\n")
+
+    clock = FakeClock(utc(2026, 3, 9, 11, 0))
+    source = ScheduledLeadSource(lead_file, clock=clock, windows=CallingWindows())
+    steps = []
+    for now in (utc(2026, 3, 9, 11, 0), utc(2026, 3, 9, 12, 0), utc(2026, 3, 9, 15, 0)):
+        clock.now = now
+        rows = []
+        while True:
+            lead = source.next_lead()
+            if lead is None:
+                break
+            source.mark_dialed(lead)
+            rows.append(lead.row)
+        steps.append((rows, source.next_due()))
+    source.close()
+
+    assert steps == [([], utc(2026, 3, 9, 12, 0)),
+                     ([2, 4, 6, 8, 10], utc(2026, 3, 9, 15, 0)),
+                     ([1, 3, 5, 7, 9], None)]
@@ -0,0 +1,40 @@
+# test_config_manager.py
+"""
+ConfigManager write coalescing
+"""
+
+import time
+
+from config_manager import ConfigManager
+
+MAX_WRITES = 3
+
+
+def test_burst_of_save_setting_is_a_bounded_number_of_writes(tmp_path):
+    path = str(tmp_path / 'settings.ini')
+    manager = ConfigManager(path, flush_delay=0.2)
+    baseline = manager.writes
+
+    for i in range(1000):
+        manager.save_setting('BestHourlyRate', 100 + i * 0.1, 'Goals')
+    time.sleep(0.5)  # let the debounced writer run
+    manager.close()
+
+    assert 1 <= manager.writes - baseline <= MAX_WRITES
+    reread = ConfigManager(path).load_config()
+    assert abs(reread['best_hourly_rate'] - (100 + 999 * 0.1)) < 1e-6
+
+
+def test_unchanged_value_is_not_written(tmp_path):
+    manager = ConfigManager(str(tmp_path / 'settings.ini'), flush_delay=0.05)
+    manager.save_setting('DailyGoal', 300, 'Goals')
+    manager.close()
+    assert manager.writes == 1  # only the default config
+
+
+def test_close_flushes_pending_changes(tmp_path):
+    path = str(tmp_path / 'settings.ini')
+    manager = ConfigManager(path, flush_delay=60)
+    manager.save_setting('DialerTitle', 'Zoiper')
+    manager.close()
+    assert ConfigManager(path).load_config()['dialer_title'] == 'Zoiper'
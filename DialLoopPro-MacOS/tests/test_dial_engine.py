@@ -0,0 +1,158 @@
+# test_dial_engine.py
+"""
+DialEngine dial loop state machine, driven through the simulator backend
+"""
+
+import threading
+import time
+
+import pytest
+
+from call_history import CONNECTED, FORCED_NEXT, NO_ANSWER, STOPPED
+from dial_engine import COPYING, DIALING, HANGING_UP, IDLE, ON_CALL, WAITING
+from simulator_backend import create_simulated_engine
+
+# Generous bound on how long a signal takes to move the loop on (seconds)
+REACTION = 0.5
+
+
+class States:
+    """States the engine enters, and the outcomes it records, in order"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.seen = []
+        self.outcomes = []
+        self.changed = threading.Condition()
+        engine.state_listeners.append(self.on_state)
+        record_outcome = engine.lead_source.record_outcome
+
+        def on_outcome(lead, outcome):
+            self.outcomes.append(outcome)
+            record_outcome(lead, outcome)
+        engine.lead_source.record_outcome = on_outcome
+
+    def on_state(self, state):
+        with self.changed:
+            self.seen.append((state, time.monotonic()))
+            self.changed.notify_all()
+
+    def states(self):
+        return [state for state, at in self.seen]
+
+    def wait_for(self, state, count=1, timeout=5):
+        """Wait until state has been entered count times; returns when it last was"""
+        def entered():
+            return [at for seen, at in self.seen if seen == state][count - 1:]
+        with self.changed:
+            assert self.changed.wait_for(entered, timeout), f"never reached {state}"
+            return entered()[-1]
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make(wait_time=600000, shut_down=True):
+        engine, backend = create_simulated_engine(
+            str(tmp_path), time_scale=0.01, wait_time=wait_time,
+            answer_rate=0.0, skip_rate=0.0, seed=1)
+        engine.on_warning = lambda title, text: None
+        if shut_down:
+            engines.append(engine)
+        return engine, States(engine)
+
+    yield make
+    for engine in engines:
+        engine.shutdown()
+
+
+def test_unanswered_dial_times_out_and_hangs_up(make_engine):
+    engine, states = make_engine(wait_time=1000)
+    engine.start()
+    states.wait_for(COPYING, count=3)
+    engine.stop()
+    engine.dial_thread.join(REACTION)
+
+    assert states.states()[:6] == [COPYING, DIALING, WAITING, HANGING_UP, COPYING, DIALING]
+    assert states.outcomes[:2] == [NO_ANSWER, NO_ANSWER]
+    assert engine.state == IDLE
+
+
+def test_answer_goes_on_call_and_ending_it_dials_on(make_engine):
+    engine, states = make_engine()
+    engine.start()
+    states.wait_for(WAITING)
+    engine.toggle_call()
+    states.wait_for(ON_CALL)
+    assert engine.on_call
+
+    engine.toggle_call()
+    states.wait_for(WAITING, count=2)
+    assert states.states()[:6] == [COPYING, DIALING, WAITING, ON_CALL, COPYING, DIALING]
+    assert states.outcomes == [CONNECTED]
+
+
+def test_hangup_next_leaves_wait_at_once(make_engine):
+    engine, states = make_engine()
+    engine.start()
+    states.wait_for(WAITING)
+    pressed = time.monotonic()
+    engine.hangup_next()
+
+    assert states.wait_for(HANGING_UP) - pressed < REACTION
+    states.wait_for(WAITING, count=2)
+    assert states.outcomes == [FORCED_NEXT]
+
+
+def test_stop_during_wait(make_engine):
+    engine, states = make_engine()
+    engine.start()
+    states.wait_for(WAITING)
+    pressed = time.monotonic()
+    assert engine.stop()
+
+    engine.dial_thread.join(REACTION)
+    assert not engine.dial_thread.is_alive()
+    assert time.monotonic() - pressed < REACTION
+    # Stop leaves the line as it is, as the loop always has
+    assert states.states() == [COPYING, DIALING, WAITING, IDLE]
+    assert states.outcomes == [STOPPED]
+
+
+def test_stop_is_refused_on_a_call(make_engine):
+    engine, states = make_engine()
+    engine.start()
+    states.wait_for(WAITING)
+    engine.toggle_call()
+    states.wait_for(ON_CALL)
+
+    assert not engine.stop()
+    assert engine.running and engine.dial_thread.is_alive()
+    engine.toggle_call()
+
+
+def test_shutdown_joins_the_dial_thread(make_engine):
+    engine, states = make_engine(shut_down=False)
+    engine.start()
+    states.wait_for(WAITING)
+
+    engine.shutdown()
+    assert not engine.dial_thread.is_alive()
+    assert engine.state == IDLE
+    assert states.outcomes == [STOPPED]
+    assert engine.stats_manager.load_stats()['total_calls'] == engine.total_calls
+
+
+def test_failed_dial_stops_and_tells_the_user(make_engine):
+    engine, states = make_engine()
+    warnings = []
+    engine.on_warning = lambda title, text: warnings.append(title)
+    engine.backend.dial_number = lambda *args: False
+    engine.backend.paste_and_dial = lambda *args: False
+    engine.start()
+    engine.dial_thread.join(5)
+
+    assert states.states() == [COPYING, DIALING, IDLE]
+    assert not engine.running
+    assert warnings == ["Dial Failed"]
@@ -0,0 +1,25 @@
+# test_dialloop_cli.py
+"""
+Console front end: --simulate leaves the real settings and stats alone
+"""
+
+import argparse
+
+from dialloop_cli import SIMULATE_DIR, build_engine
+
+
+def test_simulate_does_not_touch_real_settings_or_stats(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    real = {
+        'settings.ini': "[Configuration]\nDialerTitle = Real Dialer\nWaitTime = 35000\n",
+        'stats.ini': "[Stats]\ntotal_calls = 1234\n",
+    }
+    for name, text in real.items():
+        (tmp_path / name).write_text(text)
+
+    engine = build_engine(argparse.Namespace(simulate=0.01))
+    engine.shutdown()
+
+    for name, text in real.items():
+        assert (tmp_path / name).read_text() == text
+    assert (tmp_path / SIMULATE_DIR / 'settings.ini').exists()
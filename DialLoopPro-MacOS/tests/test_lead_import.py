@@ -0,0 +1,77 @@
+# test_lead_import.py
+"""
+Lead import: number normalization, file layout detection and dedupe
+across lists
+"""
+
+import numpy as np
+import pytest
+
+from lead_import import (dedupe, detect_layout, import_leads, normalize_number,
+                         parse_chunk, split_chunks)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2125550100', 12125550100),
+    ('(212) 555-0100', 12125550100),
+    ('212.555.0100', 12125550100),
+    ('1-212-555-0100', 12125550100),
+    ('+1 212 555 0100', 12125550100),
+    ('+44 20 7946 0958', 442079460958),
+    ('1125550100', 0),  # area code can't start with 1
+    ('2120550100', 0),  # nor the exchange with 0
+    ('22125550100', 0),  # 11 digits without the country code
+    ('555-0100', 0),
+    ('+1234567', 0),  # too short for an international number
+    ('phone', 0),
+    ('', 0),
+])
+def test_normalize_number(text, expected):
+    assert normalize_number(text) == expected
+
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return str(path)
+
+
+def test_detect_layout(tmp_path):
+    csv_file = write(tmp_path / 'a.csv', "name,city,phone\nAnn,Boston,617-555-0100\n")
+    tsv_file = write(tmp_path / 'b.txt', "phone\tname\n(212) 555-0100\tBob\n")
+    by_name = write(tmp_path / 'c.tsv', "name\n")
+    assert detect_layout(csv_file) == (b',', 2)
+    assert detect_layout(tsv_file) == (b'\t', 0)
+    assert detect_layout(by_name) == (b'\t', 0)
+
+
+def test_chunks_split_on_line_boundaries(tmp_path):
+    path = write(tmp_path / 'leads.csv', "name,phone\n" + "".join(
+        f"Lead {i},212555{i:04d}\n" for i in range(1, 201)))
+    chunks = split_chunks(path, chunk_bytes=100)
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+    values = np.concatenate([parse_chunk(path, start, end, b',', 1)[1]
+                             for start, end in chunks])
+    assert values.tolist() == [0] + [12125550000 + i for i in range(1, 201)]
+
+
+def test_dedupe_keeps_first_occurrence_in_order():
+    values = np.array([5, 0, 3, 5, 7, 3, 0, 1], dtype=np.int64)
+    assert dedupe(values).tolist() == [5, 3, 7, 1]
+
+
+def test_duplicates_across_lists_are_written_once(tmp_path):
+    first = write(tmp_path / 'first.csv',
+                  "name,phone\nAnn,212-555-0100\nBob,212-555-0101\nBob again,2125550101\n")
+    second = write(tmp_path / 'second.tsv',
+                   "phone\tname\n+1 (212) 555-0100\tAnn\n310 555 0199\tCy\nnot a number\tDee\n")
+    output = str(tmp_path / 'clean.csv')
+
+    report = import_leads([first, second], output, workers=2)
+
+    with open(output) as f:
+        assert f.read() == "phone\n+12125550100\n+12125550101\n+13105550199\n"
+    assert (report.rows, report.valid, report.duplicates, report.written) == (8, 5, 2, 3)
+    assert report.invalid == 3  # two headers and "not a number"
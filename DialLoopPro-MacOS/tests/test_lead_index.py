@@ -0,0 +1,57 @@
+# test_lead_index.py
+"""
+LeadIndex offsets, appends and replaced lead files
+"""
+
+import os
+
+from lead_index import LeadIndex
+from lead_source import ScheduledLeadSource
+from redial import RedialPolicy
+
+
+def write(path, text, mode='w'):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_rows_appended_extend_the_index(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write(path, "name,phone\nAnn,2125550001\n")
+    LeadIndex(path).close()
+    write(path, "Bob,2125550002\n", 'a')
+
+    index = LeadIndex(path)
+    assert not index.replaced
+    assert len(index) == 3
+    assert index.read_row(2) == b"Bob,2125550002"
+
+
+def test_same_size_replacement_is_reindexed(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write(path, "name,phone\nAnn,2125550001\nBob,2125550002\n")
+    LeadIndex(path).close()
+    write(path, "name,phone\nCarla,2125550003\nDi,2125550004\n")  # same size
+
+    index = LeadIndex(path)
+    assert index.replaced
+    assert [index.read_row(row) for row in (1, 2)] == [b"Carla,2125550003",
+                                                       b"Di,2125550004"]
+
+
+def test_replaced_lead_file_sets_progress_aside(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write(path, "name,phone\n" + ''.join(f"A{i},21255500{i:02d}\n" for i in range(10)))
+    source = ScheduledLeadSource(path, redial=RedialPolicy())
+    for _ in range(5):
+        lead = source.next_lead()
+        source.mark_dialed(lead)
+        source.record_outcome(lead, 'no_answer')
+    source.close()
+
+    write(path, "name,phone\n" + ''.join(f"B{i},21255500{i:02d}\n" for i in range(10)))
+    source = ScheduledLeadSource(path, redial=RedialPolicy())
+    assert source.cursor == 0
+    assert source.redials.pending_rows() == []
+    assert os.path.exists(path + '.cursor.old') and os.path.exists(path + '.redial.old')
+    assert source.next_lead().row == 1
@@ -0,0 +1,172 @@
+# test_lead_scheduler.py
+"""
+LeadScheduler: pop order, batch merges, promotion of due rows, re-keying
+"""
+
+import random
+
+import pytest
+
+import lead_scheduler
+from lead_scheduler import PROMOTE_BATCH, LeadScheduler
+from lead_source import ScheduledLeadSource
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def ready_key(scheduler, row):
+    """The ready heap's ordering, as a sort key"""
+    due = scheduler.due[row]
+    return (-scheduler.score[row], not due, due, scheduler.attempts[row], row)
+
+
+def check_heaps(scheduler):
+    """Both heaps are heaps and every row knows where it is"""
+    for heap, before, position in (
+            (scheduler.ready, scheduler._ready_before, lambda i: i),
+            (scheduler.waiting, scheduler._waiting_before, lambda i: -i - 2)):
+        for i, row in enumerate(heap):
+            assert scheduler.pos[row] == position(i)
+            if i:
+                assert not before(row, heap[(i - 1) >> 1])
+
+
+def pop_all(scheduler):
+    rows = []
+    while True:
+        row = scheduler.pop()
+        if row is None:
+            return rows
+        rows.append(row)
+
+
+def test_ready_before():
+    clock = FakeClock()
+    scheduler = LeadScheduler(clock)
+    clock.now += 100  # due times before the epoch would all be stored as 1
+    scheduler.push(0)
+    scheduler.push(1, due=clock.now - 10)
+    scheduler.push(2, due=clock.now - 20)
+    scheduler.push(3, due=clock.now - 20, attempts=2)
+    scheduler.push(4, score=1.0)
+    before = scheduler._ready_before
+
+    assert before(4, 2)  # score first
+    assert before(1, 0) and not before(0, 1)  # waited for a due time, ahead of fresh
+    assert before(2, 1)  # earlier due first
+    assert before(2, 3)  # then fewer attempts
+    scheduler.push(5)
+    assert before(0, 5)  # then file order
+    assert pop_all(scheduler) == [4, 2, 3, 1, 0, 5]
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_pop_order_matches_sorting_the_keys(seed):
+    rng = random.Random(seed)
+    clock = FakeClock()
+    scheduler = LeadScheduler(clock)
+    leads = 5000
+    scheduler.extend(0, leads)
+    queued = set(range(leads))
+    for _ in range(leads):
+        row = rng.randrange(leads)
+        roll = rng.random()
+        if roll < 0.1:
+            scheduler.remove(row)
+            queued.discard(row)
+            continue
+        due = clock.now + rng.randrange(-50, 100) if roll < 0.4 else 0
+        scheduler.push(row, float(rng.randrange(10)), due, rng.randrange(3))
+        queued.add(row)
+    check_heaps(scheduler)
+
+    clock.now += 60  # rows due within a minute become ready
+    ready = sorted((row for row in queued if scheduler.due_time(row) <= clock.now),
+                   key=lambda row: ready_key(scheduler, row))
+    assert pop_all(scheduler) == ready
+    assert len(scheduler) == len(queued) - len(ready)
+
+
+@pytest.mark.parametrize('batch', [10, 3000])  # sifted in, merged by sorting
+def test_push_many(batch):
+    rng = random.Random(batch)
+    clock = FakeClock()
+    scheduler = LeadScheduler(clock)
+    scheduler.extend(0, 2000)
+    for row in rng.sample(range(2000), 200):
+        scheduler.update(row, score=float(rng.randrange(3)))
+
+    rows = rng.sample(range(1000, 1000 + 2 * batch), batch)  # some already queued
+    due = [clock.now + rng.randrange(-100, 100) if rng.random() < 0.8 else 0
+           for _ in rows]
+    attempts = [rng.randrange(300) for _ in rows]
+    scheduler.push_many(rows, due, attempts)
+    check_heaps(scheduler)
+
+    queued = set(range(2000)) | set(rows)
+    assert len(scheduler) == len(queued)
+    assert all(scheduler.attempts[row] == min(count, 255)
+               for row, count in zip(rows, attempts))
+    clock.now += 100
+    assert pop_all(scheduler) == sorted(queued, key=lambda row: ready_key(scheduler, row))
+
+
+def test_rows_coming_due_together_are_promoted_in_batches():
+    clock = FakeClock()
+    scheduler = LeadScheduler(clock)
+    count = 2 * PROMOTE_BATCH + 5
+    scheduler.push_many(list(range(count)), [clock.now + 60] * count, [1] * count)
+    assert scheduler.pop() is None
+    assert len(scheduler.waiting) == count
+
+    clock.now += 60
+    assert scheduler.pop() == 0
+    assert len(scheduler.waiting) == count - PROMOTE_BATCH
+    assert len(scheduler.ready) == PROMOTE_BATCH - 1
+    check_heaps(scheduler)
+    assert pop_all(scheduler) == list(range(1, count))
+
+
+def test_promote_batch_bounds_the_work_per_pop(monkeypatch):
+    monkeypatch.setattr(lead_scheduler, 'PROMOTE_BATCH', 3)
+    clock = FakeClock()
+    scheduler = LeadScheduler(clock)
+    scheduler.push_many([5, 6, 7, 8], [clock.now + 10] * 4, [0] * 4)
+    scheduler.extend(0, 2)
+
+    clock.now += 10
+    assert scheduler.pop() == 5  # a due row goes ahead of the fresh ones
+    assert list(scheduler.waiting) == [8]
+    assert pop_all(scheduler) == [6, 7, 8, 0, 1]
+
+
+def test_prioritize_rekeys_in_place(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        f.writelines(f"Lead {i},212555{i:04d}\n" for i in range(1, 101))
+    clock = FakeClock()
+    source = ScheduledLeadSource(path, clock=clock)
+    queued = len(source.scheduler)
+
+    source.prioritize(40, score=2.0)
+    source.prioritize(70, score=1.0)
+    source.prioritize(3, due=clock.now + 3600)  # held back an hour
+    assert len(source.scheduler) == queued  # re-keyed, not pushed again
+    check_heaps(source.scheduler)
+    assert [source.next_lead().row for _ in range(3)] == [40, 70, 1]
+
+    lead = source.next_lead()  # handed out: only its score changes
+    source.prioritize(lead.row, score=5.0, due=clock.now + 3600)
+    assert lead.row not in source.scheduler
+    assert source.priority(lead) == 5.0
+
+    clock.now += 3600
+    assert source.next_lead().row == 3
+    source.close()
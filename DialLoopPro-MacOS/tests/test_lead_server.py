@@ -0,0 +1,83 @@
+# test_lead_server.py
+"""
+Lead server: leads are claimed when dialed, outcomes only from their dialer
+"""
+
+import pytest
+
+import lead_server
+from call_history import NO_ANSWER
+from lead_server import LeaseQueue, LocalLeadClient, RemoteLeadSource
+from lead_source import ScheduledLeadSource
+
+
+@pytest.fixture
+def queue(tmp_path):
+    lead_file = str(tmp_path / 'leads.csv')
+    with open(lead_file, 'w') as f:
+        f.write("name,phone\n")
+        f.writelines(f"Lead {i},212{i:07d}\n" for i in range(1, 21))
+    queue = LeaseQueue(ScheduledLeadSource(lead_file), lease_seconds=60)
+    yield queue
+    queue.close()
+
+
+def test_lead_not_dialed_is_not_claimed_and_comes_back(queue):
+    source = RemoteLeadSource(LocalLeadClient(queue), 'a', batch=5)
+    lead = source.next_lead()
+    assert queue.stats()['claimed'] == 0
+
+    source.close()  # stopped before dialing it
+    other = RemoteLeadSource(LocalLeadClient(queue), 'b', batch=5)
+    assert other.next_lead().row == lead.row
+
+
+def test_mark_dialed_claims(queue):
+    source = RemoteLeadSource(LocalLeadClient(queue), 'a', batch=5)
+    lead = source.next_lead()
+    source.mark_dialed(lead)
+    assert queue.stats()['claimed'] == 1
+    assert queue.dialed == {lead.row: 'a'}
+
+
+def test_outcome_only_from_the_client_that_dialed(queue):
+    recorded = []
+    queue.source.record_outcome = lambda lead, outcome: recorded.append(lead.row)
+    a = RemoteLeadSource(LocalLeadClient(queue), 'a', batch=5)
+    b = RemoteLeadSource(LocalLeadClient(queue), 'b', batch=5)
+    lead = a.next_lead()
+    a.record_outcome(lead, NO_ANSWER)  # not dialed yet
+    a.mark_dialed(lead)
+    b.record_outcome(lead, NO_ANSWER)
+    assert recorded == []
+
+    a.record_outcome(lead, NO_ANSWER)
+    a.record_outcome(lead, NO_ANSWER)  # once per claim
+    assert recorded == [lead.row]
+
+
+def test_claims_and_releases_only_from_the_lease_holder(queue):
+    client = LocalLeadClient(queue)
+    response = client.request('lease', client='a', count=2)
+    (row, _), (other, _) = response['leads']
+
+    assert not client.request('claim', client='b', lease=response['lease'], row=row)['ok']
+    client.request('release', client='b', lease=response['lease'], rows=[other])
+    assert queue.stats()['outstanding'] == 2
+    assert client.request('claim', client='a', lease=response['lease'], row=row)['ok']
+
+
+def test_lapsing_lease_is_given_back_not_handed_out(queue, monkeypatch):
+    source = RemoteLeadSource(LocalLeadClient(queue), 'a', batch=5)
+    first = source.next_lead()
+    source.mark_dialed(first)
+
+    # Later, with under LEASE_MARGIN of the buffered leases left
+    now = lead_server.time.monotonic() + 60 * (1 - lead_server.LEASE_MARGIN / 2)
+    monkeypatch.setattr(lead_server.time, 'monotonic', lambda: now)
+    lead = source.next_lead()
+
+    assert lead.row == first.row + 5  # the old batch went back, a new one came
+    assert queue.stats()['outstanding'] == 5
+    assert queue.stats()['remaining'] == 20 - 1 - 5
+    source.close()
@@ -0,0 +1,134 @@
+# test_lead_source.py
+"""
+Lead file sources: resume cursor persistence, jumping and hot leads
+"""
+
+from call_history import NO_ANSWER
+from callbacks import CallbackQueue
+from lead_source import (CallbackLeadSource, FileLeadSource, OrderedLeadSource,
+                         ScheduledLeadSource)
+from redial import RedialPolicy
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def write_leads(path, count):
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        f.writelines(f"Lead {i},212555{i:04d}\n" for i in range(1, count + 1))
+
+
+def dial(source, count):
+    for _ in range(count):
+        lead = source.next_lead()
+        source.mark_dialed(lead)
+    return lead
+
+
+def test_burst_of_dials_is_one_cursor_write(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 1000)
+    source = ScheduledLeadSource(path)
+    source.save_delay = 60
+    dial(source, 1000)
+    assert source.cursor_writes == 0
+    source.close()
+    assert source.cursor_writes == 1
+    assert ScheduledLeadSource(path).cursor == 1001
+
+
+def test_debounced_save_lands_without_close(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 10)
+    source = FileLeadSource(path)
+    source.save_delay = 0.01
+    dial(source, 3)
+    source._save_timer.join()
+    assert source.cursor_writes == 1
+    assert FileLeadSource(path).cursor == 4
+
+
+def test_rows_dialed_ahead_survive_resume(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 10)
+    source = ScheduledLeadSource(path)
+    first, second = source.next_lead(), source.next_lead()
+    source.mark_dialed(second)
+    source.close()  # first was handed out but never dialed
+
+    resumed = ScheduledLeadSource(path)
+    rows = [resumed.next_lead().row for _ in range(3)]
+    assert rows == [first.row, second.row + 1, second.row + 2]
+
+
+def test_jump_to_keeps_the_redial_store_open(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 100)
+    clock = FakeClock(1_800_000_000.0)
+    source = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    first = dial(source, 1)
+    source.record_outcome(first, NO_ANSWER)
+
+    assert source.jump_to(50)
+    lead = dial(source, 1)
+    assert lead.row == 50
+    source.record_outcome(lead, NO_ANSWER)  # store still writable
+    clock.now += 5 * 3600
+    assert [dial(source, 1).row for _ in range(3)] == [first.row, lead.row, 51]
+    source.close()
+    assert ScheduledLeadSource(path, clock=clock).cursor == 52
+
+
+def test_hot_lead_and_jump_through_the_production_stack(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 1000)
+    clock = FakeClock(1_800_000_000.0)
+    source = CallbackLeadSource(
+        OrderedLeadSource(ScheduledLeadSource(path, clock=clock), lambda number, now: 0.0,
+                          clock),
+        CallbackQueue(str(tmp_path / 'callbacks.log'), clock))
+    assert dial(source, 1).row == 1  # rows 2..101 now buffered
+
+    assert source.prioritize(500, 1.0, clock.now)  # queued in the scheduler
+    assert source.prioritize(50, 1.0)  # buffered
+    assert [dial(source, 1).row for _ in range(3)] == [500, 50, 2]
+
+    assert source.jump_to(900)
+    assert [dial(source, 1).row for _ in range(2)] == [900, 901]
+    source.close()
+
+
+def test_wrappers_forward_priority_came_due_and_release(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 100)
+    clock = FakeClock(1_800_000_000.0)
+    scheduled = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    queue = CallbackQueue(str(tmp_path / 'callbacks.log'), clock)
+    source = CallbackLeadSource(
+        OrderedLeadSource(scheduled, lambda number, now: 0.0, clock), queue)
+    redial = dial(source, 1)
+    source.record_outcome(redial, NO_ANSWER)
+    source.prioritize(60, 2.0)
+    clock.now += 5 * 3600
+
+    hot = source.next_lead()
+    assert (hot.row, source.priority(hot), source.came_due(hot)) == (60, 2.0, False)
+    lead = source.next_lead()
+    assert (lead.row, source.priority(lead), source.came_due(lead)) == (redial.row, 0.0, True)
+
+    source.release(lead)  # not dialed: handed out again next
+    assert source.next_lead().row == redial.row
+
+    queue.schedule(clock.now, '3105550001')
+    callback = source.next_lead()
+    assert source.came_due(callback) and source.priority(callback) == 0.0
+    source.release(callback)
+    assert source.next_lead().callback == callback.callback
+    source.close()
+    queue.close()
@@ -0,0 +1,84 @@
+# test_parallel_dialer.py
+"""
+Parallel dialing: what happens to the other lines when one answers
+"""
+
+import pytest
+
+from call_history import ABANDONED, DROPPED, NO_ANSWER
+from parallel_dialer import AGENT, FREE, HELD, RINGING, ParallelDialer
+from redial import RedialPolicy
+from simulator_backend import create_simulated_engine
+
+
+@pytest.fixture
+def dialer(tmp_path):
+    engine, backend = create_simulated_engine(
+        str(tmp_path), time_scale=0.001, lines=3, answer_rate=0.0, skip_rate=0.0,
+        talk_time=(1e6, 0.0), latency={step: (0.0, 0.0) for step in
+                                       ('activate', 'copy', 'dial', 'hangup')})
+    dialer = ParallelDialer(engine, 3, hold_seconds=2.0)
+    dialer.outcomes = {}  # line -> recorded outcome
+
+    def record_attempt(attempt, outcome=None, talk_ms=0):
+        dialer.outcomes[attempt['line']] = outcome
+    engine.record_attempt = record_attempt
+    for line in dialer.lines:
+        line.state = RINGING
+        line.attempt = {'line': line.index, 'dialed_at': 0.0, 'phases': {}}
+        line.deadline = dialer.now() + 60
+    yield dialer
+    engine.shutdown()
+
+
+def test_other_ringing_lines_are_dropped_not_stopped(dialer):
+    dialer.line_answered(0)
+    dialer.handle_answers()
+
+    assert [line.state for line in dialer.lines] == [AGENT, FREE, FREE]
+    assert dialer.outcomes == {1: DROPPED, 2: DROPPED}
+    assert dialer.engine.abandoned_calls == 0
+
+
+def test_answer_with_the_routed_one_is_held_then_abandoned(dialer):
+    dialer.line_answered(0)
+    dialer.line_answered(1)
+    dialer.handle_answers()
+
+    assert [line.state for line in dialer.lines] == [AGENT, HELD, FREE]
+    assert dialer.outcomes == {2: DROPPED}
+
+    dialer.lines[1].deadline = dialer.now()
+    dialer.expire()
+    assert dialer.outcomes[1] == ABANDONED
+    assert dialer.engine.abandoned_calls == 1
+
+
+def test_answer_while_being_hung_up_is_abandoned(dialer):
+    dialer.line_answered(2)  # not handled yet when the line is cleared
+    dialer.clear(RINGING, DROPPED)
+
+    assert dialer.outcomes == {0: DROPPED, 1: DROPPED, 2: ABANDONED}
+    assert dialer.engine.abandoned_calls == 1
+
+
+def test_dropped_lines_redial_like_no_answers(dialer):
+    rules = dialer.engine.config_manager.config['Configuration']['RedialRules']
+    policy = RedialPolicy.from_settings('4h, 1d', 4, rules)
+
+    assert policy.next_due(DROPPED, 1, 1000.0) == policy.next_due(NO_ANSWER, 1, 1000.0)
+    assert policy.next_due(DROPPED, 1, 1000.0) > 1000.0
+
+
+def test_failed_dial_stops_and_tells_the_user(dialer):
+    engine = dialer.engine
+    told = []
+    engine.on_status = lambda text: told.append(text)
+    engine.on_warning = lambda title, text: told.append(title)
+    engine.running = True
+    dialer.lines[2].state = FREE
+    dialer.backend.dial_line = lambda line, digits: False
+
+    assert not dialer.dial_next()
+    assert not engine.running
+    assert told[-2:] == ["DIAL FAILED", "Dial Failed"]
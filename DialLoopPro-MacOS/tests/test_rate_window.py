@@ -0,0 +1,60 @@
+# test_rate_window.py
+"""
+RateWindow counts against a brute-force count over every call
+"""
+
+import random
+
+import pytest
+
+from rate_window import RateWindow
+
+WINDOWS = (300, 900, 3600)
+
+
+def brute_count(events, window, now):
+    """Calls whose second lies in the window seconds ending at floor(now)"""
+    second = int(now)
+    return sum(1 for t in events if second - window < int(t) <= second)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_counts_match_brute_force(seed):
+    rng = random.Random(seed)
+    rates = RateWindow(WINDOWS)
+    events = []
+    t = now = 1_700_000_000.0
+    for _ in range(800):
+        roll = rng.random()
+        if roll < 0.02:
+            t += rng.uniform(3600, 3 * 3600)  # idle longer than every window
+        elif roll < 0.05:
+            t += rng.uniform(300, 1200)  # longer than the short windows
+        else:
+            t += rng.expovariate(1 / 20)
+        # Now and then a call is logged a little late
+        stamp = t - rng.uniform(0, 120) if rng.random() < 0.1 else t
+        rates.add(stamp)
+        events.append(stamp)
+
+        now = max(now, t + rng.uniform(0, 30))  # the clock never goes back
+        for window in WINDOWS:
+            assert rates.count(window, now) == brute_count(events, window, now)
+
+
+def test_gap_longer_than_the_ring_clears_every_window():
+    rates = RateWindow(WINDOWS)
+    for second in range(100):
+        rates.add(1000 + second)
+    assert rates.count(3600, 1099) == 100
+    assert [rates.count(window, 1099 + 3600) for window in WINDOWS] == [0, 0, 0]
+
+    rates.add(1099 + 3600 + 5)
+    assert [rates.count(window, 1099 + 3610) for window in WINDOWS] == [1, 1, 1]
+
+
+def test_call_older_than_every_window_is_ignored():
+    rates = RateWindow(WINDOWS)
+    rates.add(10_000)
+    rates.add(10_000 - 3600)
+    assert rates.count(3600, 10_000) == 1
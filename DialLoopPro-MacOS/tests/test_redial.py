@@ -0,0 +1,106 @@
+# test_redial.py
+"""
+Redials: due no-answer leads are dialed ahead of fresh leads
+"""
+
+from call_history import NO_ANSWER
+from lead_source import OrderedLeadSource, ScheduledLeadSource
+from redial import RedialPolicy
+
+HOUR = 3600
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def write_leads(path, count):
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        f.writelines(f"Lead {i},212{i:07d}\n" for i in range(1, count + 1))
+
+
+def dial_no_answer(source):
+    lead = source.next_lead()
+    source.mark_dialed(lead)
+    source.record_outcome(lead, NO_ANSWER)
+    return lead
+
+
+def next_rows(source, count):
+    rows = []
+    for _ in range(count):
+        lead = source.next_lead()
+        source.mark_dialed(lead)
+        rows.append(lead.row)
+    return rows
+
+
+def test_due_redial_goes_before_fresh_leads(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 10000)
+    clock = FakeClock(1_800_000_000.0)
+    source = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    first = dial_no_answer(source)
+
+    clock.now += HOUR  # not due yet (4 h spacing)
+    assert next_rows(source, 3) == [2, 3, 4]
+    clock.now += 4 * HOUR
+    assert next_rows(source, 3) == [first.row, 5, 6]
+
+
+def test_redials_come_due_in_due_order(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 100)
+    clock = FakeClock(1_800_000_000.0)
+    source = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    dial_no_answer(source)
+    clock.now += 60
+    dial_no_answer(source)
+
+    clock.now += 5 * HOUR
+    assert next_rows(source, 3) == [1, 2, 3]
+
+
+def test_overdue_redial_goes_first_after_a_restart(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 1000)
+    clock = FakeClock(1_800_000_000.0)
+    source = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    first = dial_no_answer(source)
+    source.close()
+
+    clock.now += 2 * 86400
+    source = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    assert next_rows(source, 2) == [first.row, 2]
+
+
+def test_ordering_by_answer_odds_keeps_redials_first(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 1000)
+    clock = FakeClock(1_800_000_000.0)
+    scheduled = ScheduledLeadSource(path, clock=clock, redial=RedialPolicy())
+    first = dial_no_answer(scheduled)
+
+    # The redial's number scores worst of all
+    source = OrderedLeadSource(scheduled, lambda number, now: -int(number == first.number),
+                               clock)
+    assert source.next_lead().row != first.row
+    clock.now += 5 * HOUR
+    assert source.next_lead().row == first.row
+
+
+def test_unreadable_store_is_moved_aside(tmp_path):
+    path = str(tmp_path / 'leads.csv')
+    write_leads(path, 10)
+    with open(path + '.redial', 'wb') as f:
+        f.write(b'not a redial store')
+
+    source = ScheduledLeadSource(path, redial=RedialPolicy())
+    assert source.redials.pending_rows() == []
+    with open(path + '.redial.bad', 'rb') as f:
+        assert f.read() == b'not a redial store'
@@ -0,0 +1,54 @@
+# test_spans.py
+"""
+Timing spans: ring buffer wraparound and JSONL export
+"""
+
+import json
+
+from spans import SpanExporter, SpanRing
+
+
+def test_ring_keeps_the_newest_spans_and_counts_the_rest_lost():
+    ring = SpanRing(capacity=8)
+    for i in range(20):
+        ring.record('dial', 1000.0 + i, 0.5, i)
+
+    spans, lost = ring.read_since(0)
+    assert [span[0] for span in spans] == list(range(12, 20))
+    assert lost == 12
+    assert ring.read_since(15) == (spans[3:], 0)
+    assert ring.read_since(ring.next_seq) == ([], 0)
+
+
+def test_slot_overwritten_mid_read_is_lost_not_returned():
+    ring = SpanRing(capacity=8)
+    for i in range(5):
+        ring.record('copy', 1000.0 + i, 0.1)
+    ring._slots[2] = (10, 'copy', 1010.0, 0.1, None)  # a writer already lapped it
+
+    spans, lost = ring.read_since(0)
+    assert [span[0] for span in spans] == [0, 1, 3, 4]
+    assert lost == 1
+
+
+def test_exporter_writes_new_spans_once(tmp_path):
+    ring = SpanRing(capacity=8)
+    ring.record('before', 999.0, 0.1)  # recorded before the exporter started
+    path = str(tmp_path / 'spans.jsonl')
+    exporter = SpanExporter(ring, path, interval=60)
+
+    ring.record('dial', 1000.1234567, 0.0123456, 7)
+    ring.record('wait', 1001.0, 2.0)
+    assert exporter.export() == 2
+    assert exporter.export() == 0
+
+    for i in range(10):  # more than the ring holds between exports
+        ring.record('copy', 1002.0 + i, 0.1)
+    exporter.close()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == {'seq': 1, 'span': 'dial', 'start': 1000.123457, 'ms': 12.346,
+                        'call': 7}
+    assert [line['seq'] for line in lines] == [1, 2] + list(range(5, 13))
+    assert (exporter.exported, exporter.dropped) == (10, 2)
@@ -0,0 +1,86 @@
+# test_stats_journal.py
+"""
+Stats journal: group commit, replay after a crash, and compaction cut
+short between the snapshot and the journal truncate
+"""
+
+import pytest
+
+from stats_journal import StatsJournal
+from stats_manager import StatsManager
+
+
+def crash(stats):
+    """Stop a StatsManager's writer thread without the compaction close() does"""
+    journal = stats.journal
+    journal._closed = True
+    journal._wakeup.set()
+    journal._thread.join()
+    journal._file.close()
+
+
+def test_updates_are_written_in_groups(tmp_path):
+    journal = StatsJournal(str(tmp_path / 'stats.journal'), flush_interval=60,
+                           flush_every=10000)
+    for i in range(1000):
+        journal.append('Daily', 'Calls', str(i))
+    assert journal.writes == 0
+
+    journal.flush()
+    assert journal.writes == 1  # one write and fsync for the lot
+    assert list(journal.replay())[-1] == ('Daily', 'Calls', '999')
+    assert len(list(journal.replay())) == 1000
+    journal.close()
+
+
+def test_replay_skips_a_torn_last_line(tmp_path):
+    path = tmp_path / 'stats.journal'
+    path.write_text("Daily\tCalls\t1\nDaily\tCalls\t2\nDaily\tCal")
+    journal = StatsJournal(str(path), flush_interval=60)
+    assert list(journal.replay()) == [('Daily', 'Calls', '1'), ('Daily', 'Calls', '2')]
+    journal.close()
+
+
+def test_journaled_updates_survive_a_crash(tmp_path):
+    path = str(tmp_path / 'stats.ini')
+    stats = StatsManager(path)
+    stats.save_stats({'total_calls': 41, 'weekly_calls': 7})
+    stats.save_daily_count(12)
+    stats.journal.flush()
+    crash(stats)
+
+    loaded = StatsManager(path).load_stats()
+    assert (loaded['total_calls'], loaded['weekly_calls'], loaded['session_calls']) == (41, 7, 12)
+
+
+def test_crash_between_snapshot_and_truncate_keeps_the_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / 'stats.ini')
+    stats = StatsManager(path)
+    stats.save_daily_count(5)
+    stats.journal.flush()
+    stats.stats['Daily']['Calls'] = '6'  # only in the snapshot about to be written
+
+    def truncate_never_happens(generation):
+        raise RuntimeError("crashed")
+    monkeypatch.setattr(stats.journal, '_reset_locked', truncate_never_happens)
+    with pytest.raises(RuntimeError):
+        stats.save_stats_file()
+    monkeypatch.undo()
+    crash(stats)
+
+    reopened = StatsManager(path)
+    assert reopened.load_stats()['session_calls'] == 6
+    assert reopened.journal.generation == reopened.stats.getint('Journal', 'Generation')
+
+    # Later updates journal and replay as usual
+    reopened.save_daily_count(7)
+    reopened.journal.flush()
+    crash(reopened)
+    assert StatsManager(path).load_stats()['session_calls'] == 7
+
+
+def test_stats_from_before_generations_replay(tmp_path):
+    path = tmp_path / 'stats.ini'
+    path.write_text("[Lifetime]\ntotalcalls = 3\n")
+    (tmp_path / 'stats.ini.journal').write_text("Lifetime\tTotalCalls\t4\n")
+    assert StatsManager(str(path)).load_stats()['total_calls'] == 4
@@ -0,0 +1,81 @@
+# test_suppression.py
+"""
+Do-not-call index: build, merge, rebuild and lookup
+"""
+
+import os
+
+from suppression import (SuppressionIndex, added_path, bloom_path, index_path, merge,
+                         open_suppression, rebuild)
+
+LISTED = '212-555-0100'
+MERGED = '(310) 555-0111'
+
+
+def write_list(path, numbers):
+    with open(path, 'w') as f:
+        f.write("name,phone\n")
+        f.writelines(f"Entry {i},{number}\n" for i, number in enumerate(numbers))
+
+
+def suppressed(dnc_file, number, bloom=False):
+    index = SuppressionIndex(index_path(dnc_file), bloom_path(dnc_file) if bloom else None)
+    try:
+        return index.is_suppressed(number)
+    finally:
+        index.close()
+
+
+def test_build_and_lookup(tmp_path):
+    dnc = str(tmp_path / 'dnc.txt')
+    write_list(dnc, [LISTED, '+1 646 555 0199', '646.555.0199'])
+
+    assert rebuild(dnc, bloom=True) == 2
+    assert suppressed(dnc, '12125550100', bloom=True)
+    assert suppressed(dnc, '646-555-0199', bloom=True)
+    assert not suppressed(dnc, MERGED, bloom=True)
+
+
+def test_merged_numbers_survive_a_rebuild(tmp_path):
+    dnc = str(tmp_path / 'dnc.txt')
+    new = str(tmp_path / 'new.txt')
+    write_list(dnc, [LISTED])
+    write_list(new, [MERGED, LISTED])
+    rebuild(dnc)
+
+    assert merge(dnc, new) == 1
+    assert suppressed(dnc, MERGED)
+
+    # The DNC file changes: the index is stale and gets rebuilt
+    write_list(dnc, [LISTED, '718-555-0122'])
+    os.utime(index_path(dnc), (0, 0))
+    index = open_suppression(dnc)
+    index.close()
+    rebuild(dnc)
+
+    assert suppressed(dnc, MERGED)
+    assert suppressed(dnc, '718-555-0122')
+
+
+def test_merge_without_an_index_includes_the_dnc_file(tmp_path):
+    dnc = str(tmp_path / 'dnc.txt')
+    new = str(tmp_path / 'new.txt')
+    write_list(dnc, [LISTED])
+    write_list(new, [MERGED])
+
+    assert merge(dnc, new) == 1
+    assert suppressed(dnc, LISTED)
+    assert suppressed(dnc, MERGED)
+
+
+def test_merge_records_only_new_numbers(tmp_path):
+    dnc = str(tmp_path / 'dnc.txt')
+    new = str(tmp_path / 'new.txt')
+    write_list(dnc, [LISTED])
+    write_list(new, [MERGED, LISTED])
+    rebuild(dnc)
+
+    merge(dnc, new)
+    assert merge(dnc, new) == 0
+    with open(added_path(dnc)) as f:
+        assert f.read() == "+13105550111\n"
@@ -0,0 +1,81 @@
+# test_view_model.py
+"""
+Display model: only changed fields are pushed, status kinds map to styles
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from view_model import (STATUS_STYLES, DisplayModel, StatusKind, format_time,
+                        status_kind, wait_kind)
+
+
+@pytest.fixture
+def display():
+    pushed = []
+    display = DisplayModel(pushed.append)
+    display.pushed = pushed
+    return display
+
+
+def test_update_pushes_only_changed_fields(display):
+    assert display.update({'status': 'DIALING...', 'daily': 'Today: 1/100'}) == {
+        'status': 'DIALING...', 'daily': 'Today: 1/100'}
+    assert display.update({'status': 'DIALING...', 'daily': 'Today: 2/100'}) == {
+        'daily': 'Today: 2/100'}
+    assert display.update({'status': 'DIALING...', 'daily': 'Today: 2/100'}) == {}
+    assert display.pushed == [{'status': 'DIALING...', 'daily': 'Today: 1/100'},
+                              {'daily': 'Today: 2/100'}]
+    assert display.pushes == 2
+
+
+def test_refresh_with_nothing_new_pushes_nothing(display):
+    engine = SimpleNamespace(
+        progress=lambda: (12, 3), total_talk_time=125000, connected_calls=4,
+        session_display_calls=12, daily_goal=100, weekly_calls=30, weekly_goal=1000,
+        current_hour_rate=40, best_hourly_rate=55)
+    first = display.refresh(engine)
+    assert first['talk_time'] == "Talk Time: 2m 5s"
+    assert first['daily_progress'] == 12
+    assert display.refresh(engine) == {}
+
+    engine.connected_calls = 5
+    assert display.refresh(engine) == {'connected': "Connected: 5"}
+
+
+def test_every_status_kind_has_a_style():
+    assert set(STATUS_STYLES) == set(StatusKind)
+    assert len(set(STATUS_STYLES.values())) == len(StatusKind)
+
+
+@pytest.mark.parametrize('text, kind', [
+    ("WAITING FOR CALL...", StatusKind.WAIT),
+    ("WAIT 12s", StatusKind.WAIT),
+    ("LIVE CALL", StatusKind.LIVE),
+    ("ON CALL - WAITING...", StatusKind.WAIT),
+    ("MANUAL CALL DIALED", StatusKind.CALL),
+    ("DIALING...", StatusKind.INFO),
+    ("DIAL FAILED", StatusKind.INFO),
+])
+def test_status_kind(text, kind):
+    assert status_kind(text) == kind
+
+
+def test_style_changes_only_when_the_kind_does(display):
+    display.start_countdown('wait', 100.0)
+    display.tick(now=85.0)
+    display.pushed.clear()
+
+    display.tick(now=86.0)  # 14 s, still the plain wait band
+    assert display.pushed == [{'status': "WAIT 14s"}]
+    display.tick(now=91.0)
+    assert display.pushed[-1] == {'status': "WAIT 09s", 'status_kind': StatusKind.WAIT_SOON}
+    assert wait_kind(5) == StatusKind.WAIT_NOW
+
+    display.set_status("LIVE CALL")
+    assert display.tick(now=99.0) == {}  # a status ends the countdown
+
+
+def test_format_time():
+    assert [format_time(s) for s in (45, 125, 7300)] == ["45s", "2m 5s", "2h 1m"]